@@ -2,59 +2,217 @@ import sqlite3
 
 DB_PATH = "fraud_audit.db"
 
+RISK_HIST_BUCKETS = 10
+
 def get_connection():
     return sqlite3.connect(DB_PATH)
 
 
-def get_stats():
-    conn = get_connection()
-    cur = conn.cursor()
+def _decision_counts(cur, from_rollups: bool):
+    if from_rollups:
+        # O(days × decisions), independent of audit_logs size
+        cur.execute("""
+            SELECT decision, SUM(tx_count)
+            FROM audit_rollups
+            WHERE granularity = 'day'
+            GROUP BY decision
+        """)
+    else:
+        # single pass over audit_logs (index on decision)
+        cur.execute("""
+            SELECT decision, COUNT(*)
+            FROM audit_logs
+            GROUP BY decision
+        """)
 
-    cur.execute("SELECT COUNT(*) FROM audit_logs")
-    total = cur.fetchone()[0]
+    return {decision: int(n or 0) for decision, n in cur.fetchall()}
 
-    cur.execute("SELECT COUNT(*) FROM audit_logs WHERE decision='BLOCK'")
-    blocked = cur.fetchone()[0]
 
-    cur.execute("SELECT COUNT(*) FROM audit_logs WHERE decision='STEP_UP_AUTH'")
-    step_up = cur.fetchone()[0]
+def get_stats(from_rollups: bool = True):
+    conn = get_connection()
+    cur = conn.cursor()
 
-    cur.execute("SELECT COUNT(*) FROM audit_logs WHERE decision='ALLOW'")
-    allowed = cur.fetchone()[0]
+    counts = _decision_counts(cur, from_rollups)
 
     conn.close()
 
     return {
-        "total_transactions": total,
-        "blocked": blocked,
-        "step_up": step_up,
-        "allowed": allowed
+        "total_transactions": sum(counts.values()),
+        "blocked": counts.get("BLOCK", 0),
+        "reviewed": counts.get("REVIEW", 0),
+        # legacy key: STEP_UP_AUTH is never emitted by the engine
+        "step_up": counts.get("STEP_UP_AUTH", 0),
+        "allowed": counts.get("ALLOW", 0)
     }
 
 
-def get_recent_frauds(limit: int = 5):
+def get_rollups(granularity: str = "hour", limit: int = 48):
+    """
+    Time series from audit_rollups (newest first):
+    counts / amount sums / risk histogram per bucket and decision
+    """
     conn = get_connection()
     cur = conn.cursor()
 
-    cur.execute("""
-        SELECT tx_id, sender_vpa, receiver_vpa, amount, risk_score, timestamp
-        FROM audit_logs
-        WHERE decision='BLOCK'
-        ORDER BY timestamp DESC
-        LIMIT ?
-    """, (limit,))
+    hist_cols = ", ".join(f"risk_b{i}" for i in range(RISK_HIST_BUCKETS))
+
+    cur.execute(f"""
+        SELECT bucket_start, decision, tx_count, amount_sum, {hist_cols}
+        FROM audit_rollups
+        WHERE granularity = ?
+          AND bucket_start IN (
+              SELECT DISTINCT bucket_start
+              FROM audit_rollups
+              WHERE granularity = ?
+              ORDER BY bucket_start DESC
+              LIMIT ?
+          )
+        ORDER BY bucket_start DESC, decision
+    """, (granularity, granularity, limit))
 
     rows = cur.fetchall()
     conn.close()
 
     return [
         {
-            "tx_id": r[0],
-            "sender": r[1],
-            "receiver": r[2],
-            "amount": r[3],
-            "risk_score": r[4],
-            "timestamp": r[5]
+            "bucket_start": r[0],
+            "decision": r[1],
+            "tx_count": r[2],
+            "amount_sum": r[3],
+            "risk_histogram": list(r[4:]),
+        }
+        for r in rows
+    ]
+
+
+def rebuild_rollups():
+    """
+    One-off backfill: recomputes audit_rollups from audit_logs
+    (e.g. for rows written before the rollup table existed).
+    Buckets older than the oldest hot row (archived days) are kept.
+    """
+    conn = get_connection()
+    cur = conn.cursor()
+
+    hist_cols = ", ".join(f"risk_b{i}" for i in range(RISK_HIST_BUCKETS))
+    hist_sums = ", ".join(
+        f"SUM(MIN(MAX(risk_score, 0) / 10, {RISK_HIST_BUCKETS - 1}) = {i})"
+        for i in range(RISK_HIST_BUCKETS)
+    )
+
+    # must match SQLAlchemy's SQLite DateTime storage format
+    buckets = (
+        ("hour", "%Y-%m-%d %H:00:00.000000"),
+        ("day", "%Y-%m-%d 00:00:00.000000"),
+    )
+
+    for granularity, fmt in buckets:
+        cur.execute(f"""
+            DELETE FROM audit_rollups
+            WHERE granularity = ?
+              AND bucket_start >= (
+                  SELECT COALESCE(strftime('{fmt}', MIN(timestamp)), '')
+                  FROM audit_logs
+              )
+        """, (granularity,))
+
+        cur.execute(f"""
+            INSERT INTO audit_rollups
+                (granularity, bucket_start, decision, tx_count, amount_sum, {hist_cols})
+            SELECT ?, strftime('{fmt}', timestamp), decision,
+                   COUNT(*), SUM(amount), {hist_sums}
+            FROM audit_logs
+            GROUP BY strftime('{fmt}', timestamp), decision
+        """, (granularity,))
+
+    conn.commit()
+    conn.close()
+
+
+def _encode_cursor(timestamp, row_id):
+    return f"{timestamp}|{row_id}"
+
+
+def _decode_cursor(cursor: str):
+    timestamp, row_id = cursor.rsplit("|", 1)
+    return timestamp, int(row_id)
+
+
+def list_audit_logs(limit: int = 50, cursor: str = None, decision: str = None):
+    """
+    Keyset (cursor) pagination over audit_logs, newest first.
+    Every page is an index range scan from the cursor, so page 10,000
+    costs the same as page 1 (no OFFSET).
+
+    Returns {"items": [...], "next_cursor": str | None}
+    """
+    conn = get_connection()
+    cur = conn.cursor()
+
+    where = []
+    params = []
+
+    if decision:
+        where.append("decision = ?")
+        params.append(decision)
+
+    if cursor:
+        where.append("(timestamp, id) < (?, ?)")
+        params.extend(_decode_cursor(cursor))
+
+    sql = """
+        SELECT id, tx_id, sender_vpa, receiver_vpa, amount, risk_score,
+               confidence, decision, timestamp
+        FROM audit_logs
+    """
+    if where:
+        sql += " WHERE " + " AND ".join(where)
+    sql += " ORDER BY timestamp DESC, id DESC LIMIT ?"
+    # one extra row tells whether another page exists
+    params.append(limit + 1)
+
+    cur.execute(sql, params)
+    rows = cur.fetchall()
+    conn.close()
+
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    items = [
+        {
+            "id": r[0],
+            "tx_id": r[1],
+            "sender": r[2],
+            "receiver": r[3],
+            "amount": r[4],
+            "risk_score": r[5],
+            "confidence": r[6],
+            "decision": r[7],
+            "timestamp": r[8]
         }
         for r in rows
     ]
+
+    next_cursor = None
+    if has_more:
+        next_cursor = _encode_cursor(rows[-1][8], rows[-1][0])
+
+    return {"items": items, "next_cursor": next_cursor}
+
+
+def list_frauds(limit: int = 50, cursor: str = None):
+    return list_audit_logs(limit=limit, cursor=cursor, decision="BLOCK")
+
+
+def get_recent_frauds(limit: int = 5):
+    return [
+        {
+            "tx_id": r["tx_id"],
+            "sender": r["sender"],
+            "receiver": r["receiver"],
+            "amount": r["amount"],
+            "risk_score": r["risk_score"],
+            "timestamp": r["timestamp"]
+        }
+        for r in list_frauds(limit)["items"]
+    ]
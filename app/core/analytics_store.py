@@ -0,0 +1,83 @@
+import os
+import time
+from collections import Counter
+
+from app.core.redis_client import redis_client
+
+# --------------------------------------------------
+# Incrementally maintained dashboard aggregates over a rolling window
+# (ENV OVERRIDABLE)
+#
+# One Redis hash per ANALYTICS_BUCKET_S bucket, updated by the async
+# worker and expired once it leaves ANALYTICS_WINDOW_S; a read sums
+# the window's buckets (one pipelined round-trip).
+# --------------------------------------------------
+ANALYTICS_KEY = "analytics:summary"
+ANALYTICS_BUCKET_S = int(os.getenv("ANALYTICS_BUCKET_S", 60))
+ANALYTICS_WINDOW_S = int(os.getenv("ANALYTICS_WINDOW_S", 3600))
+
+DECISIONS = ("ALLOW", "REVIEW", "BLOCK")
+
+RISK_BUCKET_WIDTH = 10
+RISK_BUCKETS = [
+    f"{lo}-{lo + RISK_BUCKET_WIDTH - 1}" if lo < 90 else "90-100"
+    for lo in range(0, 100, RISK_BUCKET_WIDTH)
+]
+
+
+def risk_bucket(risk_score):
+    idx = int(risk_score or 0) // RISK_BUCKET_WIDTH
+    return RISK_BUCKETS[max(0, min(idx, len(RISK_BUCKETS) - 1))]
+
+
+def _bucket_key(bucket):
+    return f"{ANALYTICS_KEY}:{bucket}"
+
+
+def record_batch(pipe, results, now: float = None):
+    """
+    Queues HINCRBY updates for a batch of decisions on an open pipeline
+    (bucketed by processing time)
+    results: iterable of {"decision": ..., "risk_score": ...}
+    """
+    now = time.time() if now is None else now
+    key = _bucket_key(int(now // ANALYTICS_BUCKET_S))
+    counts = Counter()
+
+    for result in results:
+        counts["total"] += 1
+        counts[f"decision:{result['decision']}"] += 1
+        counts[f"risk:{risk_bucket(result['risk_score'])}"] += 1
+
+    if not counts:
+        return
+
+    for field, n in counts.items():
+        pipe.hincrby(key, field, n)
+    pipe.expire(key, ANALYTICS_WINDOW_S + ANALYTICS_BUCKET_S)
+
+
+def read_summary(now: float = None):
+    """
+    Decision counts + risk histogram over the last ANALYTICS_WINDOW_S
+    (one HGETALL per bucket, pipelined)
+    """
+    now = time.time() if now is None else now
+    current = int(now // ANALYTICS_BUCKET_S)
+    n_buckets = max(1, -(-ANALYTICS_WINDOW_S // ANALYTICS_BUCKET_S))
+
+    pipe = redis_client.pipeline(transaction=False)
+    for bucket in range(current - n_buckets + 1, current + 1):
+        pipe.hgetall(_bucket_key(bucket))
+
+    raw = Counter()
+    for fields in pipe.execute():
+        for field, n in fields.items():
+            raw[field] += int(n)
+
+    return {
+        "total": raw["total"],
+        "decisions": {d: raw[f"decision:{d}"] for d in DECISIONS},
+        "risk_histogram": {b: raw[f"risk:{b}"] for b in RISK_BUCKETS},
+        "window_s": ANALYTICS_WINDOW_S,
+    }
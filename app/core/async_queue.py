@@ -1,4 +1,62 @@
+import os
 import queue
 
-# Global in-memory queue (Kafka-like)
-transaction_queue = queue.Queue(maxsize=10000)
+import redis
+
+from app.core import codec
+from app.core.redis_client import REDIS_URL, redis_client
+
+# --------------------------------------------------
+# Backend selection
+# memory       → in-process queue + daemon worker thread (default)
+# redis_stream → durable Redis Stream, consumed by standalone
+#                consumer-group processes (app.core.stream_consumer)
+# --------------------------------------------------
+TX_QUEUE_BACKEND = os.getenv("TX_QUEUE_BACKEND", "memory")
+
+TX_STREAM_KEY = os.getenv("TX_STREAM_KEY", "stream:transactions")
+TX_STREAM_MAXLEN = int(os.getenv("TX_STREAM_MAXLEN", 1000000))
+
+# XADD sits on the decision path: its own client with a socket timeout,
+# so a slow / down Redis sheds the audit record instead of the response
+TX_STREAM_TIMEOUT_MS = float(os.getenv("TX_STREAM_TIMEOUT_MS", 10))
+
+stream_client = redis.Redis.from_url(
+    REDIS_URL,
+    socket_timeout=TX_STREAM_TIMEOUT_MS / 1000,
+    socket_connect_timeout=TX_STREAM_TIMEOUT_MS / 1000,
+)
+
+
+class RedisStreamQueue:
+    """
+    Producer side of the Redis Streams bus (queue.Queue-like API)
+
+    Costs one XADD round-trip on the decision path, in exchange for
+    audits surviving a process crash and being shared across workers.
+    """
+
+    def put_nowait(self, item: dict):
+        stream_client.xadd(
+            TX_STREAM_KEY,
+            {"data": codec.dumps(item)},
+            maxlen=TX_STREAM_MAXLEN,
+            approximate=True
+        )
+
+    put = put_nowait
+
+    def qsize(self):
+        return redis_client.xlen(TX_STREAM_KEY)
+
+
+if TX_QUEUE_BACKEND == "redis_stream":
+    transaction_queue = RedisStreamQueue()
+else:
+    # Global in-memory queue (Kafka-like)
+    transaction_queue = queue.Queue(maxsize=10000)
+
+# BLOCK / REVIEW records that found transaction_queue full
+# (app.core.backpressure); bounded, drained first by the worker
+AUDIT_CRITICAL_QUEUE_SIZE = int(os.getenv("AUDIT_CRITICAL_QUEUE_SIZE", 2000))
+critical_queue = queue.Queue(maxsize=AUDIT_CRITICAL_QUEUE_SIZE)
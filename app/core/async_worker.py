@@ -1,17 +1,41 @@
 import threading
-import json
+import os
+import queue
 import time
 from types import SimpleNamespace
 
-from app.core.async_queue import transaction_queue
-from app.core.database import get_db
-from app.core.audit_logger import log_decision
+from app.core import codec
+from app.core.async_queue import critical_queue, transaction_queue
+from app.core.database import SessionLocal
+from app.core.audit_logger import build_audit_row, log_decisions
 from app.core.redis_client import redis_client
+from app.core.analytics_store import record_batch
+from app.core.hot_record import encode_record
+from app.core.prom_metrics import (
+    AUDIT_BATCH_ROWS,
+    AUDIT_COMMIT_SECONDS,
+    HOT_STORE_WRITE_SECONDS,
+)
 
 # Redis keys (MUST match main.py)
 REDIS_TX_KEY = "recent_transactions"
 REVIEW_QUEUE_KEY = "review_queue"
 
+# Group commit: flush after N rows or T ms, whichever first
+AUDIT_BATCH_SIZE = int(os.getenv("AUDIT_BATCH_SIZE", 200))
+AUDIT_BATCH_WAIT_MS = float(os.getenv("AUDIT_BATCH_WAIT_MS", 50))
+
+# Per-process writer stats (exposed via /api/metrics)
+_stats_lock = threading.Lock()
+_stats = {
+    "batches": 0,
+    "rows": 0,
+    "commit_ms_total": 0.0,
+    "commit_ms_last": 0.0,
+    "commit_ms_max": 0.0,
+    "started_at": time.time(),
+}
+
 
 def normalize_payload(payload):
     """
@@ -24,17 +48,143 @@ def normalize_payload(payload):
     return payload
 
 
-def worker_loop():
-    print("🟢 Async Audit Worker started (RBI-compliant)")
+def _drain_critical(limit):
+    items = []
+    while len(items) < limit:
+        try:
+            items.append(critical_queue.get_nowait())
+        except queue.Empty:
+            break
+        critical_queue.task_done()
+    return items
 
-    while True:
-        raw = transaction_queue.get()
-        start_time = time.time()
 
+def drain_batch():
+    """
+    Blocks for the first item, then collects more until
+    AUDIT_BATCH_SIZE items or AUDIT_BATCH_WAIT_MS elapsed.
+
+    Overflowed BLOCK / REVIEW records (critical_queue) come first and
+    are marked done here. Returns (batch, n_main): task_done() is owed
+    to transaction_queue for the last n_main items.
+    """
+    critical = _drain_critical(AUDIT_BATCH_SIZE)
+
+    if critical:
+        # main queue is (nearly) full: take what is there, never wait
+        batch = []
+        flush_at = 0.0
+    else:
+        batch = [transaction_queue.get()]
+        flush_at = time.perf_counter() + AUDIT_BATCH_WAIT_MS / 1000
+
+    while len(critical) + len(batch) < AUDIT_BATCH_SIZE:
+        remaining = flush_at - time.perf_counter()
         try:
-            payload = normalize_payload(raw)
+            if remaining <= 0:
+                batch.append(transaction_queue.get_nowait())
+            else:
+                batch.append(transaction_queue.get(timeout=remaining))
+        except queue.Empty:
+            break
+
+    return critical + batch, len(batch)
+
+
+def writer_stats():
+    with _stats_lock:
+        batches = _stats["batches"]
+        rows = _stats["rows"]
+        commit_s = _stats["commit_ms_total"] / 1000
+        uptime = time.time() - _stats["started_at"]
+
+        return {
+            "batches": batches,
+            "rows": rows,
+            "avg_batch_size": round(rows / batches, 2) if batches else 0,
+            "commit_ms_last": round(_stats["commit_ms_last"], 3),
+            "commit_ms_avg": (
+                round(_stats["commit_ms_total"] / batches, 3) if batches else 0
+            ),
+            "commit_ms_max": round(_stats["commit_ms_max"], 3),
+            # rows per second of commit time (writer ceiling)
+            "commit_rows_per_sec": round(rows / commit_s, 1) if commit_s else 0,
+            # rows per second of wall-clock uptime (actual load)
+            "rows_per_sec": round(rows / uptime, 1) if uptime else 0,
+        }
+
+
+def _record_commit(rows, commit_ms):
+    with _stats_lock:
+        _stats["batches"] += 1
+        _stats["rows"] += rows
+        _stats["commit_ms_total"] += commit_ms
+        _stats["commit_ms_last"] = commit_ms
+        _stats["commit_ms_max"] = max(_stats["commit_ms_max"], commit_ms)
+
 
-            db = next(get_db())
+def write_audit_batch(items, db, skip_existing: bool = False):
+    """
+    items: [(tx, result)]
+    One transaction for the whole batch; if it fails, fall back
+    row by row so one bad record never drops its neighbours.
+
+    Returns (failed, skipped) positions in items:
+    failed  → not committed (DB error), safe to redeliver
+    skipped → tx_id already stored (skip_existing)
+    Rejected rows (bad data) are in neither: a retry cannot fix them.
+    """
+    rows = []
+    positions = []
+    for pos, (tx, result) in enumerate(items):
+        try:
+            rows.append(build_audit_row(tx, result))
+            positions.append(pos)
+        except Exception as e:
+            print("❌ Audit row rejected:", tx.tx_id, e)
+
+    failed = set()
+    skipped = set()
+    start = time.perf_counter()
+
+    try:
+        skipped = {positions[i] for i in log_decisions(rows, db, skip_existing)}
+
+    except Exception as e:
+        print("⚠️ Group commit failed, retrying row by row:", e)
+        db.rollback()
+
+        for pos, row in zip(positions, rows):
+            try:
+                if log_decisions([row], db, skip_existing):
+                    skipped.add(pos)
+            except Exception as row_err:
+                db.rollback()
+                failed.add(pos)
+                print("❌ Audit write failed:", row["tx_id"], row_err)
+
+    commit_s = time.perf_counter() - start
+    _record_commit(len(rows), commit_s * 1000)
+    AUDIT_COMMIT_SECONDS.observe(commit_s)
+    AUDIT_BATCH_ROWS.observe(len(rows))
+
+    return failed, skipped
+
+
+def process_batch(batch, db, at_least_once: bool = False):
+    """
+    at_least_once (stream consumer, entries may be redelivered):
+    rows already stored are skipped, only newly stored rows reach the
+    hot store, and the positions in batch that were NOT committed are
+    returned so the caller can leave them pending.
+    """
+    start_time = time.time()
+    items = []
+    positions = []
+
+    for pos, raw in enumerate(batch):
+        try:
+            payload = normalize_payload(raw)
 
             # --------------------------------------------------
             # 1️⃣ Extract TX + Decision (STRICT CONTRACT)
@@ -52,65 +202,136 @@ def worker_loop():
                 "risk_score": payload.risk_score,
                 "confidence": payload.confidence,
                 "reason": getattr(payload, "reason", None),
+                "policy_version": getattr(payload, "policy_version", None),
             }
 
             latency_ms = round((time.time() - start_time) * 1000, 2)
+            items.append((payload, tx, result, latency_ms))
+            positions.append(pos)
 
-            # --------------------------------------------------
-            # 2️⃣ Immutable DB audit (RBI mandatory)
-            # --------------------------------------------------
-            log_decision(tx, result, db)
+        except Exception as e:
+            print("❌ Async audit worker error:", e)
 
-            # --------------------------------------------------
-            # 3️⃣ Redis hot-store (dashboard)
-            # --------------------------------------------------
-            redis_client.lpush(
-                REDIS_TX_KEY,
-                json.dumps({
-                    "tx_id": tx.tx_id,
-                    "amount": tx.amount,
-                    "sender_vpa": tx.sender_vpa,
-                    "receiver_vpa": tx.receiver_vpa,
-                    "decision": result["decision"],
-                    "risk_score": result["risk_score"],
-                    "confidence": result["confidence"],
-                    "latency_ms": latency_ms,
-                    "engine_version": getattr(payload, "engine_version", "v1"),
-                    "policy_version": getattr(payload, "policy_version", "v1"),
-                    "timestamp": tx.timestamp
-                })
-            )
+    # --------------------------------------------------
+    # 2️⃣ Immutable DB audit (RBI mandatory) — group commit
+    # --------------------------------------------------
+    failed, skipped = write_audit_batch(
+        [(tx, result) for _, tx, result, _ in items],
+        db,
+        skip_existing=at_least_once
+    )
 
-            redis_client.ltrim(REDIS_TX_KEY, 0, 999)
+    if at_least_once:
+        # redelivered / uncommitted rows must not be counted twice
+        items = [
+            item for i, item in enumerate(items)
+            if i not in failed and i not in skipped
+        ]
 
-            # --------------------------------------------------
-            # 4️⃣ REVIEW queue (human-in-loop)
-            # --------------------------------------------------
-            if result["decision"] == "REVIEW":
-                redis_client.lpush(
-                    REVIEW_QUEUE_KEY,
-                    json.dumps({
-                        "tx_id": tx.tx_id,
-                        "risk_score": result["risk_score"],
-                        "timestamp": tx.timestamp
-                    })
-                )
+    try:
+        publish_hot_store(items)
+    except Exception as e:
+        print("❌ Async audit worker error:", e)
 
-            # --------------------------------------------------
-            # 5️⃣ Metrics (executive observability)
-            # --------------------------------------------------
-            redis_client.incr("metric:total_transactions")
-            redis_client.incr(f"metric:decision:{result['decision']}")
+    return {positions[i] for i in failed}
+
+
+def publish_hot_store(items):
+    """
+    All Redis side effects of a batch in ONE non-transactional pipeline:
+    1 LPUSH (many values) + 1 LTRIM + 1 LPUSH review + HINCRBY aggregates
+    """
+    if not items:
+        return
+
+    recent = []
+    review = []
+
+    for payload, tx, result, latency_ms in items:
+        # shed under backpressure: audit row kept, dashboard entry skipped
+        if not getattr(payload, "audit_only", False):
+            recent.append(_hot_record(payload, tx, result, latency_ms))
+
+        if result["decision"] == "REVIEW":
+            review.append(_review_record(payload, tx, result))
+
+    pipe = redis_client.pipeline(transaction=False)
+
+    # --------------------------------------------------
+    # 3️⃣ Redis hot-store (dashboard)
+    # LPUSH a b c → newest item ends up at the head, as before
+    # --------------------------------------------------
+    if recent:
+        pipe.lpush(REDIS_TX_KEY, *recent)
+        pipe.ltrim(REDIS_TX_KEY, 0, 999)
+
+    # --------------------------------------------------
+    # 4️⃣ REVIEW queue (human-in-loop)
+    # --------------------------------------------------
+    if review:
+        pipe.lpush(REVIEW_QUEUE_KEY, *review)
+
+    # --------------------------------------------------
+    # 5️⃣ Dashboard aggregates (O(1) reads for analytics APIs)
+    # --------------------------------------------------
+    record_batch(pipe, (result for _, _, result, _ in items))
+
+    start = time.perf_counter()
+    pipe.execute()
+    HOT_STORE_WRITE_SECONDS.observe(time.perf_counter() - start)
+
+
+def _hot_record(payload, tx, result, latency_ms):
+    return encode_record({
+        "tx_id": tx.tx_id,
+        "amount": tx.amount,
+        "sender_vpa": tx.sender_vpa,
+        "receiver_vpa": tx.receiver_vpa,
+        "decision": result["decision"],
+        "risk_score": result["risk_score"],
+        "confidence": result["confidence"],
+        "latency_ms": latency_ms,
+        "engine_version": getattr(payload, "engine_version", "v1"),
+        "policy_version": getattr(payload, "policy_version", "v1"),
+        "timestamp": tx.timestamp
+    })
+
+
+def _review_record(payload, tx, result):
+    # Same record the decision API returned to the caller
+    return codec.dumps({
+        "tx_id": tx.tx_id,
+        "decision": result["decision"],
+        "risk_score": result["risk_score"],
+        "confidence": result["confidence"],
+        "engine_version": getattr(payload, "engine_version", "v1"),
+        "policy_version": getattr(payload, "policy_version", "v1"),
+        "latency_ms": getattr(payload, "latency_ms", None),
+        "timestamp": tx.timestamp
+    })
+
+
+def worker_loop():
+    print("🟢 Async Audit Worker started (RBI-compliant)")
+
+    # one long-lived session, reused across batches
+    db = SessionLocal()
+
+    while True:
+        batch, n_main = drain_batch()
+
+        try:
+            process_batch(batch, db)
 
         except Exception as e:
             print("❌ Async audit worker error:", e)
+            db.rollback()
 
         finally:
-            transaction_queue.task_done()
+            for _ in range(n_main):
+                transaction_queue.task_done()
 
 
 def start_worker():
     t = threading.Thread(target=worker_loop, daemon=True)
     t.start()
-
-
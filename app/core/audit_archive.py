@@ -0,0 +1,392 @@
+import json
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from app.core.admin_analytics import get_connection
+
+# --------------------------------------------------
+# Hot / cold audit tiers (ENV OVERRIDABLE)
+# --------------------------------------------------
+# hot: last AUDIT_HOT_DAYS days in audit_logs (SQLite, fast inserts)
+# cold: one compressed columnar file per older UTC day
+AUDIT_HOT_DAYS = int(os.getenv("AUDIT_HOT_DAYS", 7))
+AUDIT_ARCHIVE_DIR = os.getenv("AUDIT_ARCHIVE_DIR", "audit_archive")
+AUDIT_ARCHIVE_INTERVAL_S = float(os.getenv("AUDIT_ARCHIVE_INTERVAL_S", 3600))
+
+# run the archiver thread inside the API process (single worker only)
+AUDIT_ARCHIVER_IN_PROCESS = os.getenv("AUDIT_ARCHIVER_IN_PROCESS", "0") == "1"
+
+MANIFEST_FILE = "manifest.json"
+
+COLUMNS = (
+    "id", "tx_id", "amount", "sender_vpa", "receiver_vpa",
+    "risk_score", "confidence", "decision", "reason",
+    "policy_version", "actual_label", "timestamp",
+)
+
+# SQLAlchemy's SQLite DateTime storage format
+_TS_FORMAT = "%Y-%m-%d %H:%M:%S.%f"
+
+_archive_lock = threading.Lock()
+
+
+# ==================================================
+# COLUMN ENCODING
+# ==================================================
+def _to_columns(rows):
+    """
+    audit_logs tuples (COLUMNS order) → dict of NumPy columns
+    """
+    cols = list(zip(*rows)) if rows else [()] * len(COLUMNS)
+    data = dict(zip(COLUMNS, cols))
+
+    return {
+        "id": np.array(data["id"], dtype=np.int64),
+        "tx_id": np.array(data["tx_id"], dtype=str),
+        "amount": np.array(data["amount"], dtype=np.float64),
+        "sender_vpa": np.array(data["sender_vpa"], dtype=str),
+        "receiver_vpa": np.array(data["receiver_vpa"], dtype=str),
+        "risk_score": np.array(data["risk_score"], dtype=np.int16),
+        "confidence": np.array(data["confidence"], dtype=np.float64),
+        "decision": np.array(data["decision"], dtype=str),
+        "reason": np.array([r or "" for r in data["reason"]], dtype=str),
+        "policy_version": np.array([r or "" for r in data["policy_version"]], dtype=str),
+        "actual_label": np.array([r or "" for r in data["actual_label"]], dtype=str),
+        "timestamp": np.array(data["timestamp"], dtype="datetime64[us]"),
+    }
+
+
+def _concat(batches):
+    batches = [b for b in batches if len(b["id"])]
+    if not batches:
+        return _to_columns([])
+    return {c: np.concatenate([b[c] for b in batches]) for c in batches[0]}
+
+
+def _write_partition(path, cols):
+    """
+    One compressed .npz per day; decision is dictionary-encoded (int8)
+    """
+    decision_dict, decision_codes = np.unique(cols["decision"], return_inverse=True)
+
+    payload = {c: v for c, v in cols.items() if c != "decision"}
+    payload["decision"] = decision_codes.astype(np.int8)
+    payload["decision_dict"] = decision_dict
+
+    tmp = path + ".tmp.npz"
+    np.savez_compressed(tmp, **payload)
+    os.replace(tmp, path)
+
+
+def _read_partition(path, start=None, end=None, decisions=None, columns=COLUMNS):
+    """
+    Predicate pushdown inside a partition: only timestamp/decision are
+    decompressed to build the mask, then only requested columns are read
+    """
+    with np.load(path, allow_pickle=False) as npz:
+        decision_dict = npz["decision_dict"]
+        mask = None
+
+        if start is not None or end is not None:
+            ts = npz["timestamp"]
+            mask = np.ones(len(ts), dtype=bool)
+            if start is not None:
+                mask &= ts >= np.datetime64(start, "us")
+            if end is not None:
+                mask &= ts < np.datetime64(end, "us")
+
+        if decisions:
+            wanted = np.flatnonzero(np.isin(decision_dict, list(decisions)))
+            keep = np.isin(npz["decision"], wanted)
+            mask = keep if mask is None else mask & keep
+
+        out = {}
+        for c in columns:
+            if c not in npz.files:
+                # partition written before the column existed
+                values = np.full(len(npz["id"]), "", dtype=str)
+            else:
+                values = npz[c]
+            if c == "decision":
+                values = decision_dict[values]
+            out[c] = values if mask is None else values[mask]
+        return out
+
+
+# ==================================================
+# MANIFEST
+# ==================================================
+def _manifest_path():
+    return os.path.join(AUDIT_ARCHIVE_DIR, MANIFEST_FILE)
+
+
+def load_manifest():
+    try:
+        with open(_manifest_path()) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {"partitions": {}}
+
+
+def _save_manifest(manifest):
+    tmp = _manifest_path() + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(manifest, f, indent=1, sort_keys=True)
+    os.replace(tmp, _manifest_path())
+
+
+# ==================================================
+# ARCHIVER (hot → cold)
+# ==================================================
+def _day_bounds(day):
+    lo = datetime.combine(day, datetime.min.time())
+    hi = lo + timedelta(days=1)
+    return lo.strftime(_TS_FORMAT), hi.strftime(_TS_FORMAT)
+
+
+def archive_day(conn, day, manifest):
+    """
+    Moves one UTC day from audit_logs into its cold partition.
+
+    Order: write partition → manifest → DELETE. A crash in between
+    leaves rows in both tiers until the next run re-archives the day
+    (the partition merge de-duplicates on id; scan_audit skips hot
+    rows at or below the partition's max_id).
+    """
+    lo, hi = _day_bounds(day)
+    cur = conn.cursor()
+
+    cur.execute(f"""
+        SELECT {", ".join(COLUMNS)}
+        FROM audit_logs
+        WHERE timestamp >= ? AND timestamp < ?
+        ORDER BY timestamp, id
+    """, (lo, hi))
+    rows = cur.fetchall()
+    if not rows:
+        return 0
+
+    name = f"day={day.isoformat()}.npz"
+    path = os.path.join(AUDIT_ARCHIVE_DIR, name)
+
+    cols = _to_columns(rows)
+    if os.path.exists(path):
+        # late rows for an already archived day
+        cols = _concat([_read_partition(path), cols])
+        _, first = np.unique(cols["id"], return_index=True)
+        cols = {c: v[first] for c, v in cols.items()}
+        order = np.lexsort((cols["id"], cols["timestamp"]))
+        cols = {c: v[order] for c, v in cols.items()}
+
+    _write_partition(path, cols)
+
+    decisions, counts = np.unique(cols["decision"], return_counts=True)
+    manifest["partitions"][day.isoformat()] = {
+        "file": name,
+        "rows": int(len(cols["id"])),
+        "min_ts": str(cols["timestamp"].min()),
+        "max_ts": str(cols["timestamp"].max()),
+        "max_id": int(cols["id"].max()),
+        "decisions": {str(d): int(n) for d, n in zip(decisions, counts)},
+        "bytes": os.path.getsize(path),
+    }
+    _save_manifest(manifest)
+
+    # ids are monotonic → rows inserted after the SELECT are kept
+    cur.execute("""
+        DELETE FROM audit_logs
+        WHERE timestamp >= ? AND timestamp < ? AND id <= ?
+    """, (lo, hi, int(cols["id"].max())))
+    conn.commit()
+
+    return len(rows)
+
+
+def archive_old_partitions(hot_days: int = None, now: datetime = None):
+    """
+    Archives every full UTC day older than the hot window.
+    Returns the number of rows moved to the cold tier.
+    """
+    hot_days = AUDIT_HOT_DAYS if hot_days is None else hot_days
+    now = now or datetime.utcnow()
+    cutoff, _ = _day_bounds((now - timedelta(days=hot_days)).date())
+
+    os.makedirs(AUDIT_ARCHIVE_DIR, exist_ok=True)
+
+    with _archive_lock:
+        conn = get_connection()
+        manifest = load_manifest()
+        moved = 0
+
+        try:
+            while True:
+                # oldest hot row (ix_audit_logs_timestamp)
+                oldest = conn.execute(
+                    "SELECT MIN(timestamp) FROM audit_logs"
+                ).fetchone()[0]
+
+                if oldest is None or oldest >= cutoff:
+                    break
+
+                day = datetime.fromisoformat(oldest).date()
+                moved += archive_day(conn, day, manifest)
+        finally:
+            conn.close()
+
+    return moved
+
+
+def _archive_loop():
+    while True:
+        try:
+            moved = archive_old_partitions()
+            if moved:
+                print(f"🧊 Archived {moved} audit rows to {AUDIT_ARCHIVE_DIR}")
+        except Exception as e:
+            print("❌ Audit archiver error:", e)
+        time.sleep(AUDIT_ARCHIVE_INTERVAL_S)
+
+
+def start_archiver():
+    """
+    Run in ONE process only (or use `python -m app.core.audit_archive`)
+    """
+    t = threading.Thread(target=_archive_loop, daemon=True)
+    t.start()
+
+
+# ==================================================
+# QUERY LAYER (cold + hot)
+# ==================================================
+def _drop_archived(cols, archived):
+    """
+    Hot rows already in a cold partition (crash between the partition
+    write and the DELETE in archive_day): id <= that day's max_id.
+    Later rows for the day have higher ids and are kept.
+    """
+    days = cols["timestamp"].astype("datetime64[D]")
+
+    # batches are ordered by timestamp
+    first, last = str(days[0]), str(days[-1])
+    overlap = [day for day in archived if first <= day <= last]
+    if not overlap:
+        return cols
+
+    keep = np.ones(len(days), dtype=bool)
+    for day in overlap:
+        keep &= ~((days == np.datetime64(day)) & (cols["id"] <= archived[day]))
+    return {c: v[keep] for c, v in cols.items()}
+
+
+def _hot_batches(start, end, decisions, columns, batch_size, archived=None):
+    where = []
+    params = []
+
+    if start is not None:
+        where.append("timestamp >= ?")
+        params.append(start.strftime(_TS_FORMAT))
+    if end is not None:
+        where.append("timestamp < ?")
+        params.append(end.strftime(_TS_FORMAT))
+    if decisions:
+        where.append(f"decision IN ({', '.join('?' * len(decisions))})")
+        params.extend(decisions)
+
+    sql = f"SELECT {', '.join(COLUMNS)} FROM audit_logs"
+    if where:
+        sql += " WHERE " + " AND ".join(where)
+    sql += " ORDER BY timestamp, id"
+
+    conn = get_connection()
+    try:
+        cur = conn.execute(sql, params)
+        while True:
+            rows = cur.fetchmany(batch_size)
+            if not rows:
+                break
+            cols = _to_columns(rows)
+            if archived:
+                cols = _drop_archived(cols, archived)
+                if not len(cols["id"]):
+                    continue
+            yield {c: cols[c] for c in columns}
+    finally:
+        conn.close()
+
+
+def scan_audit(
+    start: datetime = None,
+    end: datetime = None,
+    decisions=None,
+    columns=COLUMNS,
+    batch_size: int = 50000,
+):
+    """
+    Streams audit rows in [start, end) across both tiers, oldest first,
+    as column batches ({column: ndarray}).
+
+    Pushdown: the manifest prunes cold partitions by time range and
+    decision counts; surviving partitions decompress only the filter
+    columns before the projection. The hot tier filters in SQL.
+    """
+    decisions = [d.upper() for d in decisions] if decisions else None
+    columns = tuple(columns)
+
+    manifest = load_manifest()
+    archived = {day: meta["max_id"] for day, meta in manifest["partitions"].items()}
+
+    for day in sorted(manifest["partitions"]):
+        meta = manifest["partitions"][day]
+
+        if start is not None and np.datetime64(meta["max_ts"]) < np.datetime64(start, "us"):
+            continue
+        if end is not None and np.datetime64(meta["min_ts"]) >= np.datetime64(end, "us"):
+            continue
+        if decisions and not any(meta["decisions"].get(d) for d in decisions):
+            continue
+
+        batch = _read_partition(
+            os.path.join(AUDIT_ARCHIVE_DIR, meta["file"]),
+            start, end, decisions, columns
+        )
+        if len(batch[columns[0]]):
+            yield batch
+
+    yield from _hot_batches(start, end, decisions, columns, batch_size, archived)
+
+
+def read_audit(start=None, end=None, decisions=None, columns=COLUMNS):
+    """
+    scan_audit() materialised into one dict of columns
+    """
+    batches = list(scan_audit(start, end, decisions, columns))
+    if not batches:
+        empty = _to_columns([])
+        return {c: empty[c] for c in columns}
+    return {c: np.concatenate([b[c] for b in batches]) for c in columns}
+
+
+def archive_stats():
+    parts = load_manifest()["partitions"]
+    return {
+        "partitions": len(parts),
+        "rows": sum(p["rows"] for p in parts.values()),
+        "bytes": sum(p.get("bytes", 0) for p in parts.values()),
+        "oldest_day": min(parts) if parts else None,
+        "newest_day": max(parts) if parts else None,
+    }
+
+
+if __name__ == "__main__":
+    # cron / sidecar: archive once, or --loop to keep running
+    import sys
+
+    if "--loop" in sys.argv:
+        print(f"🟢 Audit archiver (hot={AUDIT_HOT_DAYS}d, dir={AUDIT_ARCHIVE_DIR})")
+        _archive_loop()
+    else:
+        print(f"🧊 Archived {archive_old_partitions()} audit rows")
@@ -1,9 +1,16 @@
 from datetime import datetime
+from sqlalchemy import insert, select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from app.models.audit_log import AuditLog
+from app.models.audit_rollup import AuditRollup, RISK_HIST_BUCKETS
 
-def log_decision(tx, result: dict, db):
+_ROLLUP_COUNTERS = ["tx_count", "amount_sum"] + [
+    f"risk_b{i}" for i in range(RISK_HIST_BUCKETS)
+]
+
+def build_audit_row(tx, result: dict):
     """
-    FINAL SAFE LOGGER — NEVER CRASHES
+    Column values for one audit_logs row
     """
 
     decision = (
@@ -12,17 +19,105 @@ def log_decision(tx, result: dict, db):
         or "ALLOW"
     )
 
-    audit = AuditLog(
-        tx_id=tx.tx_id,
-        amount=tx.amount,
-        sender_vpa=tx.sender_vpa,
-        receiver_vpa=tx.receiver_vpa,
-        risk_score=result.get("risk_score", 0),
-        confidence=result.get("confidence", 0.5),
-        decision=decision,
-        reason=result.get("reason"),
-        timestamp=datetime.fromisoformat(tx.timestamp)
-    )
+    return {
+        "tx_id": tx.tx_id,
+        "amount": tx.amount,
+        "sender_vpa": tx.sender_vpa,
+        "receiver_vpa": tx.receiver_vpa,
+        "risk_score": result.get("risk_score", 0),
+        "confidence": result.get("confidence", 0.5),
+        "decision": decision,
+        "reason": result.get("reason"),
+        "policy_version": result.get("policy_version"),
+        "timestamp": datetime.fromisoformat(tx.timestamp)
+    }
+
+def log_decision(tx, result: dict, db):
+    """
+    FINAL SAFE LOGGER — NEVER CRASHES
+    """
+
+    row = build_audit_row(tx, result)
+
+    db.add(AuditLog(**row))
+    update_rollups([row], db)
+    db.commit()
+
+def log_decisions(rows: list, db, skip_existing: bool = False):
+    """
+    Group commit: one bulk INSERT, one transaction, one fsync
+    rows: output of build_audit_row
+    skip_existing: rows whose tx_id is already stored are not inserted
+    (idempotent redelivery). Returns the positions of skipped rows.
+    """
+
+    skipped = set()
+
+    if skip_existing and rows:
+        stored = existing_tx_ids([row["tx_id"] for row in rows], db)
+        skipped = {i for i, row in enumerate(rows) if row["tx_id"] in stored}
+        rows = [row for i, row in enumerate(rows) if i not in skipped]
+
+    if not rows:
+        return skipped
 
-    db.add(audit)
+    db.execute(insert(AuditLog), rows)
+    update_rollups(rows, db)
     db.commit()
+
+    return skipped
+
+def existing_tx_ids(tx_ids: list, db, chunk_size: int = 500):
+    """
+    Subset of tx_ids already in audit_logs (indexed IN lookups)
+    """
+
+    found = set()
+    tx_ids = list(set(tx_ids))
+
+    for i in range(0, len(tx_ids), chunk_size):
+        found.update(db.execute(
+            select(AuditLog.tx_id).where(AuditLog.tx_id.in_(tx_ids[i:i + chunk_size]))
+        ).scalars())
+
+    return found
+
+def update_rollups(rows: list, db):
+    """
+    Folds audit rows into per-hour / per-day rollups (same transaction)
+    One UPSERT per batch: counters are added, never overwritten
+    """
+
+    agg = {}
+
+    for row in rows:
+        ts = row["timestamp"]
+        hour = ts.replace(minute=0, second=0, microsecond=0)
+        bucket = min(max(int(row["risk_score"] or 0), 0) // 10, RISK_HIST_BUCKETS - 1)
+
+        for granularity, start in (("hour", hour), ("day", hour.replace(hour=0))):
+            key = (granularity, start, row["decision"])
+
+            entry = agg.get(key)
+            if entry is None:
+                entry = agg[key] = {c: 0 for c in _ROLLUP_COUNTERS}
+
+            entry["tx_count"] += 1
+            entry["amount_sum"] += float(row["amount"] or 0)
+            entry[f"risk_b{bucket}"] += 1
+
+    if not agg:
+        return
+
+    stmt = sqlite_insert(AuditRollup).values([
+        {"granularity": g, "bucket_start": s, "decision": d, **counters}
+        for (g, s, d), counters in agg.items()
+    ])
+
+    db.execute(stmt.on_conflict_do_update(
+        index_elements=["granularity", "bucket_start", "decision"],
+        set_={
+            c: getattr(AuditRollup, c) + getattr(stmt.excluded, c)
+            for c in _ROLLUP_COUNTERS
+        }
+    ))
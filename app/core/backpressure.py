@@ -0,0 +1,136 @@
+import os
+import queue
+import random
+import threading
+
+from app.core.async_queue import critical_queue, transaction_queue
+
+# --------------------------------------------------
+# Load-shedding policy for the audit queue (ENV OVERRIDABLE)
+#
+# Above the high watermark, ALLOW records lose their dashboard-only
+# side effects first (audit_only), then the shed mode applies:
+#   degrade → keep ALLOW while there is room, drop when full
+#   sample  → keep ALLOW with probability AUDIT_SHED_SAMPLE_RATE
+#   block   → wait up to AUDIT_SHED_BLOCK_US for a slot, then drop
+#
+# BLOCK / REVIEW are never shed by policy: when the queue is full they
+# go to the bounded critical_queue (drained first by the worker),
+# waiting up to AUDIT_CRITICAL_BLOCK_MS for room. Only if both queues
+# stay full is one dropped (critical_dropped, logged per tx).
+#
+# Redis Streams backend: an XADD error / timeout drops the record
+# (shed_error, logged per tx); the decision is still returned.
+# --------------------------------------------------
+AUDIT_SHED_MODE = os.getenv("AUDIT_SHED_MODE", "degrade")
+AUDIT_QUEUE_HIGH_WATERMARK = float(os.getenv("AUDIT_QUEUE_HIGH_WATERMARK", 0.8))
+AUDIT_SHED_SAMPLE_RATE = float(os.getenv("AUDIT_SHED_SAMPLE_RATE", 0.1))
+AUDIT_SHED_BLOCK_US = int(os.getenv("AUDIT_SHED_BLOCK_US", 500))
+AUDIT_CRITICAL_BLOCK_MS = float(os.getenv("AUDIT_CRITICAL_BLOCK_MS", 5))
+
+CRITICAL_DECISIONS = ("BLOCK", "REVIEW")
+
+_lock = threading.Lock()
+_stats = {
+    "enqueued": 0,
+    "dashboard_skipped": 0,
+    "sampled_out": 0,
+    "dropped_full": 0,
+    "block_timeout": 0,
+    "critical_overflow": 0,
+    "critical_dropped": 0,
+    "shed_error": 0,
+    "max_depth": 0,
+}
+
+
+def _count(name: str, n: int = 1):
+    with _lock:
+        _stats[name] += n
+
+
+def _maxsize():
+    return getattr(transaction_queue, "maxsize", 0) or 0
+
+
+def submit(item: dict):
+    """
+    Enqueues a decision for audit + dashboard under backpressure.
+    Never raises into the decision path.
+    """
+    maxsize = _maxsize()
+
+    # unbounded / Redis Streams backend: nothing to shed
+    if not maxsize:
+        try:
+            transaction_queue.put_nowait(item)
+        except Exception as e:
+            _count("shed_error")
+            print("❌ Audit enqueue failed, record dropped:", item.get("tx_id"), item.get("decision"), e)
+            return False
+        _count("enqueued")
+        return True
+
+    depth = transaction_queue.qsize()
+    with _lock:
+        _stats["max_depth"] = max(_stats["max_depth"], depth)
+
+    # ---------------- BLOCK / REVIEW: never shed ----------------
+    if item.get("decision") in CRITICAL_DECISIONS:
+        try:
+            transaction_queue.put_nowait(item)
+        except queue.Full:
+            try:
+                critical_queue.put(item, timeout=AUDIT_CRITICAL_BLOCK_MS / 1000)
+            except queue.Full:
+                _count("critical_dropped")
+                print("❌ Audit queues saturated, record dropped:", item.get("tx_id"), item.get("decision"))
+                return False
+            _count("critical_overflow")
+        _count("enqueued")
+        return True
+
+    # ---------------- ALLOW: shed under pressure ----------------
+    if depth >= maxsize * AUDIT_QUEUE_HIGH_WATERMARK:
+        item = {**item, "audit_only": True}
+        _count("dashboard_skipped")
+
+        if AUDIT_SHED_MODE == "sample" and random.random() >= AUDIT_SHED_SAMPLE_RATE:
+            _count("sampled_out")
+            return False
+
+    try:
+        if AUDIT_SHED_MODE == "block":
+            transaction_queue.put(item, timeout=AUDIT_SHED_BLOCK_US / 1e6)
+        else:
+            transaction_queue.put_nowait(item)
+
+    except queue.Full:
+        _count("block_timeout" if AUDIT_SHED_MODE == "block" else "dropped_full")
+        return False
+
+    _count("enqueued")
+    return True
+
+
+def queue_stats():
+    maxsize = _maxsize()
+    depth = transaction_queue.qsize()
+
+    with _lock:
+        stats = dict(_stats)
+
+    stats.update({
+        "mode": AUDIT_SHED_MODE,
+        "depth": depth,
+        "capacity": maxsize,
+        "critical_depth": critical_queue.qsize(),
+        "critical_capacity": critical_queue.maxsize,
+        "high_watermark": int(maxsize * AUDIT_QUEUE_HIGH_WATERMARK),
+        "shed_total": (
+            stats["sampled_out"] + stats["dropped_full"]
+            + stats["block_timeout"] + stats["critical_dropped"]
+            + stats["shed_error"]
+        ),
+    })
+    return stats
@@ -0,0 +1,302 @@
+"""
+Offline backtest / replay of historical traffic through ProductionFraudEngine
+
+Input: JSONL, one transaction per line. Either TransactionRequest payloads
+or audit_logs exports; fields missing from a line get the API defaults,
+and a recorded "decision" (if present) is compared too.
+
+Policy A / B: engine thresholds and/or a different ONNX model, e.g.
+    python -m app.core.backtest traffic.jsonl \\
+        --policy-a ALLOW_MAX_RISK=30 \\
+        --policy-b ALLOW_MAX_RISK=25,ML_BLOCK_THRESHOLD=0.8,model=new.onnx \\
+        --workers 8 --flips-out flips.jsonl
+
+Memory is bounded: the input is read in chunks, at most 2 chunks per
+worker are in flight, and workers return aggregates (plus flips).
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from collections import Counter
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from types import SimpleNamespace
+
+from app.core import codec
+
+BACKTEST_CHUNK_SIZE = int(os.getenv("BACKTEST_CHUNK_SIZE", 2000))
+
+# engine attributes a policy may override
+POLICY_KEYS = (
+    "ALLOW_MAX_RISK",
+    "REVIEW_MAX_RISK",
+    "MIN_ALLOW_CONFIDENCE",
+    "ML_BLOCK_THRESHOLD",
+    "ML_REVIEW_THRESHOLD",
+    "MAX_TRUST_REDUCTION",
+)
+
+# TransactionRequest defaults (app.main)
+TX_DEFAULTS = {
+    "geo_risk_score": 0,
+    "failed_pin_attempts": 0,
+    "account_age_days": 0,
+    "device_velocity": 0,
+    "tx_velocity_5m": 0,
+    "avg_tx_30d": 0.0,
+    "first_time_payee": False,
+    "high_value_ratio": 0.0,
+}
+
+DECISIONS = ("ALLOW", "REVIEW", "BLOCK")
+
+
+def parse_policy(spec: str):
+    """
+    "ALLOW_MAX_RISK=25,model=path.onnx" → {"ALLOW_MAX_RISK": "25", "model": ...}
+    """
+    policy = {}
+    for part in filter(None, (spec or "").split(",")):
+        key, _, value = part.partition("=")
+        key = key.strip()
+        if key != "model" and key not in POLICY_KEYS:
+            raise ValueError(f"Unknown policy key: {key}")
+        policy[key] = value.strip()
+    return policy
+
+
+# ==================================================
+# WORKER SIDE (one engine per policy, per process)
+# ==================================================
+_engines = None
+
+
+def _build_engine(policy):
+    from app.core.fraud_engine import ProductionFraudEngine
+
+    engine = ProductionFraudEngine(server_velocity=False, model_path=policy.get("model"))
+
+    for key, value in policy.items():
+        if key != "model":
+            # instance attribute shadows the class-level (env) default
+            setattr(engine, key, type(getattr(ProductionFraudEngine, key))(value))
+
+    return engine
+
+
+def _init_worker(policies):
+    global _engines
+    # engine start-up logs must not interleave with the JSON report
+    sys.stdout = sys.stderr
+    _engines = [_build_engine(p) for p in policies]
+
+
+def _to_tx(record):
+    tx = dict(TX_DEFAULTS)
+    tx.update({k: v for k, v in record.items() if v is not None})
+    tx["amount"] = float(tx["amount"])
+    return SimpleNamespace(**tx)
+
+
+def replay_chunk(lines):
+    """
+    Returns aggregates for one chunk:
+    decision counts per policy, A→B flip matrix, flips,
+    and agreement of policy A with the recorded decision.
+    """
+    txs = []
+    recorded = []
+    errors = 0
+
+    for line in lines:
+        try:
+            record = codec.loads(line)
+            txs.append(_to_tx(record))
+            recorded.append(record.get("decision"))
+        except Exception:
+            errors += 1
+
+    results = [engine.evaluate_batch(txs) for engine in _engines]
+
+    counts = [Counter() for _ in _engines]
+    flip_matrix = Counter()
+    vs_recorded = Counter()
+    flips = []
+
+    for i, tx in enumerate(txs):
+        decisions = []
+        for n, result in enumerate(results):
+            decision = result[i]["action"] if result[i] else "ERROR"
+            counts[n][decision] += 1
+            decisions.append(decision)
+
+        if len(decisions) == 2:
+            flip_matrix[f"{decisions[0]}->{decisions[1]}"] += 1
+            if decisions[0] != decisions[1]:
+                flips.append({
+                    "tx_id": tx.tx_id,
+                    "a": decisions[0],
+                    "b": decisions[1],
+                    "risk_a": results[0][i]["risk_score"] if results[0][i] else None,
+                    "risk_b": results[1][i]["risk_score"] if results[1][i] else None,
+                })
+
+        if recorded[i]:
+            vs_recorded[f"{recorded[i]}->{decisions[0]}"] += 1
+
+    return {
+        "rows": len(txs),
+        "errors": errors,
+        "counts": [dict(c) for c in counts],
+        "flip_matrix": dict(flip_matrix),
+        "vs_recorded": dict(vs_recorded),
+        "flips": flips,
+    }
+
+
+# ==================================================
+# DRIVER
+# ==================================================
+def _chunks(fp, size):
+    chunk = []
+    for line in fp:
+        if line.strip():
+            chunk.append(line)
+            if len(chunk) >= size:
+                yield chunk
+                chunk = []
+    if chunk:
+        yield chunk
+
+
+def run_backtest(
+    path: str,
+    policies,
+    workers: int = None,
+    chunk_size: int = BACKTEST_CHUNK_SIZE,
+    flips_out=None,
+    max_flip_samples: int = 20,
+):
+    """
+    policies: 1 or 2 dicts from parse_policy()
+    flips_out: optional writable file; every flip is streamed to it
+    """
+    workers = workers or os.cpu_count() or 1
+    max_in_flight = workers * 2
+
+    totals = {
+        "rows": 0,
+        "errors": 0,
+        "counts": [Counter() for _ in policies],
+        "flip_matrix": Counter(),
+        "vs_recorded": Counter(),
+        "flips": 0,
+        "flip_samples": [],
+    }
+
+    def merge(part):
+        totals["rows"] += part["rows"]
+        totals["errors"] += part["errors"]
+        for total, counts in zip(totals["counts"], part["counts"]):
+            total.update(counts)
+        totals["flip_matrix"].update(part["flip_matrix"])
+        totals["vs_recorded"].update(part["vs_recorded"])
+        totals["flips"] += len(part["flips"])
+
+        room = max_flip_samples - len(totals["flip_samples"])
+        totals["flip_samples"].extend(part["flips"][:room])
+
+        if flips_out:
+            for flip in part["flips"]:
+                flips_out.write(json.dumps(flip) + "\n")
+
+    start = time.perf_counter()
+
+    with open(path) as fp, ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=_init_worker,
+        initargs=(policies,),
+    ) as pool:
+        pending = set()
+
+        for chunk in _chunks(fp, chunk_size):
+            if len(pending) >= max_in_flight:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    merge(future.result())
+            pending.add(pool.submit(replay_chunk, chunk))
+
+        for future in pending:
+            merge(future.result())
+
+    elapsed = time.perf_counter() - start
+    return _report(totals, policies, elapsed, workers)
+
+
+def _report(totals, policies, elapsed, workers):
+    rows = totals["rows"]
+
+    def distribution(counts):
+        return {
+            d: {"count": counts.get(d, 0), "pct": round(100 * counts.get(d, 0) / rows, 2) if rows else 0}
+            for d in DECISIONS + tuple(k for k in counts if k not in DECISIONS)
+        }
+
+    report = {
+        "rows": rows,
+        "parse_errors": totals["errors"],
+        "elapsed_s": round(elapsed, 2),
+        "workers": workers,
+        "tx_per_s": round(rows / elapsed, 1) if elapsed else 0,
+        "policies": [
+            {"policy": policy, "decisions": distribution(counts)}
+            for policy, counts in zip(policies, totals["counts"])
+        ],
+    }
+
+    if len(policies) == 2:
+        report["flips"] = totals["flips"]
+        report["flip_rate_pct"] = round(100 * totals["flips"] / rows, 3) if rows else 0
+        report["flip_matrix"] = dict(totals["flip_matrix"])
+        report["flip_samples"] = totals["flip_samples"]
+
+    if totals["vs_recorded"]:
+        report["recorded_vs_a"] = dict(totals["vs_recorded"])
+
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Replay JSONL traffic through the fraud engine")
+    parser.add_argument("path")
+    parser.add_argument("--policy-a", default="", help="KEY=VALUE,...,model=path (default: current env)")
+    parser.add_argument("--policy-b", default=None, help="second policy → decision flips")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--chunk-size", type=int, default=BACKTEST_CHUNK_SIZE)
+    parser.add_argument("--flips-out", default=None, help="write every A/B flip as JSONL")
+    args = parser.parse_args(argv)
+
+    policies = [parse_policy(args.policy_a)]
+    if args.policy_b is not None:
+        policies.append(parse_policy(args.policy_b))
+
+    flips_out = open(args.flips_out, "w") if args.flips_out else None
+    try:
+        report = run_backtest(
+            args.path,
+            policies,
+            workers=args.workers,
+            chunk_size=args.chunk_size,
+            flips_out=flips_out,
+        )
+    finally:
+        if flips_out:
+            flips_out.close()
+
+    json.dump(report, sys.stdout, indent=2)
+    print()
+
+
+if __name__ == "__main__":
+    main()
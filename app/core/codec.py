@@ -0,0 +1,54 @@
+import json
+import os
+
+from fastapi.responses import JSONResponse
+
+# --------------------------------------------------
+# JSON codec (ENV OVERRIDABLE)
+# auto   → orjson if installed, else stdlib
+# json   → stdlib only
+# orjson → require orjson
+# --------------------------------------------------
+JSON_CODEC = os.getenv("JSON_CODEC", "auto").lower()
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+if JSON_CODEC == "orjson" and orjson is None:
+    raise RuntimeError("JSON_CODEC=orjson but orjson is not installed")
+
+USE_ORJSON = orjson is not None and JSON_CODEC != "json"
+
+CODEC_NAME = "orjson" if USE_ORJSON else "json"
+
+
+if USE_ORJSON:
+    def dumps(obj) -> bytes:
+        """
+        Compact UTF-8 JSON (bytes; Redis and Starlette accept bytes as-is)
+        """
+        return orjson.dumps(obj)
+
+    def loads(data):
+        return orjson.loads(data)
+
+else:
+    _encoder = json.JSONEncoder(separators=(",", ":"), ensure_ascii=False)
+
+    def dumps(obj) -> bytes:
+        return _encoder.encode(obj).encode()
+
+    def loads(data):
+        return json.loads(data)
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    JSONResponse rendered with the codec above (ORJSONResponse-style).
+    Returning it directly from a route also skips jsonable_encoder.
+    """
+
+    def render(self, content) -> bytes:
+        return dumps(content)
@@ -1,6 +1,13 @@
 import os
 import math
+import time
 from app.core.onnx_engine import ONNXFraudModel
+from app.core.micro_batcher import MicroBatcher, ML_MICRO_BATCH
+from app.core.stage_timer import StageTimer
+from app.core.prom_metrics import FAIL_OPEN_TOTAL
+
+# sliding-window velocity from Redis (app.core.velocity)
+SERVER_VELOCITY = os.getenv("SERVER_VELOCITY", "1") == "1"
 
 
 class ProductionFraudEngine:
@@ -51,14 +58,34 @@ class ProductionFraudEngine:
 
     MAX_TRUST_REDUCTION = 20
 
+    # time the ML stage needs left in the budget, else rules-only
+    ML_STAGE_RESERVE_MS = float(os.getenv("ML_STAGE_RESERVE_MS", 5))
+
     # ==================================================
     # INIT
     # ==================================================
-    def __init__(self):
+    def __init__(self, server_velocity: bool = None, model_path: str = None):
         self.ml = ONNXFraudModel(
-            os.getenv("ONNX_MODEL_PATH", "app/core/fraud_model.onnx")
+            model_path or os.getenv("ONNX_MODEL_PATH", "app/core/fraud_model.onnx")
+        )
+
+        # sliding-window counts from Redis replace client-supplied velocity
+        # (disable for offline replays / backtests)
+        self.server_velocity = (
+            SERVER_VELOCITY if server_velocity is None else server_velocity
         )
 
+        # imported only when used: offline engines need no REDIS_URL
+        self.velocity = None
+        if self.server_velocity:
+            from app.core import velocity
+            self.velocity = velocity
+
+        # concurrent single-tx calls share one ONNX run (opt-in)
+        self.batcher = MicroBatcher(self.ml) if ML_MICRO_BATCH else None
+
+        self.stage_timer = StageTimer()
+
     # ==================================================
     # FEATURE PREPARATION (MUST MATCH ONNX TRAINING)
     # ==================================================
@@ -77,7 +104,156 @@ class ProductionFraudEngine:
     # ==================================================
     # CORE DECISION ENGINE
     # ==================================================
-    def evaluate_transaction(self, tx):
+    def evaluate_transaction(self, tx, deadline: float = None):
+        """
+        deadline: absolute time.perf_counter() of the latency budget.
+        Checked between stages: if the ML stage no longer fits, the
+        decision is rules-only and marked degraded.
+        """
+        stage_ms = {}
+        degraded = False
+        ml_score = 0.0
+
+        t = time.perf_counter()
+
+        # ---------------- STAGE 0: SERVER VELOCITY ----------------
+        if self.server_velocity:
+            self._apply_server_velocity(tx, deadline, t)
+            t = self._lap(stage_ms, "velocity", t)
+
+        # ---------------- STAGE 1: RULES ----------------
+        risk_score, confidence, factors = self._score_rules(tx)
+        t = self._lap(stage_ms, "rules", t)
+
+        # ---------------- STAGE 2: FEATURES ----------------
+        if self._ml_fits(deadline, t):
+            ml_features = self._prepare_ml_features(tx)
+            t = self._lap(stage_ms, "features", t)
+
+            # ---------------- STAGE 3: ML (FAIL-OPEN) ----------------
+            if self._ml_fits(deadline, t):
+                if self.batcher:
+                    ml_score = self.batcher.predict_proba(ml_features, deadline)
+                else:
+                    ml_score = self.ml.predict_proba(ml_features)
+                t = self._lap(stage_ms, "ml", t)
+
+                # micro-batch missed the deadline → rules-only
+                if ml_score is None:
+                    ml_score = 0.0
+                    degraded = True
+                else:
+                    ml_score = float(ml_score)
+            else:
+                degraded = True
+        else:
+            degraded = True
+
+        if degraded:
+            factors.append(("ML_SKIPPED_DEADLINE", 0))
+            FAIL_OPEN_TOTAL.inc("ml_deadline")
+
+        # ---------------- STAGE 4: DECISION + EXPLAIN ----------------
+        result = self._final_decision(risk_score, confidence, factors, ml_score)
+        self._lap(stage_ms, "explain", t)
+
+        result["degraded"] = degraded
+        result["stage_ms"] = stage_ms
+        self.stage_timer.record(stage_ms, degraded)
+
+        return result
+
+    # ==================================================
+    # SERVER-SIDE VELOCITY (FAIL-OPEN → client values)
+    # ==================================================
+    def _apply_server_velocity(self, tx, deadline=None, now=None):
+        velocity = self.velocity
+
+        # not enough budget left for a worst-case round-trip
+        if deadline is not None and (deadline - now) * 1000 < velocity.VELOCITY_TIMEOUT_MS:
+            FAIL_OPEN_TOTAL.inc("velocity_deadline")
+            return
+
+        try:
+            velocity.apply_counts(
+                tx,
+                velocity.record_event(
+                    tx.sender_vpa, tx.tx_id, getattr(tx, "device_id", None)
+                )
+            )
+        except Exception as e:
+            FAIL_OPEN_TOTAL.inc("velocity_error")
+            print("⚠️ Velocity lookup failed (using client values):", e)
+
+    def _apply_server_velocity_batch(self, txs):
+        try:
+            for tx, counts in zip(txs, self.velocity.record_events(txs)):
+                self.velocity.apply_counts(tx, counts)
+        except Exception as e:
+            FAIL_OPEN_TOTAL.inc("velocity_error")
+            print("⚠️ Velocity lookup failed (using client values):", e)
+
+    # ==================================================
+    # DEADLINE HELPERS
+    # ==================================================
+    def _ml_fits(self, deadline, now):
+        if deadline is None:
+            return True
+        return (deadline - now) * 1000 >= self.ML_STAGE_RESERVE_MS
+
+    @staticmethod
+    def _lap(stage_ms, stage, started):
+        now = time.perf_counter()
+        stage_ms[stage] = round((now - started) * 1000, 4)
+        return now
+
+    # ==================================================
+    # BATCH DECISION ENGINE (ONE ONNX CALL)
+    # ==================================================
+    def evaluate_batch(self, txs):
+        """
+        Same decisions as evaluate_transaction, in request order.
+        Rules run per transaction, ML runs once on an (N, 8) matrix.
+        A transaction whose rules/features fail gets None (caller fails open).
+        """
+        staged = []
+        feature_rows = []
+
+        if self.server_velocity:
+            self._apply_server_velocity_batch(txs)
+
+        for tx in txs:
+            try:
+                rules = self._score_rules(tx)
+                features = self._prepare_ml_features(tx)
+            except Exception:
+                staged.append(None)
+                continue
+
+            staged.append(rules)
+            feature_rows.append(features)
+
+        ml_scores = iter(self.ml.predict_proba_batch(feature_rows))
+
+        results = []
+        for rules in staged:
+            if rules is None:
+                results.append(None)
+                continue
+
+            risk_score, confidence, factors = rules
+            results.append(
+                self._final_decision(
+                    risk_score, confidence, factors, float(next(ml_scores))
+                )
+            )
+
+        return results
+
+    # ==================================================
+    # RULES + TRUST + CONFIDENCE
+    # ==================================================
+    def _score_rules(self, tx):
         risk_score = 0
         trust_score = 0
         factors = []
@@ -146,10 +322,12 @@ class ProductionFraudEngine:
         # ---------------- CONFIDENCE ----------------
         confidence = round(max(0.05, 1 - (risk_score / 125)), 2)
 
-        # ---------------- ML (FAIL-OPEN) ----------------
-        ml_features = self._prepare_ml_features(tx)
-        ml_score = float(self.ml.predict_proba(ml_features))
+        return risk_score, confidence, factors
 
+    # ==================================================
+    # FINAL DECISION + EXPLAINABILITY
+    # ==================================================
+    def _final_decision(self, risk_score, confidence, factors, ml_score):
         # ---------------- FINAL DECISION ----------------
         if ml_score >= self.ML_BLOCK_THRESHOLD:
             decision = "BLOCK"
@@ -0,0 +1,363 @@
+import os
+import struct
+import threading
+import time
+
+from app.core import codec
+from app.core.prom_metrics import HOT_RECORD_SKIPPED_TOTAL
+from app.core.redis_client import redis_client
+
+# --------------------------------------------------
+# Compact record format for the recent_transactions list
+#
+# binary → versioned struct layout (default)
+# json   → JSON via app.core.codec (rollback)
+# The decoder reads both, so the list may hold a mix of
+# formats (old JSON entries age out through the LTRIM).
+# --------------------------------------------------
+HOT_RECORD_FORMAT = os.getenv("HOT_RECORD_FORMAT", "binary").lower()
+
+# interned strings (versions, VPA handles): id ↔ string, shared by all writers
+HOT_STRINGS_KEY = "recent_transactions:strings"
+HOT_STRINGS_MAX = int(os.getenv("HOT_STRINGS_MAX", 4096))
+
+# how often a writer re-reads the dictionary epoch (flushed / reset hash)
+HOT_STRINGS_CHECK_S = float(os.getenv("HOT_STRINGS_CHECK_S", 1.0))
+
+# decoded records kept between dashboard refreshes (list is capped at 1,000)
+HOT_DECODE_CACHE_MAX = int(os.getenv("HOT_DECODE_CACHE_MAX", 2000))
+
+DECISIONS = ("ALLOW", "REVIEW", "BLOCK")
+_DECISION_CODES = {d: i for i, d in enumerate(DECISIONS)}
+
+# --------------------------------------------------
+# v2 layout (little-endian, 33-byte header)
+#   B version       I dictionary epoch
+#   B decision      B risk_score
+#   H confidence ×1e4               I latency_ms ×100
+#   d amount
+#   H engine_version  H policy_version   (interned)
+#   H sender handle   H receiver handle  (interned "@psp")
+#   B len tx_id  B len sender local  B len receiver local  B len timestamp
+# followed by the four UTF-8 strings.
+# v1 is the same without the epoch (still decoded, written before v2).
+# JSON entries start with "{" (0x7b), never a valid version byte.
+# --------------------------------------------------
+RECORD_V1 = 1
+RECORD_V2 = 2
+_V1 = struct.Struct("<BBBHIdHHHHBBBB")
+_V1_SIZE = _V1.size
+_V2 = struct.Struct("<BIBBHIdHHHHBBBB")
+_V2_SIZE = _V2.size
+
+NO_HANDLE = 0xFFFF
+
+# --------------------------------------------------
+# The dictionary hash carries a random "epoch". If it is flushed,
+# expired or deleted, the next writer starts a new epoch; ids cached
+# under the old one are dropped, and records still tagged with it
+# are skipped by readers instead of resolving to the wrong strings.
+# --------------------------------------------------
+# _lock guards the dictionary state below: the worker thread encodes
+# while request threads decode (and may reload / reset it)
+_lock = threading.Lock()
+
+_epoch = None               # epoch _ids / _strings belong to
+_checked_at = 0.0
+_stale_epochs = set()       # epochs no longer in Redis (reader side)
+
+_ids = {}                   # string → id
+_strings = {NO_HANDLE: ""}  # id → string
+_table_full = False
+
+_decoded = {}
+_SKIPPED = object()
+
+
+class StaleDictionaryError(LookupError):
+    """
+    Record interned against a string dictionary that was reset
+    """
+
+
+# ==================================================
+# STRING DICTIONARY
+# ==================================================
+def _reset(epoch):
+    # caller holds _lock
+    global _epoch, _table_full
+    _epoch = epoch
+    _ids.clear()
+    _strings.clear()
+    _strings[NO_HANDLE] = ""
+    _table_full = False
+
+
+def _check_epoch():
+    """
+    Writer side, at most every HOT_STRINGS_CHECK_S: creates the epoch
+    if the hash is new, drops cached ids if it changed.
+    Caller holds _lock; returns the current epoch.
+    """
+    global _checked_at
+
+    now = time.monotonic()
+    if _epoch is not None and now - _checked_at < HOT_STRINGS_CHECK_S:
+        return _epoch
+    _checked_at = now
+
+    # MULTI: a flush between the two commands cannot leave no epoch
+    pipe = redis_client.pipeline()
+    pipe.hsetnx(HOT_STRINGS_KEY, "epoch", int.from_bytes(os.urandom(4), "little") | 1)
+    pipe.hget(HOT_STRINGS_KEY, "epoch")
+    epoch = int(pipe.execute()[1])
+    if epoch != _epoch:
+        _reset(epoch)
+    return epoch
+
+
+def _intern(value):
+    # caller holds _lock
+    global _table_full
+
+    sid = _ids.get(value)
+    if sid is not None:
+        return sid
+    if _table_full:
+        return None
+
+    field = f"s:{value}"
+    sid = redis_client.hget(HOT_STRINGS_KEY, field)
+
+    if sid is None:
+        new = redis_client.hincrby(HOT_STRINGS_KEY, "next", 1) - 1
+        if new >= HOT_STRINGS_MAX:
+            _table_full = True
+            return None
+
+        # id → string first: a record may only reference a resolvable id
+        redis_client.hset(HOT_STRINGS_KEY, f"i:{new}", value)
+        if redis_client.hsetnx(HOT_STRINGS_KEY, field, new):
+            sid = new
+        else:
+            # another writer interned it first
+            sid = redis_client.hget(HOT_STRINGS_KEY, field)
+
+    sid = int(sid)
+    _ids[value] = sid
+    _strings[sid] = value
+    return sid
+
+
+def _load_strings():
+    # read under the lock too: an older snapshot applied after a newer
+    # one would mark the live epoch stale
+    with _lock:
+        fields = redis_client.hgetall(HOT_STRINGS_KEY)
+        epoch = fields.get("epoch")
+        epoch = int(epoch) if epoch is not None else None
+
+        if epoch != _epoch:
+            if _epoch is not None:
+                _stale_epochs.add(_epoch)
+            _reset(epoch)
+
+        for field, value in fields.items():
+            if field.startswith("i:"):
+                _strings[int(field[2:])] = value
+
+
+# ==================================================
+# ENCODE (async worker)
+# ==================================================
+def _split_vpa(vpa):
+    local, at, handle = vpa.rpartition("@")
+    if not at:
+        return vpa, NO_HANDLE
+    return local, _intern(at + handle)
+
+
+def _encode_v2(record, epoch):
+    """
+    None when the record does not fit the layout.
+    Caller holds _lock; epoch from _check_epoch() (encode_record does).
+    """
+    decision = _DECISION_CODES.get(record["decision"])
+    risk = record["risk_score"]
+    confidence = record["confidence"]
+    latency = record["latency_ms"]
+    amount = record["amount"]
+
+    if decision is None or type(risk) is not int or not 0 <= risk <= 255:
+        return None
+    if not isinstance(amount, (int, float)) or isinstance(amount, bool):
+        return None
+
+    # fixed point must round-trip exactly
+    conf_q = round(confidence * 10000)
+    lat_q = round(latency * 100)
+    if not 0 <= conf_q <= 0xFFFF or conf_q / 10000 != confidence:
+        return None
+    if not 0 <= lat_q <= 0xFFFFFFFF or lat_q / 100 != latency:
+        return None
+
+    sender, sender_handle = _split_vpa(record["sender_vpa"])
+    receiver, receiver_handle = _split_vpa(record["receiver_vpa"])
+    engine = _intern(record["engine_version"])
+    policy = _intern(record["policy_version"])
+    if None in (sender_handle, receiver_handle, engine, policy):
+        return None
+
+    parts = [
+        record["tx_id"].encode(),
+        sender.encode(),
+        receiver.encode(),
+        record["timestamp"].encode(),
+    ]
+    if any(len(p) > 255 for p in parts):
+        return None
+
+    header = _V2.pack(
+        RECORD_V2, epoch, decision, risk, conf_q, lat_q, float(amount),
+        engine, policy, sender_handle, receiver_handle,
+        *(len(p) for p in parts)
+    )
+    return header + b"".join(parts)
+
+
+def encode_record(record: dict):
+    """
+    Binary v2 when possible, JSON otherwise (missing fields,
+    out-of-range values, full string table, HOT_RECORD_FORMAT=json)
+    """
+    if HOT_RECORD_FORMAT == "binary":
+        with _lock:
+            epoch = _check_epoch()
+            try:
+                encoded = _encode_v2(record, epoch)
+            except (AttributeError, KeyError, TypeError, ValueError, struct.error):
+                encoded = None
+        if encoded is not None:
+            return encoded
+
+    return codec.dumps(record)
+
+
+# ==================================================
+# DECODE (dashboard)
+# ==================================================
+def _decode_v2(raw, unpack=_V2.unpack_from):
+    (
+        _, epoch, decision, risk, conf_q, lat_q, amount,
+        engine, policy, sender_handle, receiver_handle,
+        n_tx, n_sender, n_receiver, n_ts,
+    ) = unpack(raw)
+
+    if epoch != _epoch:
+        if epoch not in _stale_epochs:
+            _load_strings()
+        if epoch != _epoch:
+            _stale_epochs.add(epoch)
+            raise StaleDictionaryError(f"string dictionary epoch {epoch} was reset")
+
+    return _record(
+        raw, _V2_SIZE, decision, risk, conf_q, lat_q, amount,
+        engine, policy, sender_handle, receiver_handle,
+        n_tx, n_sender, n_receiver, n_ts,
+    )
+
+
+def _decode_v1(raw, unpack=_V1.unpack_from):
+    return _record(raw, _V1_SIZE, *unpack(raw)[1:])
+
+
+def _record(
+    raw, size, decision, risk, conf_q, lat_q, amount,
+    engine, policy, sender_handle, receiver_handle,
+    n_tx, n_sender, n_receiver, n_ts,
+):
+    strings = _strings
+    try:
+        sender = strings[sender_handle]
+        receiver = strings[receiver_handle]
+        engine_version = strings[engine]
+        policy_version = strings[policy]
+    except KeyError:
+        # interned by another process since the last load;
+        # still missing afterwards → KeyError, counted by decode_records
+        _load_strings()
+        sender = strings[sender_handle]
+        receiver = strings[receiver_handle]
+        engine_version = strings[engine]
+        policy_version = strings[policy]
+
+    a = size + n_tx
+    b = a + n_sender
+    c = b + n_receiver
+
+    # same keys / order as the JSON record (async_worker._hot_record)
+    return {
+        "tx_id": raw[size:a].decode(),
+        "amount": amount,
+        "sender_vpa": raw[a:b].decode() + sender,
+        "receiver_vpa": raw[b:c].decode() + receiver,
+        "decision": DECISIONS[decision],
+        "risk_score": risk,
+        "confidence": conf_q / 10000,
+        "latency_ms": lat_q / 100,
+        "engine_version": engine_version,
+        "policy_version": policy_version,
+        "timestamp": raw[c:c + n_ts].decode(),
+    }
+
+
+def decode_record(raw) -> dict:
+    """
+    raw: bytes (or str) from LRANGE; JSON entries are still accepted
+    """
+    if isinstance(raw, str) or raw[:1] == b"{":
+        return codec.loads(raw)
+    if raw[0] == RECORD_V2:
+        return _decode_v2(raw)
+    if raw[0] == RECORD_V1:
+        return _decode_v1(raw)
+    raise ValueError(f"Unknown hot record version: {raw[0]}")
+
+
+def decode_records(raws):
+    """
+    Decodes an LRANGE result. Records seen by a previous call are
+    reused (a refresh only decodes what was pushed since), so the
+    returned dicts are shared: treat them as read-only.
+    Undecodable records are skipped, counted once per entry.
+    """
+    global _decoded
+
+    cache = _decoded
+    if len(cache) > HOT_DECODE_CACHE_MAX:
+        cache = _decoded = {}
+
+    records = []
+    for raw in raws:
+        record = cache.get(raw)
+        if record is None:
+            try:
+                record = decode_record(raw)
+            except StaleDictionaryError:
+                record = _skip("stale_dictionary")
+            except KeyError as e:
+                record = _skip("unknown_string", e)
+            except Exception as e:
+                record = _skip("malformed", e)
+            cache[raw] = record
+        if record is not _SKIPPED:
+            records.append(record)
+
+    return records
+
+
+def _skip(reason, error=None):
+    HOT_RECORD_SKIPPED_TOTAL.inc(reason)
+    if error is not None:
+        print(f"⚠️ Undecodable hot record skipped ({reason}):", error)
+    return _SKIPPED
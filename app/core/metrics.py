@@ -0,0 +1,83 @@
+import os
+import threading
+import time
+from collections import Counter
+
+from app.core.redis_client import redis_client
+
+# seconds between INCRBY flushes to Redis
+METRICS_FLUSH_INTERVAL_S = float(os.getenv("METRICS_FLUSH_INTERVAL_S", 1.0))
+
+TOTAL_KEY = "metric:total_transactions"
+DECISION_KEY = "metric:decision:{}"
+
+
+class CounterRegistry:
+    """
+    In-process counters: the request path only touches memory.
+
+    A background thread ships DELTAS to Redis with INCRBY, so
+    counters from every worker process add up in Redis.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pending = Counter()
+
+    def inc(self, key: str, n: int = 1):
+        with self._lock:
+            self._pending[key] += n
+
+    def pending(self):
+        with self._lock:
+            return dict(self._pending)
+
+    def flush(self):
+        with self._lock:
+            deltas, self._pending = self._pending, Counter()
+
+        if not deltas:
+            return
+
+        try:
+            pipe = redis_client.pipeline(transaction=False)
+            for key, n in deltas.items():
+                pipe.incrby(key, n)
+            pipe.execute()
+
+        except Exception as e:
+            # keep the deltas for the next flush
+            print("⚠️ Metrics flush failed:", e)
+            with self._lock:
+                self._pending.update(deltas)
+
+    def read(self, keys):
+        """
+        Merged view: flushed Redis totals + this process's unflushed deltas
+        """
+        values = redis_client.mget(keys)
+        local = self.pending()
+
+        return {
+            key: int(value or 0) + local.get(key, 0)
+            for key, value in zip(keys, values)
+        }
+
+
+counters = CounterRegistry()
+
+
+def record_decision(decision: str):
+    counters.inc(TOTAL_KEY)
+    counters.inc(DECISION_KEY.format(decision))
+
+
+def _flush_loop():
+    while True:
+        time.sleep(METRICS_FLUSH_INTERVAL_S)
+        counters.flush()
+
+
+def start_metrics_flusher():
+    t = threading.Thread(target=_flush_loop, daemon=True)
+    t.start()
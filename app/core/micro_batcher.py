@@ -0,0 +1,179 @@
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+from app.core.prom_metrics import FAIL_OPEN_TOTAL
+
+# --------------------------------------------------
+# Micro-batching (ENV OVERRIDABLE)
+# --------------------------------------------------
+ML_MICRO_BATCH = os.getenv("ML_MICRO_BATCH", "0") == "1"
+ML_BATCH_MAX_SIZE = int(os.getenv("ML_BATCH_MAX_SIZE", 64))
+ML_BATCH_MAX_WAIT_MS = float(os.getenv("ML_BATCH_MAX_WAIT_MS", 1.5))
+
+# time kept free after the ML stage (final decision + response)
+ML_BATCH_SAFETY_MS = float(os.getenv("ML_BATCH_SAFETY_MS", 2))
+
+# batch size histogram buckets (upper bounds)
+BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128)
+
+
+class MicroBatcher:
+    """
+    Collects concurrent single-row predict_proba calls into one ONNX run
+
+    Flushes when the batch reaches max_batch_size or when the oldest
+    request has waited max_wait_ms — whichever comes first. A request's
+    latency deadline pulls the flush earlier so batching never pushes
+    a decision past MAX_LATENCY_MS.
+    """
+
+    def __init__(
+        self,
+        model,
+        max_batch_size: int = ML_BATCH_MAX_SIZE,
+        max_wait_ms: float = ML_BATCH_MAX_WAIT_MS,
+    ):
+        self.model = model
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait_s = max_wait_ms / 1000
+        self.safety_s = ML_BATCH_SAFETY_MS / 1000
+
+        self._queue = queue.Queue()
+        self._stats_lock = threading.Lock()
+
+        # EWMA of one batched session.run (seconds)
+        self._run_s = 0.0005
+
+        self._batches = 0
+        self._requests = 0
+        self._max_batch = 0
+        self._size_hist = [0] * (len(BATCH_SIZE_BUCKETS) + 1)
+        self._queue_delay_s = 0.0
+        self._max_queue_delay_s = 0.0
+        self._expired = 0
+
+        threading.Thread(target=self._loop, daemon=True).start()
+
+    # ==================================================
+    # CALLER SIDE
+    # ==================================================
+    def predict_proba(self, features, deadline: float = None):
+        """
+        deadline: absolute time.perf_counter() of the latency budget.
+        Waits until deadline - ML_BATCH_SAFETY_MS at most; None when no
+        score arrived by then (the caller marks the decision degraded).
+        """
+        future = Future()
+        self._queue.put((features, deadline, time.perf_counter(), future))
+
+        timeout = None
+        if deadline is not None:
+            timeout = max(0.0, deadline - self.safety_s - time.perf_counter())
+
+        try:
+            return future.result(timeout=timeout)
+        except Exception:
+            # not scored yet → dropped from its batch
+            future.cancel()
+            with self._stats_lock:
+                self._expired += 1
+            return None
+
+    # ==================================================
+    # SCHEDULER
+    # ==================================================
+    def _flush_at(self, enqueued, deadline):
+        flush_at = enqueued + self.max_wait_s
+        if deadline is not None:
+            flush_at = min(flush_at, deadline - self.safety_s - self._run_s)
+        return flush_at
+
+    def _loop(self):
+        while True:
+            first = self._queue.get()
+            batch = [first]
+            flush_at = self._flush_at(first[2], first[1])
+
+            while len(batch) < self.max_batch_size:
+                remaining = flush_at - time.perf_counter()
+                try:
+                    if remaining <= 0:
+                        item = self._queue.get_nowait()
+                    else:
+                        item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+
+                batch.append(item)
+                flush_at = min(flush_at, self._flush_at(item[2], item[1]))
+
+            self._flush(batch)
+
+    def _flush(self, batch):
+        # callers that gave up (expired) are not scored
+        batch = [b for b in batch if b[3].set_running_or_notify_cancel()]
+        if not batch:
+            return
+
+        started = time.perf_counter()
+
+        try:
+            scores = self.model.predict_proba_batch([b[0] for b in batch])
+        except Exception as e:
+            # FAIL-OPEN (same as an unbatched ONNX error)
+            FAIL_OPEN_TOTAL.inc("onnx_error", n=len(batch))
+            print("❌ ONNX batch inference error:", e)
+            scores = [0.0] * len(batch)
+
+        finished = time.perf_counter()
+
+        for (_, _, _, future), score in zip(batch, scores):
+            future.set_result(score)
+
+        delays = [started - b[2] for b in batch]
+        self._record(len(batch), delays, finished - started)
+
+    # ==================================================
+    # METRICS
+    # ==================================================
+    def _record(self, size, delays, run_s):
+        bucket = len(BATCH_SIZE_BUCKETS)
+        for i, upper in enumerate(BATCH_SIZE_BUCKETS):
+            if size <= upper:
+                bucket = i
+                break
+
+        with self._stats_lock:
+            self._run_s = 0.8 * self._run_s + 0.2 * run_s
+            self._batches += 1
+            self._requests += size
+            self._max_batch = max(self._max_batch, size)
+            self._size_hist[bucket] += 1
+            self._queue_delay_s += sum(delays)
+            self._max_queue_delay_s = max(self._max_queue_delay_s, max(delays))
+
+    def stats(self):
+        with self._stats_lock:
+            batches = self._batches
+            requests = self._requests
+
+            labels = [f"<={b}" for b in BATCH_SIZE_BUCKETS]
+            labels.append(f">{BATCH_SIZE_BUCKETS[-1]}")
+
+            return {
+                "batches": batches,
+                "requests": requests,
+                "expired": self._expired,
+                "avg_batch_size": round(requests / batches, 2) if batches else 0,
+                "max_batch_size": self._max_batch,
+                "batch_size_histogram": dict(zip(labels, self._size_hist)),
+                "avg_queue_delay_ms": (
+                    round(self._queue_delay_s / requests * 1000, 3)
+                    if requests else 0
+                ),
+                "max_queue_delay_ms": round(self._max_queue_delay_s * 1000, 3),
+                "avg_run_ms": round(self._run_s * 1000, 3),
+            }
@@ -1,37 +1,102 @@
 import onnxruntime as ort
 import numpy as np
 import time
-import threading
+import itertools
 import math
 import os
 
+from app.core.prom_metrics import FAIL_OPEN_TOTAL
+
+
+# --------------------------------------------------
+# Session tuning (ENV OVERRIDABLE)
+# Default: each run is single-threaded. An (N, 8) model is too small to
+# gain from splitting one run across cores; parallelism comes from the
+# concurrent callers instead (lock-free sessions, see ONNXFraudModel).
+# Set the thread counts (0 → ONNX Runtime uses all cores) for large
+# offline batches.
+# --------------------------------------------------
+ONNX_INTRA_OP_THREADS = int(os.getenv("ONNX_INTRA_OP_THREADS", 1))
+ONNX_INTER_OP_THREADS = int(os.getenv("ONNX_INTER_OP_THREADS", 1))
+ONNX_EXECUTION_MODE = os.getenv("ONNX_EXECUTION_MODE", "sequential")
+ONNX_GRAPH_OPT_LEVEL = os.getenv("ONNX_GRAPH_OPT_LEVEL", "all")
+
+# 1 → one shared session (thread-safe, no lock)
+# N → round-robin over N independent sessions
+ONNX_SESSION_POOL_SIZE = int(os.getenv("ONNX_SESSION_POOL_SIZE", 1))
+
+_EXECUTION_MODES = {
+    "sequential": ort.ExecutionMode.ORT_SEQUENTIAL,
+    "parallel": ort.ExecutionMode.ORT_PARALLEL,
+}
+
+_GRAPH_OPT_LEVELS = {
+    "disable": ort.GraphOptimizationLevel.ORT_DISABLE_ALL,
+    "basic": ort.GraphOptimizationLevel.ORT_ENABLE_BASIC,
+    "extended": ort.GraphOptimizationLevel.ORT_ENABLE_EXTENDED,
+    "all": ort.GraphOptimizationLevel.ORT_ENABLE_ALL,
+}
+
+
+def build_session_options():
+    """
+    SessionOptions from environment (single-threaded runs unless
+    ONNX_INTRA_OP_THREADS / ONNX_INTER_OP_THREADS are set).
+    0 threads → let ONNX Runtime decide.
+    """
+    opts = ort.SessionOptions()
+    opts.intra_op_num_threads = ONNX_INTRA_OP_THREADS
+    opts.inter_op_num_threads = ONNX_INTER_OP_THREADS
+    opts.execution_mode = _EXECUTION_MODES.get(
+        ONNX_EXECUTION_MODE.lower(),
+        ort.ExecutionMode.ORT_SEQUENTIAL
+    )
+    opts.graph_optimization_level = _GRAPH_OPT_LEVELS.get(
+        ONNX_GRAPH_OPT_LEVEL.lower(),
+        ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+    )
+    return opts
+
 
 class ONNXFraudModel:
     """
     Production-grade ONNX inference engine
+
+    InferenceSession.run is thread-safe, so concurrent requests
+    from the FastAPI thread pool run in parallel (no global lock).
     """
 
-    def __init__(self, model_path: str = None):
+    def __init__(self, model_path: str = None, pool_size: int = None):
         # ✅ ACCEPT MODEL PATH
         self.model_path = model_path or os.path.join(
             os.path.dirname(__file__),
             "fraud_model.onnx"
         )
 
+        self.pool_size = max(1, pool_size or ONNX_SESSION_POOL_SIZE)
+
         self.session = None
+        self.sessions = []
         self.input_name = None
         self.output_names = []
         self.model_version = "unknown"
-        self._lock = threading.Lock()
+        self._next = itertools.count()
 
         self._load_model()
 
     def _load_model(self):
         try:
-            self.session = ort.InferenceSession(
-                self.model_path,
-                providers=["CPUExecutionProvider"]
-            )
+            opts = build_session_options()
+
+            self.sessions = [
+                ort.InferenceSession(
+                    self.model_path,
+                    sess_options=opts,
+                    providers=["CPUExecutionProvider"]
+                )
+                for _ in range(self.pool_size)
+            ]
+            self.session = self.sessions[0]
 
             self.input_name = self.session.get_inputs()[0].name
             self.output_names = [o.name for o in self.session.get_outputs()]
@@ -39,25 +104,38 @@ class ONNXFraudModel:
             meta = self.session.get_modelmeta().custom_metadata_map
             self.model_version = meta.get("model_version", "1.0")
 
-            print(f"✅ ONNX model loaded from {self.model_path}")
+            print(
+                f"✅ ONNX model loaded from {self.model_path} "
+                f"(sessions={self.pool_size})"
+            )
 
         except Exception as e:
             print("❌ ONNX load failed (FAIL-OPEN):", e)
             self.session = None
+            self.sessions = []
+
+    def _pick_session(self):
+        if self.pool_size == 1:
+            return self.session
+        # itertools.count is atomic under the GIL
+        return self.sessions[next(self._next) % self.pool_size]
+
+    def _run(self, arr):
+        return self._pick_session().run(
+            self.output_names,
+            {self.input_name: arr}
+        )
 
     def predict_proba(self, features):
         # FAIL-OPEN
         if not self.session:
+            FAIL_OPEN_TOTAL.inc("onnx_unavailable")
             return 0.0
 
         try:
             arr = np.array([features], dtype=np.float32)
 
-            with self._lock:
-                outputs = self.session.run(
-                    self.output_names,
-                    {self.input_name: arr}
-                )
+            outputs = self._run(arr)
 
             # Classifier output (1,2)
             if outputs[0].ndim == 2:
@@ -66,5 +144,38 @@ class ONNXFraudModel:
             return float(outputs[0][0])
 
         except Exception as e:
+            FAIL_OPEN_TOTAL.inc("onnx_error")
             print("❌ ONNX inference error:", e)
             return 0.0
+
+    def predict_proba_batch(self, feature_rows):
+        """
+        Scores N feature rows with a single session.run.
+        Model is exported with a dynamic batch axis: [None, 8]
+        Returns one float per row (fail-open → 0.0 for every row)
+        """
+        n = len(feature_rows)
+
+        if n == 0:
+            return []
+
+        # FAIL-OPEN
+        if not self.session:
+            FAIL_OPEN_TOTAL.inc("onnx_unavailable", n=n)
+            return [0.0] * n
+
+        try:
+            arr = np.asarray(feature_rows, dtype=np.float32).reshape(n, -1)
+
+            outputs = self._run(arr)
+
+            # Classifier output (N,2)
+            if outputs[0].ndim == 2:
+                return outputs[0][:, 1].astype(float).tolist()
+
+            return outputs[0].astype(float).tolist()
+
+        except Exception as e:
+            FAIL_OPEN_TOTAL.inc("onnx_error", n=n)
+            print("❌ ONNX batch inference error:", e)
+            return [0.0] * n
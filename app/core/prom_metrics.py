@@ -0,0 +1,305 @@
+import bisect
+import threading
+import time
+
+# --------------------------------------------------
+# Prometheus text exposition (no client library)
+#
+# Hot path writes go to a per-thread shard (no lock, no contention);
+# a scrape sums the shards. Values are per process.
+# --------------------------------------------------
+
+# seconds; 0.05 = MAX_LATENCY_MS budget
+LATENCY_BUCKETS = (
+    0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005,
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0,
+)
+
+REGISTRY = []
+
+
+def _fmt_labels(names, values, extra=None):
+    pairs = [f'{n}="{v}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _fmt_value(v):
+    if v == float("inf"):
+        return "+Inf"
+    return repr(float(v)) if isinstance(v, float) else str(v)
+
+
+class _ShardedMetric:
+    kind = "untyped"
+
+    def __init__(self, name: str, help: str, labelnames=()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+
+        self._local = threading.local()
+        self._shards = []
+        self._shards_lock = threading.Lock()
+
+        REGISTRY.append(self)
+
+    def _shard(self):
+        try:
+            return self._local.shard
+        except AttributeError:
+            # first write from this thread (once per thread)
+            shard = self._local.shard = {}
+            with self._shards_lock:
+                self._shards.append(shard)
+            return shard
+
+    def _snapshot(self):
+        with self._shards_lock:
+            shards = list(self._shards)
+        return shards
+
+
+class Counter(_ShardedMetric):
+    """
+    Monotonic; name should end in _total
+    """
+    kind = "counter"
+
+    def inc(self, *labels, n=1):
+        shard = self._shard()
+        shard[labels] = shard.get(labels, 0) + n
+
+    def totals(self):
+        totals = {}
+        for shard in self._snapshot():
+            for labels, v in list(shard.items()):
+                totals[labels] = totals.get(labels, 0) + v
+        return totals
+
+    def collect(self):
+        for labels, v in sorted(self.totals().items()):
+            yield f"{self.name}{_fmt_labels(self.labelnames, labels)} {_fmt_value(v)}"
+
+
+class Histogram(_ShardedMetric):
+    """
+    Fixed buckets; observe() is one bisect + a few list writes.
+    Cells per label set: per-bucket counts (+ overflow), sum, max.
+    """
+    kind = "histogram"
+
+    def __init__(self, name, help, labelnames=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(buckets)
+        self._n = len(self.buckets)
+
+    def observe(self, value: float, *labels):
+        shard = self._shard()
+        cells = shard.get(labels)
+        if cells is None:
+            cells = shard[labels] = self._new_cells()
+        cells[bisect.bisect_left(self.buckets, value)] += 1
+        cells[-2] += value
+        if value > cells[-1]:
+            cells[-1] = value
+
+    def observe_labeled(self, values: dict, scale: float = 1.0):
+        """
+        {label: value} for a single-label histogram, one shard lookup
+        """
+        shard = self._shard()
+        buckets = self.buckets
+        for label, value in values.items():
+            value *= scale
+            cells = shard.get((label,))
+            if cells is None:
+                cells = shard[(label,)] = self._new_cells()
+            cells[bisect.bisect_left(buckets, value)] += 1
+            cells[-2] += value
+            if value > cells[-1]:
+                cells[-1] = value
+
+    def _new_cells(self):
+        # non-cumulative bucket counts + overflow, sum, max
+        return [0] * (self._n + 1) + [0.0, 0.0]
+
+    def totals(self):
+        totals = {}
+        for shard in self._snapshot():
+            for labels, cells in list(shard.items()):
+                acc = totals.get(labels)
+                if acc is None:
+                    totals[labels] = list(cells)
+                else:
+                    for i, v in enumerate(cells[:-1]):
+                        acc[i] += v
+                    acc[-1] = max(acc[-1], cells[-1])
+        return totals
+
+    def summary(self):
+        """
+        {labels: {"count", "sum", "max"}} (sum / max in observed units)
+        """
+        return {
+            labels: {
+                "count": sum(cells[:-2]),
+                "sum": cells[-2],
+                "max": cells[-1],
+            }
+            for labels, cells in self.totals().items()
+        }
+
+    def collect(self):
+        for labels, cells in sorted(self.totals().items()):
+            cumulative = 0
+            for bound, n in zip(self.buckets + (float("inf"),), cells):
+                cumulative += n
+                le = f'le="{_fmt_value(float(bound))}"'
+                yield f"{self.name}_bucket{_fmt_labels(self.labelnames, labels, le)} {cumulative}"
+
+            label_str = _fmt_labels(self.labelnames, labels)
+            yield f"{self.name}_sum{label_str} {_fmt_value(cells[-2])}"
+            yield f"{self.name}_count{label_str} {cumulative}"
+
+
+class Gauge:
+    """
+    Read at scrape time: fn() → number, or {label_values_tuple: number}.
+    kind="counter" for monotonic values kept elsewhere (name ends in _total)
+    """
+
+    def __init__(self, name: str, help: str, fn, labelnames=(), kind="gauge", register=True):
+        self.name = name
+        self.help = help
+        self.fn = fn
+        self.labelnames = tuple(labelnames)
+        self.kind = kind
+        if register:
+            REGISTRY.append(self)
+
+    def collect(self):
+        return self.samples(self.fn())
+
+    def samples(self, value):
+        items = value.items() if isinstance(value, dict) else [((), value)]
+        for labels, v in items:
+            yield f"{self.name}{_fmt_labels(self.labelnames, labels)} {_fmt_value(v)}"
+
+
+class GaugeGroup:
+    """
+    Gauges read from ONE snapshot per scrape: snapshot() is called once,
+    each gauge's fn(snapshot) picks its value (same shape as Gauge fn)
+    """
+
+    def __init__(self, name: str, snapshot):
+        self.name = name
+        self.snapshot = snapshot
+        self.gauges = []
+        REGISTRY.append(self)
+
+    def gauge(self, name: str, help: str, fn, labelnames=(), kind="gauge"):
+        self.gauges.append(Gauge(name, help, fn, labelnames, kind, register=False))
+
+    def families(self):
+        snapshot = self.snapshot()
+        return [(g, list(g.samples(g.fn(snapshot)))) for g in self.gauges]
+
+
+def render():
+    lines = []
+    for metric in REGISTRY:
+        try:
+            if isinstance(metric, GaugeGroup):
+                families = metric.families()
+            else:
+                families = [(metric, list(metric.collect()))]
+        except Exception as e:
+            print("⚠️ Metric collect failed:", metric.name, e)
+            continue
+
+        for family, samples in families:
+            lines.append(f"# HELP {family.name} {family.help}")
+            lines.append(f"# TYPE {family.name} {family.kind}")
+            lines.extend(samples)
+
+    return "\n".join(lines) + "\n"
+
+
+# ==================================================
+# DECISION PATH
+# ==================================================
+DECISION_STAGE_SECONDS = Histogram(
+    "fraud_decision_stage_seconds",
+    "Decision latency per stage (parse, velocity, rules, features, ml, explain, metrics, enqueue)",
+    ("stage",),
+)
+
+DECISION_LATENCY_SECONDS = Histogram(
+    "fraud_decision_latency_seconds",
+    "Engine + response latency of a decision (latency_ms in the response)",
+    ("endpoint",),
+)
+
+DECISIONS_TOTAL = Counter(
+    "fraud_decisions_total",
+    "Decisions returned by this process",
+    ("decision",),
+)
+
+ENGINE_EVALUATIONS_TOTAL = Counter(
+    "fraud_engine_evaluations_total",
+    "evaluate_transaction calls (degraded=true → ML skipped for the deadline)",
+    ("degraded",),
+)
+
+FAIL_OPEN_TOTAL = Counter(
+    "fraud_fail_open_total",
+    "Fail-open events by reason",
+    ("reason",),
+)
+
+# ==================================================
+# AUDIT WORKER
+# ==================================================
+AUDIT_COMMIT_SECONDS = Histogram(
+    "fraud_audit_commit_seconds",
+    "audit_logs group-commit time per batch",
+)
+
+HOT_STORE_WRITE_SECONDS = Histogram(
+    "fraud_hot_store_write_seconds",
+    "Redis pipeline time per audit batch (recent list, review queue, aggregates)",
+)
+
+AUDIT_BATCH_ROWS = Histogram(
+    "fraud_audit_batch_rows",
+    "Rows per audit batch",
+    buckets=(1, 2, 5, 10, 25, 50, 100, 200, 500, 1000),
+)
+
+# ==================================================
+# DASHBOARD
+# ==================================================
+HOT_RECORD_SKIPPED_TOTAL = Counter(
+    "fraud_hot_record_skipped_total",
+    "recent_transactions entries the decoder skipped (stale_dictionary, unknown_string, malformed)",
+    ("reason",),
+)
+
+
+class RequestStartMiddleware:
+    """
+    Pure ASGI (no BaseHTTPMiddleware overhead): stamps the arrival time
+    so handlers can time body read + validation + auth ("parse" stage)
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http":
+            scope.setdefault("state", {})["t_arrival"] = time.perf_counter()
+        await self.app(scope, receive, send)
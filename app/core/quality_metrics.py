@@ -1,16 +1,265 @@
+import csv
+import json
+import os
 import sqlite3
+import threading
+import time
+
+from app.core import codec
 
 DB_PATH = "fraud_audit.db"
 
-def update_actual_label(tx_id: str, label: str):
-    conn = sqlite3.connect(DB_PATH)
+# --------------------------------------------------
+# Label ingestion (ENV OVERRIDABLE)
+# --------------------------------------------------
+LABEL_BATCH_SIZE = int(os.getenv("LABEL_BATCH_SIZE", 5000))
+LABEL_SYNC_INTERVAL_S = float(os.getenv("LABEL_SYNC_INTERVAL_S", 5))
+
+# reviewer outcomes (LPUSHed by /api/review/decision)
+REVIEW_DECISIONS_KEY = "review_decisions"
+
+# SQLite host-parameter limit is 999 on older builds
+_IN_CHUNK = 500
+
+_LABELS = {
+    "FRAUD": "FRAUD", "BLOCK": "FRAUD", "1": "FRAUD", "TRUE": "FRAUD",
+    "LEGIT": "LEGIT", "ALLOW": "LEGIT", "0": "LEGIT", "FALSE": "LEGIT",
+    "GENUINE": "LEGIT",
+}
+
+
+def normalize_label(label):
+    """
+    Any accepted spelling → FRAUD | LEGIT (None if unknown)
+    """
+    if label is None:
+        return None
+    return _LABELS.get(str(label).strip().upper())
+
+
+def get_connection():
+    return sqlite3.connect(DB_PATH)
+
+
+# ==================================================
+# BULK APPLY
+# ==================================================
+def _apply_chunk(conn, labels):
+    """
+    labels: {tx_id: FRAUD | LEGIT}
+    One transaction: lookup → executemany UPDATE → confusion UPSERT.
+    Re-labelling moves the row's count from the old cell to the new one.
+    """
     cur = conn.cursor()
+    tx_ids = list(labels)
+    found = []
 
-    cur.execute("""
-        UPDATE audit_logs
-        SET actual_label = ?
-        WHERE tx_id = ?
-    """, (label, tx_id))
+    for lo in range(0, len(tx_ids), _IN_CHUNK):
+        chunk = tx_ids[lo:lo + _IN_CHUNK]
+        cur.execute(f"""
+            SELECT id, tx_id, decision, policy_version, actual_label
+            FROM audit_logs
+            WHERE tx_id IN ({", ".join("?" * len(chunk))})
+        """, chunk)
+        found.extend(cur.fetchall())
+
+    updates = []
+    deltas = {}
+
+    for row_id, tx_id, decision, policy, old in found:
+        new = labels[tx_id]
+        if new == old:
+            continue
+
+        updates.append((new, row_id))
+        policy = policy or "unknown"
+
+        if old:
+            key = (policy, decision, old)
+            deltas[key] = deltas.get(key, 0) - 1
+
+        key = (policy, decision, new)
+        deltas[key] = deltas.get(key, 0) + 1
+
+    cur.executemany(
+        "UPDATE audit_logs SET actual_label = ? WHERE id = ?",
+        updates
+    )
+
+    cur.executemany("""
+        INSERT INTO label_confusion (policy_version, decision, actual_label, count)
+        VALUES (?, ?, ?, ?)
+        ON CONFLICT (policy_version, decision, actual_label)
+        DO UPDATE SET count = count + excluded.count
+    """, [(*key, n) for key, n in deltas.items() if n])
 
     conn.commit()
+
+    return len(updates), len(tx_ids) - len({r[1] for r in found})
+
+
+def ingest_labels(records, batch_size: int = LABEL_BATCH_SIZE):
+    """
+    records: iterable of (tx_id, label) or {"tx_id", "label"} dicts
+    (streamed; at most batch_size labels held in memory).
+
+    Returns {"received", "applied", "unknown_tx", "invalid"}.
+    Archived (cold-tier) rows are not updated and count as unknown_tx.
+    """
+    summary = {"received": 0, "applied": 0, "unknown_tx": 0, "invalid": 0}
+    conn = get_connection()
+
+    def flush(pending):
+        applied, unknown = _apply_chunk(conn, pending)
+        summary["applied"] += applied
+        summary["unknown_tx"] += unknown
+
+    try:
+        pending = {}
+
+        for record in records:
+            summary["received"] += 1
+
+            if isinstance(record, dict):
+                tx_id = record.get("tx_id")
+                label = record.get("label", record.get("actual_label"))
+            else:
+                tx_id, label = record
+
+            label = normalize_label(label)
+            if not tx_id or label is None:
+                summary["invalid"] += 1
+                continue
+
+            # last label for a tx_id wins within a batch
+            pending[tx_id] = label
+
+            if len(pending) >= batch_size:
+                flush(pending)
+                pending = {}
+
+        if pending:
+            flush(pending)
+    finally:
+        conn.close()
+
+    return summary
+
+
+def update_actual_label(tx_id: str, label: str):
+    return ingest_labels([(tx_id, label)])
+
+
+# ==================================================
+# SOURCES
+# ==================================================
+def read_jsonl(path):
+    with open(path) as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                yield codec.loads(line)
+
+
+def read_csv(path):
+    # header: tx_id,label
+    with open(path, newline="") as f:
+        yield from csv.DictReader(f)
+
+
+def read_label_file(path):
+    return read_csv(path) if path.endswith(".csv") else read_jsonl(path)
+
+
+def sync_review_decisions(max_items: int = LABEL_BATCH_SIZE):
+    """
+    Applies reviewer outcomes from the review_decisions list (oldest first).
+    RPOP is atomic, so several processes may sync concurrently;
+    on failure the popped items are pushed back.
+    """
+    from app.core.redis_client import redis_client
+
+    raw = redis_client.rpop(REVIEW_DECISIONS_KEY, max_items)
+    if not raw:
+        return {"received": 0, "applied": 0, "unknown_tx": 0, "invalid": 0}
+
+    try:
+        return ingest_labels(
+            (item.get("tx_id"), item.get("final_decision"))
+            for item in map(codec.loads, raw)
+        )
+    except Exception:
+        redis_client.rpush(REVIEW_DECISIONS_KEY, *reversed(raw))
+        raise
+
+
+def _label_sync_loop():
+    while True:
+        try:
+            sync_review_decisions()
+        except Exception as e:
+            print("⚠️ Label sync error:", e)
+        time.sleep(LABEL_SYNC_INTERVAL_S)
+
+
+def start_label_sync():
+    t = threading.Thread(target=_label_sync_loop, daemon=True)
+    t.start()
+
+
+# ==================================================
+# QUALITY REPORT (no table scan: reads label_confusion only)
+# ==================================================
+def quality_report():
+    """
+    Per policy version: confusion matrix (decision × label) plus
+    precision / recall with BLOCK as the positive prediction
+    (and with BLOCK + REVIEW, i.e. "flagged")
+    """
+    conn = get_connection()
+    cur = conn.cursor()
+
+    cur.execute("""
+        SELECT policy_version, decision, actual_label, count
+        FROM label_confusion
+    """)
+    rows = cur.fetchall()
     conn.close()
+
+    matrices = {}
+    for policy, decision, label, n in rows:
+        matrix = matrices.setdefault(policy, {})
+        matrix.setdefault(decision, {"FRAUD": 0, "LEGIT": 0})[label] = n
+
+    def scores(matrix, positive):
+        tp = sum(matrix.get(d, {}).get("FRAUD", 0) for d in positive)
+        fp = sum(matrix.get(d, {}).get("LEGIT", 0) for d in positive)
+        fraud = sum(cell["FRAUD"] for cell in matrix.values())
+        return {
+            "precision": round(tp / (tp + fp), 4) if tp + fp else None,
+            "recall": round(tp / fraud, 4) if fraud else None,
+        }
+
+    return {
+        policy: {
+            "labeled": sum(c["FRAUD"] + c["LEGIT"] for c in matrix.values()),
+            "confusion": matrix,
+            "block": scores(matrix, ("BLOCK",)),
+            "flagged": scores(matrix, ("BLOCK", "REVIEW")),
+        }
+        for policy, matrix in matrices.items()
+    }
+
+
+if __name__ == "__main__":
+    # python -m app.core.quality_metrics labels.jsonl|labels.csv|--review-queue
+    import sys
+
+    for source in sys.argv[1:]:
+        if source == "--review-queue":
+            summary = sync_review_decisions(max_items=10 ** 9)
+        else:
+            summary = ingest_labels(read_label_file(source))
+        print(f"🏷️ {source}: {summary}")
+
+    print(json.dumps(quality_report(), indent=2))
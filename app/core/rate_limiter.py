@@ -1,28 +1,160 @@
 # app/core/rate_limiter.py
 
+import os
+import threading
 import time
-from collections import defaultdict
+from collections import OrderedDict
 from fastapi import HTTPException
 
-# requests per minute
-RATE_LIMIT = 20
+from app.core.prom_metrics import FAIL_OPEN_TOTAL
 
-# { api_key: [timestamps] }
-_request_log = defaultdict(list)
+# --------------------------------------------------
+# RATE_LIMIT_PER_MIN: requests per minute per API key
+# (token bucket: burst = RATE_LIMIT, refill RATE_LIMIT / 60s).
+# 0 (default) → off. The decision API is called by the PSP gateway
+# with one shared key, so size it for the whole gateway's traffic
+# (e.g. 600000 ≈ 10k TPS), never per end user.
+# --------------------------------------------------
+RATE_LIMIT = int(os.getenv("RATE_LIMIT_PER_MIN", 0))
+RATE_WINDOW_S = 60
+
+# memory → per-process buckets | redis → shared across workers
+RATE_LIMIT_BACKEND = os.getenv("RATE_LIMIT_BACKEND", "memory")
+
+# hard cap on tracked keys (in-memory backend)
+RATE_LIMIT_MAX_KEYS = int(os.getenv("RATE_LIMIT_MAX_KEYS", 100000))
+
+
+class MemoryTokenBucket:
+    """
+    O(1) token bucket per key, kept in LRU order.
+
+    A key idle for a full window has a full bucket again, so it is
+    indistinguishable from a new key and can be evicted safely.
+    """
+
+    def __init__(self, rate: int, window_s: float, max_keys: int):
+        self.capacity = float(rate)
+        self.refill_per_s = rate / window_s
+        self.idle_s = window_s
+        self.max_keys = max_keys
+
+        self._lock = threading.Lock()
+        self._buckets = OrderedDict()   # key → [tokens, last_ts]
+
+    def check(self, key: str, now: float = None):
+        """
+        Returns (allowed, retry_after_s)
+        """
+        now = time.monotonic() if now is None else now
+
+        with self._lock:
+            self._evict_idle(now)
+
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = [self.capacity, now]
+                self._buckets[key] = bucket
+            else:
+                self._buckets.move_to_end(key)
+
+            tokens = min(
+                self.capacity,
+                bucket[0] + (now - bucket[1]) * self.refill_per_s
+            )
+            bucket[1] = now
+
+            if tokens >= 1:
+                bucket[0] = tokens - 1
+                return True, 0.0
+
+            bucket[0] = tokens
+            return False, (1 - tokens) / self.refill_per_s
+
+    def _evict_idle(self, now):
+        # oldest-touched first → stop at the first still-active key
+        while self._buckets:
+            key, (_, last_ts) = next(iter(self._buckets.items()))
+            if now - last_ts < self.idle_s and len(self._buckets) < self.max_keys:
+                break
+            self._buckets.popitem(last=False)
+
+    def __len__(self):
+        return len(self._buckets)
 
-def rate_limit(api_key: str):
-    now = time.time()
-    window_start = now - 60
 
-    timestamps = _request_log[api_key]
+class RedisTokenBucket:
+    """
+    Same token bucket, stored in Redis (one atomic script per check)
+    """
 
-    # remove old timestamps
-    _request_log[api_key] = [t for t in timestamps if t > window_start]
+    LUA = """
+    local capacity = tonumber(ARGV[1])
+    local refill_per_ms = tonumber(ARGV[2])
+    local now = tonumber(ARGV[3])
+    local ttl_ms = tonumber(ARGV[4])
 
-    if len(_request_log[api_key]) >= RATE_LIMIT:
+    local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+    local tokens = tonumber(state[1]) or capacity
+    local ts = tonumber(state[2]) or now
+
+    tokens = math.min(capacity, tokens + math.max(0, now - ts) * refill_per_ms)
+
+    local allowed = 0
+    local retry_ms = 0
+    if tokens >= 1 then
+        tokens = tokens - 1
+        allowed = 1
+    else
+        retry_ms = math.ceil((1 - tokens) / refill_per_ms)
+    end
+
+    redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', now)
+    redis.call('PEXPIRE', KEYS[1], ttl_ms)
+    return {allowed, retry_ms}
+    """
+
+    def __init__(self, rate: int, window_s: float):
+        from app.core.redis_client import redis_client
+
+        self.capacity = rate
+        self.refill_per_ms = rate / (window_s * 1000)
+        self.ttl_ms = int(window_s * 1000)
+        self._script = redis_client.register_script(self.LUA)
+
+    def check(self, key: str, now: float = None):
+        now_ms = int((time.time() if now is None else now) * 1000)
+
+        allowed, retry_ms = self._script(
+            keys=[f"ratelimit:{key}"],
+            args=[self.capacity, self.refill_per_ms, now_ms, self.ttl_ms]
+        )
+        return bool(allowed), retry_ms / 1000
+
+
+if RATE_LIMIT <= 0:
+    _limiter = None
+elif RATE_LIMIT_BACKEND == "redis":
+    _limiter = RedisTokenBucket(RATE_LIMIT, RATE_WINDOW_S)
+else:
+    _limiter = MemoryTokenBucket(RATE_LIMIT, RATE_WINDOW_S, RATE_LIMIT_MAX_KEYS)
+
+
+def rate_limit(api_key: str):
+    if _limiter is None:
+        return
+
+    try:
+        allowed, retry_after = _limiter.check(api_key)
+    except Exception as e:
+        # FAIL-OPEN: limiter backend down must not block payments
+        FAIL_OPEN_TOTAL.inc("rate_limiter_error")
+        print("⚠️ Rate limiter error (FAIL-OPEN):", e)
+        return
+
+    if not allowed:
         raise HTTPException(
             status_code=429,
-            detail="Rate limit exceeded. Try again later."
+            detail="Rate limit exceeded. Try again later.",
+            headers={"Retry-After": str(max(1, int(retry_after + 0.999)))}
         )
-
-    _request_log[api_key].append(now)
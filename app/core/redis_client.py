@@ -1,8 +1,9 @@
 import os
 import redis
-import json
 from dotenv import load_dotenv
 
+from app.core import codec
+
 # --------------------------------------------------
 # Load environment variables
 # --------------------------------------------------
@@ -25,6 +26,9 @@ redis_client = redis.Redis.from_url(
     decode_responses=True
 )
 
+# bytes replies, for binary values (recent_transactions, see hot_record)
+redis_raw_client = redis.Redis.from_url(REDIS_URL)
+
 # --------------------------------------------------
 # Keys used across system
 # --------------------------------------------------
@@ -39,7 +43,7 @@ def store_transaction(tx: dict):
     Stores final fraud decision record in Redis.
     Async worker isi ko call karega.
     """
-    redis_client.lpush(TRANSACTION_KEY, json.dumps(tx))
+    redis_client.lpush(TRANSACTION_KEY, codec.dumps(tx))
 
 # --------------------------------------------------
 # READ: Fetch recent transactions
@@ -50,14 +54,14 @@ def fetch_recent_transactions(limit: int = 200):
     Returns list of transaction dicts for analytics/dashboard.
     """
     txs = redis_client.lrange(TRANSACTION_KEY, 0, limit - 1)
-    return [json.loads(t) for t in txs]
+    return [codec.loads(t) for t in txs]
 
 # --------------------------------------------------
 # READ: Fetch all transactions (careful in prod)
 # --------------------------------------------------
 def fetch_all_transactions():
     txs = redis_client.lrange(TRANSACTION_KEY, 0, -1)
-    return [json.loads(t) for t in txs]
+    return [codec.loads(t) for t in txs]
 
 # --------------------------------------------------
 # HEALTH CHECK (optional but useful)
@@ -1,5 +1,6 @@
 import time
 from app.core.redis_client import redis_client
+from app.core.velocity import record_event
 
 TX_ID_TTL = 300        # 5 minutes
 USER_WINDOW = 60       # 1 minute
@@ -13,11 +14,8 @@ def check_duplicate_tx(tx_id: str):
     return False
 
 
-def check_tx_velocity(sender_vpa: str):
-    key = f"user:{sender_vpa}:tx_count"
-    count = redis_client.incr(key)
-
-    if count == 1:
-        redis_client.expire(key, USER_WINDOW)
-
-    return count > MAX_TX_PER_MIN
+def check_tx_velocity(sender_vpa: str, tx_id: str = None):
+    # atomic sliding window (one round-trip, no INCR/EXPIRE race)
+    counts = record_event(sender_vpa, tx_id or f"{time.time_ns()}")
+    # earlier transactions: this one would be number counts + 1
+    return counts["sender_1m"] >= MAX_TX_PER_MIN
@@ -1,22 +1,104 @@
+import os
+import threading
+import time
+import uuid
+
 from app.core.redis_client import redis_client
+from app.core.near_cache import NearCache
 
 RISK_TTL = 3600  # 1 hour memory
 
+# --------------------------------------------------
+# Near-cache (ENV OVERRIDABLE)
+# --------------------------------------------------
+RISK_CACHE_MAX_ENTRIES = int(os.getenv("RISK_CACHE_MAX_ENTRIES", 100000))
+RISK_CACHE_TTL_S = float(os.getenv("RISK_CACHE_TTL_S", 5))
+
+# cross-process invalidation (pub/sub)
+RISK_INVALIDATE_CHANNEL = "risk:invalidate"
+
+_cache = NearCache(RISK_CACHE_MAX_ENTRIES, RISK_CACHE_TTL_S)
+
+# lets a process ignore its own invalidation messages
+_ORIGIN = uuid.uuid4().hex
+
+_subscriber_lock = threading.Lock()
+_subscriber_started = False
+
 def _sender_key(sender_vpa):
     return f"risk:sender:{sender_vpa}"
 
 def _receiver_key(receiver_vpa):
     return f"risk:receiver:{receiver_vpa}"
 
+def _listen_invalidations():
+    while True:
+        try:
+            pubsub = redis_client.pubsub(ignore_subscribe_messages=True)
+            pubsub.subscribe(RISK_INVALIDATE_CHANNEL)
+
+            for message in pubsub.listen():
+                origin, keys = message["data"].split("|", 1)
+                if origin != _ORIGIN:
+                    _cache.invalidate(*keys.split(","))
+
+        except Exception as e:
+            # messages may have been missed → drop everything cached
+            print("⚠️ Risk cache invalidation error:", e)
+            _cache.clear()
+            time.sleep(1)
+
+def _ensure_subscriber():
+    global _subscriber_started
+
+    if _subscriber_started:
+        return
+
+    with _subscriber_lock:
+        if _subscriber_started:
+            return
+        threading.Thread(target=_listen_invalidations, daemon=True).start()
+        _subscriber_started = True
+
 def increase_risk(sender_vpa, receiver_vpa, score=20):
-    redis_client.incrby(_sender_key(sender_vpa), score)
-    redis_client.incrby(_receiver_key(receiver_vpa), score)
+    """
+    One pipelined round-trip: INCRBY + EXPIRE per key + invalidation
+    """
+    _ensure_subscriber()
+
+    sender_key = _sender_key(sender_vpa)
+    receiver_key = _receiver_key(receiver_vpa)
 
-    redis_client.expire(_sender_key(sender_vpa), RISK_TTL)
-    redis_client.expire(_receiver_key(receiver_vpa), RISK_TTL)
+    pipe = redis_client.pipeline(transaction=False)
+    pipe.incrby(sender_key, score)
+    pipe.expire(sender_key, RISK_TTL)
+    pipe.incrby(receiver_key, score)
+    pipe.expire(receiver_key, RISK_TTL)
+    pipe.publish(
+        RISK_INVALIDATE_CHANNEL,
+        f"{_ORIGIN}|{sender_key},{receiver_key}"
+    )
+    sender_risk, _, receiver_risk, _, _ = pipe.execute()
+
+    # write-through: this process sees its own update immediately
+    _cache.set(sender_key, int(sender_risk))
+    _cache.set(receiver_key, int(receiver_risk))
 
 def get_risk(sender_vpa, receiver_vpa):
-    sender_risk = redis_client.get(_sender_key(sender_vpa)) or 0
-    receiver_risk = redis_client.get(_receiver_key(receiver_vpa)) or 0
+    _ensure_subscriber()
+
+    keys = [_sender_key(sender_vpa), _receiver_key(receiver_vpa)]
+    values = [_cache.get(k) for k in keys]
+
+    missing = [k for k, v in zip(keys, values) if v is None]
+    if missing:
+        fetched = dict(zip(missing, redis_client.mget(missing)))
+        for i, key in enumerate(keys):
+            if values[i] is None:
+                values[i] = int(fetched[key] or 0)
+                _cache.set(key, values[i])
+
+    return values[0] + values[1]
 
-    return int(sender_risk) + int(receiver_risk)
+def cache_stats():
+    return _cache.stats()
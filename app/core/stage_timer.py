@@ -0,0 +1,41 @@
+from app.core.prom_metrics import DECISION_STAGE_SECONDS, ENGINE_EVALUATIONS_TOTAL
+
+# stages timed inside evaluate_transaction; app.main records parse /
+# metrics / enqueue into the same histogram (Prometheus only)
+ENGINE_STAGES = ("velocity", "rules", "features", "ml", "explain")
+
+
+class StageTimer:
+    """
+    Per-stage latency aggregates for the decision engine
+    (count / avg / max per stage, plus how often ML was skipped)
+
+    Backed by the Prometheus stage histogram: one lock-free,
+    per-thread write per stage; stats() sums the shards.
+    """
+
+    def __init__(self, histogram=DECISION_STAGE_SECONDS, evaluations=ENGINE_EVALUATIONS_TOTAL):
+        self.histogram = histogram
+        self.evaluations = evaluations
+
+    def record(self, stage_ms: dict, degraded: bool = False):
+        self.histogram.observe_labeled(stage_ms, 0.001)
+        self.evaluations.inc("true" if degraded else "false")
+
+    def stats(self):
+        counts = self.evaluations.totals()
+        degraded = counts.get(("true",), 0)
+
+        return {
+            "evaluations": degraded + counts.get(("false",), 0),
+            "degraded": degraded,
+            "stages": {
+                stage: {
+                    "count": s["count"],
+                    "avg_ms": round(s["sum"] * 1000 / s["count"], 4),
+                    "max_ms": round(s["max"] * 1000, 4),
+                }
+                for (stage,), s in self.histogram.summary().items()
+                if s["count"] and stage in ENGINE_STAGES
+            },
+        }
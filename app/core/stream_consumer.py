@@ -0,0 +1,188 @@
+"""
+Standalone audit consumer for the Redis Streams transaction bus
+
+Run one or more per node (each is its own consumer in the group):
+    TX_QUEUE_BACKEND=redis_stream python -m app.core.stream_consumer
+
+Delivery is at-least-once: an entry is XACKed only once its audit row
+is committed (rows already stored are skipped, so redelivery is
+idempotent). Entries whose write failed stay pending. After a crash,
+a consumer restarted under the same TX_STREAM_CONSUMER name replays
+its pending entries immediately; entries of consumers that never come
+back are claimed by the others once idle for TX_STREAM_CLAIM_IDLE_MS.
+"""
+import os
+import socket
+import time
+
+import redis
+
+from app.core import codec
+from app.core.async_queue import TX_STREAM_KEY
+from app.core.async_worker import (
+    AUDIT_BATCH_SIZE,
+    AUDIT_BATCH_WAIT_MS,
+    process_batch,
+)
+from app.core.database import SessionLocal
+from app.core.redis_client import redis_client
+
+TX_STREAM_GROUP = os.getenv("TX_STREAM_GROUP", "audit-writers")
+TX_STREAM_CONSUMER = os.getenv(
+    "TX_STREAM_CONSUMER",
+    f"{socket.gethostname()}-{os.getpid()}"
+)
+
+# entries idle this long in a dead consumer's PEL get reclaimed
+TX_STREAM_CLAIM_IDLE_MS = int(os.getenv("TX_STREAM_CLAIM_IDLE_MS", 60000))
+TX_STREAM_CLAIM_EVERY_S = 30
+
+
+def ensure_group():
+    try:
+        redis_client.xgroup_create(
+            TX_STREAM_KEY,
+            TX_STREAM_GROUP,
+            id="0",
+            mkstream=True
+        )
+    except redis.ResponseError as e:
+        if "BUSYGROUP" not in str(e):
+            raise
+
+
+def _decode(entries):
+    ids = []
+    batch = []
+    poison = []
+
+    for entry_id, fields in entries:
+        try:
+            batch.append(codec.loads(fields["data"]))
+            ids.append(entry_id)
+        except Exception as e:
+            # poison entry: ACK it with the batch so it never blocks the group
+            print("❌ Undecodable stream entry:", entry_id, e)
+            poison.append(entry_id)
+
+    return ids, batch, poison
+
+
+def handle(entries, db):
+    """
+    XACKs the entries that are stored (or can never be); returns their count
+    """
+    ids, batch, poison = _decode(entries)
+
+    failed = set()
+    if batch:
+        try:
+            failed = process_batch(batch, db, at_least_once=True)
+        except Exception:
+            db.rollback()
+            raise
+
+    done = poison + [entry_id for i, entry_id in enumerate(ids) if i not in failed]
+    if done:
+        redis_client.xack(TX_STREAM_KEY, TX_STREAM_GROUP, *done)
+
+    if failed:
+        # left pending → claim_stale redelivers them once idle
+        print(f"⚠️ {len(failed)} audit rows not committed, left pending")
+
+    return len(done)
+
+
+def replay_pending(db):
+    """
+    Re-delivers this consumer's own un-ACKed entries (crash recovery)
+    """
+    replayed = 0
+    last_id = "0"
+
+    while True:
+        resp = redis_client.xreadgroup(
+            TX_STREAM_GROUP,
+            TX_STREAM_CONSUMER,
+            {TX_STREAM_KEY: last_id},
+            count=AUDIT_BATCH_SIZE
+        )
+        entries = resp[0][1] if resp else []
+        if not entries:
+            return replayed
+
+        replayed += handle(entries, db)
+        last_id = entries[-1][0]
+
+
+def claim_stale(db):
+    """
+    Takes over entries left pending by consumers that died
+    """
+    claimed = 0
+    start_id = "0-0"
+
+    while True:
+        resp = redis_client.xautoclaim(
+            TX_STREAM_KEY,
+            TX_STREAM_GROUP,
+            TX_STREAM_CONSUMER,
+            min_idle_time=TX_STREAM_CLAIM_IDLE_MS,
+            start_id=start_id,
+            count=AUDIT_BATCH_SIZE
+        )
+        start_id, entries = resp[0], resp[1]
+
+        # deleted (trimmed) entries come back as None
+        entries = [e for e in entries if e and e[1]]
+        if entries:
+            claimed += handle(entries, db)
+
+        if start_id in ("0-0", b"0-0"):
+            return claimed
+
+
+def consume_forever():
+    db = SessionLocal()
+
+    print(
+        f"🟢 Stream audit consumer {TX_STREAM_CONSUMER} "
+        f"(group={TX_STREAM_GROUP}, stream={TX_STREAM_KEY})"
+    )
+
+    # start-up steps retried by the loop (Redis / DB may still be down)
+    ready = False
+    next_claim = 0.0
+
+    while True:
+        try:
+            if not ready:
+                ensure_group()
+                replayed = replay_pending(db)
+                ready = True
+                if replayed:
+                    print(f"♻️ Replayed {replayed} pending entries")
+
+            if time.time() >= next_claim:
+                claim_stale(db)
+                next_claim = time.time() + TX_STREAM_CLAIM_EVERY_S
+
+            resp = redis_client.xreadgroup(
+                TX_STREAM_GROUP,
+                TX_STREAM_CONSUMER,
+                {TX_STREAM_KEY: ">"},
+                count=AUDIT_BATCH_SIZE,
+                block=max(1, int(AUDIT_BATCH_WAIT_MS))
+            )
+
+            if resp:
+                handle(resp[0][1], db)
+
+        except Exception as e:
+            # un-ACKed entries stay pending and are replayed later
+            print("❌ Stream consumer error:", e)
+            time.sleep(1)
+
+
+if __name__ == "__main__":
+    consume_forever()
@@ -1,20 +1,397 @@
-user_state = {}
+import hashlib
+import os
+import random
+import threading
+import time
+from datetime import datetime
 
-def update_user_state(tx):
-    uid = tx.user_id
-
-    if uid not in user_state:
-        user_state[uid] = {
-            "avg_amount": tx.amount,
-            "tx_count": 1,
-            "last_location": tx.location,
-            "last_time": tx.time
+import numpy as np
+
+# --------------------------------------------------
+# Compact per-user behavioural state (ENV OVERRIDABLE)
+# --------------------------------------------------
+USER_STATE_MAX_USERS = int(os.getenv("USER_STATE_MAX_USERS", 1000000))
+USER_STATE_EWMA_ALPHA = float(os.getenv("USER_STATE_EWMA_ALPHA", 0.1))
+
+# distinct last_location strings kept; beyond it the table is compacted
+# to the locations still referenced, then new ones are stored as unknown
+USER_STATE_MAX_LOCATIONS = int(os.getenv("USER_STATE_MAX_LOCATIONS", 65536))
+
+# rows allocated up front; set to the expected user count to skip the
+# doubling (and its index rebuild) on the way there
+USER_STATE_INITIAL_CAPACITY = int(os.getenv("USER_STATE_INITIAL_CAPACITY", 1024))
+
+_EMPTY = 0
+
+# rows sampled per eviction (approximate LRU, Redis-style)
+_EVICTION_SAMPLES = 16
+
+
+def _key_hash(user_id) -> int:
+    """
+    Stable 64-bit hash (survives restarts → snapshots stay valid).
+    Never 0 (empty slot marker).
+    """
+    digest = hashlib.blake2b(str(user_id).encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "little") | 2
+
+
+def _to_epoch(value) -> float:
+    if value is None:
+        return time.time()
+    if isinstance(value, datetime):
+        return value.timestamp()
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return datetime.fromisoformat(str(value)).timestamp()
+
+
+class CompactUserStateStore:
+    """
+    Array-backed user state: one row per user in NumPy columns,
+    addressed through an open-addressing (linear probing) index.
+
+    Columns: running mean + Welford M2, EWMA amount, count,
+    last time, last location id (interned), last touched.
+    Bounded by max_users: the least recently touched of a random
+    sample is evicted when full. The location table is bounded by
+    max_locations.
+    """
+
+    COLUMNS = {
+        "mean_amount": np.float64,
+        "m2_amount": np.float64,
+        "ewma_amount": np.float64,
+        "tx_count": np.uint32,
+        "last_time": np.float64,
+        "last_location": np.int32,
+        "touched": np.float32,
+    }
+
+    def __init__(
+        self,
+        max_users: int = USER_STATE_MAX_USERS,
+        ewma_alpha: float = USER_STATE_EWMA_ALPHA,
+        initial_capacity: int = USER_STATE_INITIAL_CAPACITY,
+        max_locations: int = USER_STATE_MAX_LOCATIONS,
+    ):
+        self.max_users = max_users
+        self.max_locations = max_locations
+        self.ewma_alpha = ewma_alpha
+        self.epoch = time.time()
+
+        self._lock = threading.Lock()
+        self._size = 0
+        self._free = []
+        self.evictions = 0
+
+        self._locations = []
+        self._location_ids = {}
+
+        self._alloc(min(initial_capacity, max_users))
+
+    # ==================================================
+    # STORAGE
+    # ==================================================
+    def _alloc(self, capacity):
+        old_cols = getattr(self, "_cols", None)
+        old_keys = getattr(self, "_row_keys", None)
+        used = self._size
+
+        self.capacity = capacity
+        self._cols = {
+            name: np.zeros(capacity, dtype=dtype)
+            for name, dtype in self.COLUMNS.items()
         }
-    else:
-        state = user_state[uid]
-        state["avg_amount"] = (state["avg_amount"] + tx.amount) / 2
-        state["tx_count"] += 1
-        state["last_location"] = tx.location
-        state["last_time"] = tx.time
-
-    return user_state[uid]
+        self._row_keys = np.zeros(capacity, dtype=np.uint64)
+
+        if old_cols is not None:
+            for name, col in old_cols.items():
+                self._cols[name][:used] = col[:used]
+            self._row_keys[:used] = old_keys[:used]
+
+        self._rebuild_index()
+
+    def _rebuild_index(self):
+        """
+        Vectorised linear-probing insert of every live row: each round,
+        one key per targeted empty slot takes it, the others move one
+        slot on. Rounds = longest probe run, not rows (runs under
+        the lock on growth and evict_older_than).
+        """
+        # load factor ≤ 0.5
+        size = 1
+        while size < self.capacity * 2:
+            size <<= 1
+
+        mask = size - 1
+        slot_keys = np.zeros(size, dtype=np.uint64)
+        slot_rows = np.full(size, -1, dtype=np.int32)
+
+        # free rows have _EMPTY keys
+        rows = np.nonzero(self._row_keys[:self._size] != _EMPTY)[0].astype(np.int32)
+        keys = self._row_keys[rows]
+        pos = (keys & np.uint64(mask)).astype(np.int64)
+
+        while len(rows):
+            # claim the empty slots: one write per slot lands, read back
+            # which (every claimed slot ends up with exactly one winner)
+            open_ = np.nonzero(slot_keys[pos] == _EMPTY)[0]
+            slot_rows[pos[open_]] = rows[open_]
+            won = open_[slot_rows[pos[open_]] == rows[open_]]
+            slot_keys[pos[won]] = keys[won]
+
+            left = np.ones(len(rows), dtype=bool)
+            left[won] = False
+            rows, keys = rows[left], keys[left]
+            pos = (pos[left] + 1) & mask
+
+        self._mask = mask
+        self._slot_keys = slot_keys
+        self._slot_rows = slot_rows
+
+    def _insert_slot(self, key, row):
+        i = key & self._mask
+        while int(self._slot_keys[i]) != _EMPTY:
+            i = (i + 1) & self._mask
+        self._slot_keys[i] = key
+        self._slot_rows[i] = row
+
+    def _delete_slot(self, i):
+        """
+        Backward-shift deletion: later entries of the probe run move up
+        into the hole, so no tombstones (and no periodic rebuild)
+        """
+        mask = self._mask
+        keys = self._slot_keys
+        rows = self._slot_rows
+
+        j = i
+        while True:
+            j = (j + 1) & mask
+            k = int(keys[j])
+            if k == _EMPTY:
+                break
+            # entry at j may fill the hole at i unless its home slot
+            # lies cyclically in (i, j]
+            home = k & mask
+            if (home - i - 1) & mask >= (j - i) & mask:
+                keys[i] = keys[j]
+                rows[i] = rows[j]
+                i = j
+
+        keys[i] = _EMPTY
+        rows[i] = -1
+
+    def _find_slot(self, key):
+        # int() keeps uint64 compares exact on every NumPy version
+        i = key & self._mask
+        while True:
+            k = int(self._slot_keys[i])
+            if k == key:
+                return i
+            if k == _EMPTY:
+                return -1
+            i = (i + 1) & self._mask
+
+    def _new_row(self):
+        if self._free:
+            return self._free.pop()
+
+        if self._size == self.capacity:
+            if self.capacity < self.max_users:
+                self._alloc(min(self.capacity * 2, self.max_users))
+            else:
+                return self._evict_one()
+
+        row = self._size
+        self._size += 1
+        return row
+
+    def _evict_one(self):
+        touched = self._cols["touched"]
+        candidates = random.sample(range(self._size), min(_EVICTION_SAMPLES, self._size))
+        row = min(candidates, key=lambda r: touched[r])
+
+        self._drop_row(row)
+        self.evictions += 1
+        return self._free.pop()
+
+    def _drop_row(self, row):
+        slot = self._find_slot(int(self._row_keys[row]))
+        if slot >= 0:
+            self._delete_slot(slot)
+
+        self._row_keys[row] = _EMPTY
+        self._free.append(row)
+
+    def _location_id(self, location):
+        if location is None:
+            return -1
+        loc_id = self._location_ids.get(location)
+        if loc_id is None:
+            if len(self._locations) >= self.max_locations:
+                self._compact_locations()
+                if len(self._locations) >= self.max_locations:
+                    return -1
+            loc_id = len(self._locations)
+            self._locations.append(location)
+            self._location_ids[location] = loc_id
+        return loc_id
+
+    def _compact_locations(self):
+        """
+        Drops locations no live row points at, renumbering the rest
+        """
+        used = self._cols["last_location"][:self._size]
+        live = self._row_keys[:self._size] != _EMPTY
+        keep = np.unique(used[live & (used >= 0)])
+
+        remap = np.full(len(self._locations) + 1, -1, dtype=np.int32)
+        remap[keep] = np.arange(len(keep), dtype=np.int32)
+        # index -1 → last slot → stays -1
+        used[:] = remap[used]
+
+        self._locations = [self._locations[i] for i in keep]
+        self._location_ids = {loc: i for i, loc in enumerate(self._locations)}
+
+    # ==================================================
+    # PUBLIC API
+    # ==================================================
+    def update(self, user_id, amount, location=None, tx_time=None):
+        key = _key_hash(user_id)
+        amount = float(amount)
+
+        with self._lock:
+            slot = self._find_slot(key)
+
+            if slot < 0:
+                row = self._new_row()
+                self._row_keys[row] = key
+                self._insert_slot(key, row)
+
+                c = self._cols
+                c["mean_amount"][row] = amount
+                c["m2_amount"][row] = 0.0
+                c["ewma_amount"][row] = amount
+                c["tx_count"][row] = 1
+            else:
+                row = int(self._slot_rows[slot])
+                c = self._cols
+
+                # Welford running mean / variance
+                n = int(c["tx_count"][row]) + 1
+                mean = c["mean_amount"][row]
+                delta = amount - mean
+                mean += delta / n
+                c["m2_amount"][row] += delta * (amount - mean)
+                c["mean_amount"][row] = mean
+                c["tx_count"][row] = n
+
+                # EWMA (recency-weighted average)
+                c["ewma_amount"][row] += self.ewma_alpha * (amount - c["ewma_amount"][row])
+
+            c["last_time"][row] = _to_epoch(tx_time)
+            c["last_location"][row] = self._location_id(location)
+            c["touched"][row] = time.time() - self.epoch
+
+            return self._row_dict(row)
+
+    def get(self, user_id):
+        with self._lock:
+            slot = self._find_slot(_key_hash(user_id))
+            if slot < 0:
+                return None
+            return self._row_dict(int(self._slot_rows[slot]))
+
+    def evict_older_than(self, max_age_s: float):
+        """
+        Age-based eviction: drops users not touched for max_age_s
+        """
+        with self._lock:
+            cutoff = time.time() - self.epoch - max_age_s
+            live = self._row_keys[:self._size] != _EMPTY
+            stale = np.nonzero(live & (self._cols["touched"][:self._size] < cutoff))[0]
+
+            for row in stale:
+                self._row_keys[row] = _EMPTY
+                self._free.append(int(row))
+
+            self.evictions += len(stale)
+            self._rebuild_index()
+            return len(stale)
+
+    def _row_dict(self, row):
+        c = self._cols
+        n = int(c["tx_count"][row])
+        loc = int(c["last_location"][row])
+
+        return {
+            "avg_amount": float(c["mean_amount"][row]),
+            "ewma_amount": float(c["ewma_amount"][row]),
+            "amount_std": float(np.sqrt(c["m2_amount"][row] / n)) if n > 1 else 0.0,
+            "tx_count": n,
+            "last_location": self._locations[loc] if loc >= 0 else None,
+            "last_time": float(c["last_time"][row]),
+        }
+
+    def __len__(self):
+        return self._size - len(self._free)
+
+    # ==================================================
+    # SIZE + SNAPSHOT
+    # ==================================================
+    def nbytes(self):
+        cols = sum(col.nbytes for col in self._cols.values())
+        index = self._slot_keys.nbytes + self._slot_rows.nbytes
+        return cols + index + self._row_keys.nbytes
+
+    def save(self, path: str):
+        """
+        Cheap snapshot: raw columns, no per-user Python objects.
+        Locations are a fixed-width string array (no pickle on load).
+        """
+        with self._lock:
+            np.savez(
+                path,
+                row_keys=self._row_keys[:self._size],
+                locations=np.array([str(loc) for loc in self._locations], dtype=np.str_),
+                meta=np.array([self.epoch, self.max_users, self.ewma_alpha, self.max_locations]),
+                **{name: col[:self._size] for name, col in self._cols.items()},
+            )
+
+    @classmethod
+    def load(cls, path: str):
+        data = np.load(path, allow_pickle=False)
+        epoch, max_users, alpha, *rest = data["meta"]
+        max_locations = int(rest[0]) if rest else USER_STATE_MAX_LOCATIONS
+
+        store = cls(
+            max_users=int(max_users),
+            ewma_alpha=float(alpha),
+            initial_capacity=1,
+            max_locations=max_locations,
+        )
+        store.epoch = float(epoch)
+
+        used = len(data["row_keys"])
+        store._size = used
+        store._locations = [str(loc) for loc in data["locations"]]
+        store._location_ids = {loc: i for i, loc in enumerate(store._locations)}
+        store._free = [int(r) for r in np.nonzero(data["row_keys"] == _EMPTY)[0]]
+        store._row_keys = data["row_keys"]
+        store._cols = {name: data[name] for name in cls.COLUMNS}
+        store._alloc(max(used, 1))
+        return store
+
+
+user_state = CompactUserStateStore()
+
+def update_user_state(tx):
+    return user_state.update(
+        tx.user_id,
+        tx.amount,
+        location=getattr(tx, "location", None),
+        tx_time=getattr(tx, "time", None),
+    )
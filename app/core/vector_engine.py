@@ -0,0 +1,174 @@
+import numpy as np
+
+from app.core.fraud_engine import ProductionFraudEngine
+
+# --------------------------------------------------
+# Factor bitmask layout (bit i ↔ FACTOR_BITS[i])
+# --------------------------------------------------
+FACTOR_BITS = (
+    list(ProductionFraudEngine.RISK_WEIGHTS)
+    + list(ProductionFraudEngine.TRUST_WEIGHTS)
+    + ["ML_HIGH_RISK", "ML_MEDIUM_RISK"]
+)
+
+FACTOR_MASK = {name: np.uint32(1 << i) for i, name in enumerate(FACTOR_BITS)}
+
+DECISIONS = np.array(["ALLOW", "REVIEW", "BLOCK"])
+
+# rows per ONNX call when the engine scores ML itself
+ML_CHUNK_ROWS = 65536
+
+# confidence depends only on the (integer) rule score → exact scalar parity
+_CONFIDENCE_TABLE = np.array(
+    [round(max(0.05, 1 - (r / 125)), 2) for r in range(101)]
+)
+
+
+def factor_names(mask):
+    """
+    Decodes one factor bitmask back to factor names
+    """
+    mask = int(mask)
+    return [name for i, name in enumerate(FACTOR_BITS) if mask & (1 << i)]
+
+
+class VectorizedFraudEngine:
+    """
+    Columnar twin of ProductionFraudEngine (backtests / batch scoring)
+
+    Same RISK_WEIGHTS / TRUST_WEIGHTS thresholds and policy,
+    applied as NumPy mask arithmetic over whole columns.
+    Output matches evaluate_transaction row for row.
+    """
+
+    def __init__(self, engine: ProductionFraudEngine = None):
+        self.engine = engine or ProductionFraudEngine()
+
+    # ==================================================
+    # FEATURE PREPARATION (MUST MATCH ONNX TRAINING)
+    # ==================================================
+    def prepare_ml_matrix(self, cols):
+        n = len(cols["amount"])
+
+        matrix = np.empty((n, 8), dtype=np.float32)
+        matrix[:, 0] = _col(cols, "geo_risk_score", n)
+        matrix[:, 1] = _col(cols, "failed_pin_attempts", n)
+        matrix[:, 2] = np.minimum(_col(cols, "account_age_days", n), 365.0) / 365.0
+        matrix[:, 3] = np.minimum(_col(cols, "device_velocity", n), 60.0) / 60.0
+        matrix[:, 4] = np.minimum(_col(cols, "tx_velocity_5m", n), 20.0) / 20.0
+        matrix[:, 5] = _col(cols, "high_value_ratio", n)
+        matrix[:, 6] = _col(cols, "first_time_payee", n) != 0
+        matrix[:, 7] = np.log1p(_col(cols, "amount", n))
+
+        return matrix
+
+    def score_ml(self, cols):
+        matrix = self.prepare_ml_matrix(cols)
+
+        scores = np.empty(len(matrix), dtype=np.float64)
+        for lo in range(0, len(matrix), ML_CHUNK_ROWS):
+            chunk = matrix[lo:lo + ML_CHUNK_ROWS]
+            scores[lo:lo + len(chunk)] = self.engine.ml.predict_proba_batch(chunk)
+
+        return scores
+
+    # ==================================================
+    # CORE DECISION ENGINE (COLUMNAR)
+    # ==================================================
+    def evaluate_columns(self, cols, ml_scores=None):
+        """
+        cols: mapping of column name → array-like (dict / DataFrame)
+        ml_scores: precomputed ML probabilities (None → run ONNX in chunks)
+
+        Returns dict of arrays:
+        action, risk_score, confidence, ml_score, factor_mask
+        """
+        e = self.engine
+        rw = e.RISK_WEIGHTS
+        n = len(cols["amount"])
+
+        amount = _col(cols, "amount", n)
+        pin = _col(cols, "failed_pin_attempts", n)
+        geo = _col(cols, "geo_risk_score", n)
+        age = _col(cols, "account_age_days", n)
+        payee = _col(cols, "first_time_payee", n) != 0
+        tx_vel = _col(cols, "tx_velocity_5m", n)
+        dev_vel = _col(cols, "device_velocity", n)
+        avg_30d = _col(cols, "avg_tx_30d", n)
+
+        has_avg = avg_30d > 0
+
+        # ---------------- RULES ----------------
+        rules = (
+            ("HIGH_AMOUNT", amount >= 20000),
+            ("MEDIUM_AMOUNT", (amount >= 10000) & (amount < 20000)),
+            ("FAILED_PIN_HIGH", pin >= 3),
+            ("FAILED_PIN_MED", pin == 2),
+            ("HIGH_GEO", geo >= 80),
+            ("MEDIUM_GEO", (geo >= 50) & (geo < 80)),
+            ("NEW_ACCOUNT", age < 30),
+            ("RECENT_ACCOUNT", (age >= 30) & (age < 90)),
+            ("FIRST_TIME_PAYEE", payee),
+            ("HIGH_TX_VELOCITY", tx_vel >= 5),
+            ("MEDIUM_TX_VELOCITY", (tx_vel >= 3) & (tx_vel < 5)),
+            ("DEVICE_CHANGE", dev_vel >= 5),
+            ("AMOUNT_SPIKE", has_avg & (amount > avg_30d * 3)),
+        )
+
+        risk = np.zeros(n, dtype=np.int64)
+        mask = np.zeros(n, dtype=np.uint32)
+
+        for name, hit in rules:
+            risk += hit * rw[name]
+            mask |= hit * FACTOR_MASK[name]
+
+        # ---------------- TRUST ----------------
+        trusts = (
+            ("OLD_ACCOUNT_TRUST", age > 365),
+            ("NORMAL_SPEND", has_avg & (amount <= avg_30d)),
+        )
+
+        trust = np.zeros(n, dtype=np.int64)
+        for name, hit in trusts:
+            trust += hit * e.TRUST_WEIGHTS[name]
+            mask |= hit * FACTOR_MASK[name]
+
+        trust = np.minimum(trust, e.MAX_TRUST_REDUCTION)
+        risk = np.clip(risk - trust, 0, 100)
+
+        # ---------------- CONFIDENCE ----------------
+        confidence = _CONFIDENCE_TABLE[risk]
+
+        # ---------------- ML (FAIL-OPEN) ----------------
+        if ml_scores is None:
+            ml = self.score_ml(cols)
+        else:
+            ml = np.asarray(ml_scores, dtype=np.float64)
+
+        ml_block = ml >= e.ML_BLOCK_THRESHOLD
+        ml_review = ~ml_block & (ml >= e.ML_REVIEW_THRESHOLD)
+
+        mask |= ml_block * FACTOR_MASK["ML_HIGH_RISK"]
+        mask |= ml_review * FACTOR_MASK["ML_MEDIUM_RISK"]
+
+        # ---------------- FINAL DECISION ----------------
+        rules_code = np.where(
+            (risk <= e.ALLOW_MAX_RISK) & (confidence >= e.MIN_ALLOW_CONFIDENCE),
+            0,
+            np.where(risk <= e.REVIEW_MAX_RISK, 1, 2),
+        )
+        code = np.where(ml_block, 2, np.where(ml_review, 1, rules_code))
+
+        return {
+            "action": DECISIONS[code],
+            "risk_score": np.maximum(risk, np.trunc(ml * 100).astype(np.int64)),
+            "confidence": confidence,
+            "ml_score": np.round(ml, 4),
+            "factor_mask": mask,
+        }
+
+
+def _col(cols, name, n):
+    if name not in cols:
+        return np.zeros(n, dtype=np.float64)
+    return np.asarray(cols[name], dtype=np.float64)
@@ -0,0 +1,124 @@
+import os
+import time
+
+import redis
+
+from app.core.redis_client import REDIS_URL
+
+# --------------------------------------------------
+# Server-side sliding-window velocity (ENV OVERRIDABLE)
+# Enabled per engine: SERVER_VELOCITY in app.core.fraud_engine
+# --------------------------------------------------
+WINDOW_1M_MS = 60 * 1000
+WINDOW_5M_MS = 5 * 60 * 1000
+WINDOW_1H_MS = 60 * 60 * 1000
+
+# The round-trip sits on the decision path: its own client with a
+# socket timeout, so a slow Redis fails open instead of eating the
+# 50 ms budget (the engine also skips it when less time is left)
+VELOCITY_TIMEOUT_MS = float(os.getenv("VELOCITY_TIMEOUT_MS", 10))
+
+velocity_client = redis.Redis.from_url(
+    REDIS_URL,
+    decode_responses=True,
+    socket_timeout=VELOCITY_TIMEOUT_MS / 1000,
+    socket_connect_timeout=VELOCITY_TIMEOUT_MS / 1000,
+)
+
+# --------------------------------------------------
+# One round-trip per transaction: for every key
+# ZADD event → trim > 1h → count 1m / 5m / 1h → refresh TTL
+# Member = tx_id, so a retried tx is not counted twice.
+# Counts exclude the event itself (-1): "transactions before this
+# one", the meaning the client-supplied features always had.
+# --------------------------------------------------
+_SLIDING_WINDOW_LUA = """
+local now = tonumber(ARGV[1])
+local member = ARGV[2]
+local out = {}
+
+for _, key in ipairs(KEYS) do
+    redis.call('ZADD', key, now, member)
+    redis.call('ZREMRANGEBYSCORE', key, '-inf', now - tonumber(ARGV[5]))
+    out[#out + 1] = redis.call('ZCOUNT', key, now - tonumber(ARGV[3]), '+inf') - 1
+    out[#out + 1] = redis.call('ZCOUNT', key, now - tonumber(ARGV[4]), '+inf') - 1
+    out[#out + 1] = redis.call('ZCARD', key) - 1
+    redis.call('PEXPIRE', key, tonumber(ARGV[5]))
+end
+
+return out
+"""
+
+_sliding_window = velocity_client.register_script(_SLIDING_WINDOW_LUA)
+
+
+def _sender_key(sender_vpa):
+    return f"vel:sender:{sender_vpa}"
+
+def _device_key(device_id):
+    return f"vel:device:{device_id}"
+
+
+def _keys_and_args(sender_vpa, tx_id, device_id=None, now_ms=None):
+    keys = [_sender_key(sender_vpa)]
+    if device_id:
+        keys.append(_device_key(device_id))
+
+    args = [
+        int(now_ms if now_ms is not None else time.time() * 1000),
+        tx_id,
+        WINDOW_1M_MS,
+        WINDOW_5M_MS,
+        WINDOW_1H_MS,
+    ]
+    return keys, args
+
+
+def _to_counts(raw):
+    counts = {
+        "sender_1m": int(raw[0]),
+        "sender_5m": int(raw[1]),
+        "sender_1h": int(raw[2]),
+    }
+    if len(raw) > 3:
+        counts.update({
+            "device_1m": int(raw[3]),
+            "device_5m": int(raw[4]),
+            "device_1h": int(raw[5]),
+        })
+    return counts
+
+
+def record_event(sender_vpa, tx_id, device_id=None, now_ms=None):
+    """
+    Records the transaction and returns sliding-window counts
+    of the sender's (device's) earlier transactions
+    """
+    keys, args = _keys_and_args(sender_vpa, tx_id, device_id, now_ms)
+    return _to_counts(_sliding_window(keys=keys, args=args))
+
+
+def record_events(txs, now_ms=None):
+    """
+    Batch variant: one pipelined round-trip for N transactions
+    """
+    pipe = velocity_client.pipeline(transaction=False)
+
+    for tx in txs:
+        keys, args = _keys_and_args(
+            tx.sender_vpa, tx.tx_id, getattr(tx, "device_id", None), now_ms
+        )
+        _sliding_window(keys=keys, args=args, client=pipe)
+
+    return [_to_counts(raw) for raw in pipe.execute()]
+
+
+def apply_counts(tx, counts):
+    """
+    Replaces client-supplied velocity features with server-side counts
+    tx_velocity_5m  ← sender transactions in the last 5 minutes
+    device_velocity ← device transactions in the last hour (if device_id sent)
+    """
+    tx.tx_velocity_5m = counts["sender_5m"]
+    if "device_1h" in counts:
+        tx.device_velocity = counts["device_1h"]
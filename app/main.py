@@ -1,23 +1,53 @@
-from fastapi import FastAPI, Depends, HTTPException, Header
+from fastapi import FastAPI, Depends, HTTPException, Header, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import List, Optional
 from datetime import datetime
-import json
 import os
 import time
 
-from app.core.async_queue import transaction_queue
-from app.core.async_worker import start_worker
-from app.core.redis_client import redis_client
+from app.core.async_queue import TX_QUEUE_BACKEND
+from app.core.backpressure import submit, queue_stats
+from app.core.risk_memory import cache_stats as risk_cache_stats
+from app.core.rate_limiter import rate_limit
+from app.core.async_worker import start_worker, writer_stats
+from app.core.redis_client import redis_client, redis_raw_client
+from app.core.hot_record import decode_records
+from app.core.analytics_store import read_summary
+from app.core.admin_analytics import list_audit_logs, list_frauds
+from app.core.quality_metrics import quality_report, start_label_sync
+from app.core.audit_archive import (
+    AUDIT_ARCHIVER_IN_PROCESS,
+    archive_stats,
+    start_archiver,
+)
+from app.core.metrics import (
+    counters,
+    record_decision,
+    start_metrics_flusher,
+    TOTAL_KEY,
+    DECISION_KEY,
+)
 from app.core.fraud_engine import ProductionFraudEngine
+from app.core import codec, prom_metrics
+from app.core.codec import FastJSONResponse
+from app.core.prom_metrics import (
+    DECISION_LATENCY_SECONDS,
+    DECISION_STAGE_SECONDS,
+    DECISIONS_TOTAL,
+    FAIL_OPEN_TOTAL,
+    RequestStartMiddleware,
+)
 
 # ==================================================
 # App init
 # ==================================================
 app = FastAPI(
     title="UPI Fraud Detection Engine",
-    version="1.2.0"
+    version="1.2.0",
+    # orjson when installed (app.core.codec)
+    default_response_class=FastJSONResponse
 )
 
 # ==================================================
@@ -31,6 +61,9 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# arrival timestamp for the "parse" stage histogram
+app.add_middleware(RequestStartMiddleware)
+
 # ==================================================
 # Security
 # ==================================================
@@ -40,6 +73,10 @@ def verify_api_key(x_api_key: Optional[str] = Header(None)):
     if x_api_key != API_KEY:
         raise HTTPException(status_code=401, detail="Unauthorized")
 
+    # O(1) token bucket per API key, off unless RATE_LIMIT_PER_MIN is set
+    # (RATE_LIMIT_BACKEND=redis → shared across workers)
+    rate_limit(x_api_key)
+
 # ==================================================
 # Engine & governance
 # ==================================================
@@ -48,6 +85,7 @@ engine = ProductionFraudEngine()
 ENGINE_VERSION = "1.2.0"
 POLICY_VERSION = "upi_risk_policy_2026_01"
 MAX_LATENCY_MS = 50
+MAX_BATCH_SIZE = int(os.getenv("MAX_BATCH_SIZE", 500))
 
 REDIS_TX_KEY = "recent_transactions"
 REVIEW_QUEUE_KEY = "review_queue"
@@ -71,6 +109,9 @@ class TransactionRequest(BaseModel):
     first_time_payee: bool = False
     high_value_ratio: float = 0
 
+    # enables the server-side device velocity window
+    device_id: Optional[str] = None
+
     timestamp: Optional[str] = None
 
 # ==================================================
@@ -78,7 +119,19 @@ class TransactionRequest(BaseModel):
 # ==================================================
 @app.on_event("startup")
 def startup_event():
-    start_worker()
+    # redis_stream backend → audits consumed by app.core.stream_consumer
+    if TX_QUEUE_BACKEND == "memory":
+        start_worker()
+    start_metrics_flusher()
+    # reviewer outcomes (review_decisions) → audit_logs.actual_label
+    start_label_sync()
+    # otherwise run `python -m app.core.audit_archive` from cron
+    if AUDIT_ARCHIVER_IN_PROCESS:
+        start_archiver()
+
+@app.on_event("shutdown")
+def shutdown_event():
+    counters.flush()
 
 # ==================================================
 # Health
@@ -92,103 +145,209 @@ def health():
 # ==================================================
 @app.post("/v1/decision")
 def decision_api(
+    request: Request,
     tx: TransactionRequest,
     _: None = Depends(verify_api_key)
 ):
     start = time.perf_counter()
+    _observe_parse(request, start)
 
     if not tx.timestamp:
         tx.timestamp = datetime.utcnow().isoformat()
 
     try:
-        result = engine.evaluate_transaction(tx)
+        result = engine.evaluate_transaction(
+            tx,
+            deadline=start + MAX_LATENCY_MS / 1000
+        )
         decision = result["action"]
 
     except Exception:
         # FAIL-OPEN (RBI safe)
+        FAIL_OPEN_TOTAL.inc("engine_error")
         decision = "ALLOW"
-        result = {
-            "risk_score": 0,
-            "confidence": 0.5,
-            "top_risk_factors": ["FAIL_OPEN"]
-        }
+        result = _fail_open_result()
 
     latency_ms = (time.perf_counter() - start) * 1000
+    DECISION_LATENCY_SECONDS.observe(latency_ms / 1000, "single")
+
+    response = _build_response(tx, decision, result, latency_ms)
+    _publish_decision(tx, response)
+
+    # plain JSON types only: skip jsonable_encoder
+    return FastJSONResponse(response)
+
+# ==================================================
+# 🔥 BATCH DECISION API (PSP bursts, ONE ONNX CALL)
+# ==================================================
+@app.post("/v1/decision/batch")
+def decision_batch_api(
+    request: Request,
+    txs: List[TransactionRequest],
+    _: None = Depends(verify_api_key)
+):
+    if len(txs) > MAX_BATCH_SIZE:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Batch too large (max {MAX_BATCH_SIZE})"
+        )
+
+    start = time.perf_counter()
+    _observe_parse(request, start)
+
+    now = datetime.utcnow().isoformat()
+    for tx in txs:
+        if not tx.timestamp:
+            tx.timestamp = now
+
+    # one fail-open count per transaction, under one reason
+    item_error = "batch_item_error"
+    try:
+        results = engine.evaluate_batch(txs)
+    except Exception:
+        # FAIL-OPEN (whole batch)
+        item_error = "batch_engine_error"
+        results = [None] * len(txs)
+
+    latency_ms = (time.perf_counter() - start) * 1000
+    DECISION_LATENCY_SECONDS.observe(latency_ms / 1000, "batch")
+
+    # each item is held to the single-tx budget by its amortized share,
+    # so a large batch never fails open (BLOCK → ALLOW) just for its size
+    item_ms = latency_ms / max(len(txs), 1)
+
+    responses = []
+    for tx, result in zip(txs, results):
+        if result is None:
+            # FAIL-OPEN (per transaction)
+            FAIL_OPEN_TOTAL.inc(item_error)
+            decision = "ALLOW"
+            result = _fail_open_result()
+        else:
+            decision = result["action"]
+
+        response = _build_response(tx, decision, result, latency_ms, budget_ms=item_ms)
+        _publish_decision(tx, response)
+        responses.append(response)
+
+    return FastJSONResponse(responses)
+
+# ==================================================
+# DECISION HELPERS
+# ==================================================
+def _observe_parse(request, handler_start):
+    # body read + JSON decode + validation + auth / rate limit
+    arrival = getattr(request.state, "t_arrival", None)
+    if arrival is not None:
+        DECISION_STAGE_SECONDS.observe(handler_start - arrival, "parse")
+
+
+def _fail_open_result():
+    return {
+        "risk_score": 0,
+        "confidence": 0.5,
+        "top_risk_factors": ["FAIL_OPEN"]
+    }
+
 
-    if latency_ms > MAX_LATENCY_MS:
+def _build_response(tx, decision, result, latency_ms, budget_ms=None):
+    # budget_ms: time charged against MAX_LATENCY_MS (default: latency_ms)
+    if (latency_ms if budget_ms is None else budget_ms) > MAX_LATENCY_MS:
+        FAIL_OPEN_TOTAL.inc("latency_budget")
         decision = "ALLOW"
         result["top_risk_factors"].append("LATENCY_FAIL_OPEN")
 
-    response = {
+    return {
         "tx_id": tx.tx_id,
         "decision": decision,
         "risk_score": result["risk_score"],
         "confidence": result["confidence"],
+        # True → ML skipped to stay inside MAX_LATENCY_MS (rules-only)
+        "degraded": result.get("degraded", False),
         "engine_version": ENGINE_VERSION,
         "policy_version": POLICY_VERSION,
         "latency_ms": round(latency_ms, 2),
         "timestamp": tx.timestamp
     }
 
-    # --------------------------------------------------
-    # 🔹 Metrics (real-time counters)
-    # --------------------------------------------------
-    redis_client.incr("metric:total_transactions")
-    redis_client.incr(f"metric:decision:{decision}")
 
+def _publish_decision(tx, response):
     # --------------------------------------------------
-    # 🔹 REVIEW workflow
+    # 🔹 Metrics (in-process, flushed to Redis in background)
     # --------------------------------------------------
-    if decision == "REVIEW":
-        redis_client.lpush(
-            REVIEW_QUEUE_KEY,
-            json.dumps(response)
-        )
+    t0 = time.perf_counter()
+    record_decision(response["decision"])
+    DECISIONS_TOTAL.inc(response["decision"])
+    t1 = time.perf_counter()
+    DECISION_STAGE_SECONDS.observe(t1 - t0, "metrics")
 
     # --------------------------------------------------
-    # 🔹 Async audit + dashboard
+    # 🔹 Async audit + dashboard + REVIEW queue
+    # No Redis round-trip on the decision path: the worker
+    # owns every Redis side effect (see async_worker.worker_loop)
+    # Backpressure: ALLOW may be shed, BLOCK/REVIEW never are
     # --------------------------------------------------
-    transaction_queue.put_nowait({
+    submit({
         **response,
         "sender_vpa": tx.sender_vpa,
         "receiver_vpa": tx.receiver_vpa,
         "amount": tx.amount
     })
-
-    return response
+    DECISION_STAGE_SECONDS.observe(time.perf_counter() - t1, "enqueue")
 
 # ==================================================
 # DASHBOARD / ANALYTICS
 # ==================================================
 @app.get("/api/transactions")
 def get_transactions(limit: int = 200):
-    raw = redis_client.lrange(REDIS_TX_KEY, 0, limit - 1)
-    return [json.loads(r) for r in raw]
+    raw = redis_raw_client.lrange(REDIS_TX_KEY, 0, limit - 1)
+    return FastJSONResponse(decode_records(raw))
 
+# Aggregates are maintained by the async worker (analytics_store) over
+# a rolling ANALYTICS_WINDOW_S window, so every endpoint below is one
+# pipelined read of the window's buckets.
 @app.get("/api/analytics/stats")
 def analytics_stats():
-    txs = [json.loads(r) for r in redis_client.lrange(REDIS_TX_KEY, 0, -1)]
-    total = len(txs)
-    fraud = sum(1 for t in txs if t["decision"] == "BLOCK")
+    summary = read_summary()
+    total = summary["total"]
+    fraud = summary["decisions"]["BLOCK"]
     return {
         "total_transactions": total,
         "fraud_transactions": fraud,
-        "fraud_rate": round((fraud / total) * 100, 2) if total else 0
+        "fraud_rate": round((fraud / total) * 100, 2) if total else 0,
+        "window_s": summary["window_s"]
     }
 
 @app.get("/api/analytics/decision-split")
 def decision_split():
-    txs = [json.loads(r) for r in redis_client.lrange(REDIS_TX_KEY, 0, -1)]
-    return {
-        "ALLOW": sum(1 for t in txs if t["decision"] == "ALLOW"),
-        "REVIEW": sum(1 for t in txs if t["decision"] == "REVIEW"),
-        "BLOCK": sum(1 for t in txs if t["decision"] == "BLOCK"),
-    }
+    return read_summary()["decisions"]
 
 @app.get("/api/analytics/risk-distribution")
 def risk_distribution():
-    txs = [json.loads(r) for r in redis_client.lrange(REDIS_TX_KEY, 0, -1)]
-    return [t.get("risk_score", 0) for t in txs]
+    # { "0-9": n, "10-19": n, ..., "90-100": n }
+    return read_summary()["risk_histogram"]
+
+# ==================================================
+# AUDIT BROWSING (keyset pagination)
+# ==================================================
+# Pass the previous page's next_cursor to get the next page.
+@app.get("/api/audit/logs")
+def audit_logs(limit: int = Query(50, ge=1, le=500), cursor: Optional[str] = None, decision: Optional[str] = None):
+    try:
+        return list_audit_logs(
+            limit=limit,
+            cursor=cursor,
+            decision=decision.upper() if decision else None
+        )
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+@app.get("/api/audit/frauds")
+def audit_frauds(limit: int = Query(50, ge=1, le=500), cursor: Optional[str] = None):
+    try:
+        return list_frauds(limit=limit, cursor=cursor)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
 
 # ==================================================
 # REVIEW MANAGEMENT
@@ -196,7 +355,7 @@ def risk_distribution():
 @app.get("/api/review/queue")
 def review_queue(limit: int = 50):
     raw = redis_client.lrange(REVIEW_QUEUE_KEY, 0, limit - 1)
-    return [json.loads(r) for r in raw]
+    return FastJSONResponse([codec.loads(r) for r in raw])
 
 @app.post("/api/review/decision")
 def review_decision(tx_id: str, decision: str):
@@ -206,7 +365,7 @@ def review_decision(tx_id: str, decision: str):
 
     redis_client.lpush(
         "review_decisions",
-        json.dumps({
+        codec.dumps({
             "tx_id": tx_id,
             "final_decision": decision,
             "timestamp": datetime.utcnow().isoformat()
@@ -215,16 +374,91 @@ def review_decision(tx_id: str, decision: str):
 
     return {"status": "UPDATED", "tx_id": tx_id, "decision": decision}
 
+# Confusion matrix + precision / recall per policy version,
+# fed by reviewer outcomes and bulk label files (quality_metrics)
+@app.get("/api/quality/metrics")
+def quality_metrics():
+    return quality_report()
+
 # ==================================================
 # METRICS
 # ==================================================
 @app.get("/api/metrics")
 def metrics():
-    return {
-        "total": int(redis_client.get("metric:total_transactions") or 0),
-        "allow": int(redis_client.get("metric:decision:ALLOW") or 0),
-        "review": int(redis_client.get("metric:decision:REVIEW") or 0),
-        "block": int(redis_client.get("metric:decision:BLOCK") or 0),
+    # all processes (Redis) + this process's unflushed deltas
+    merged = counters.read([
+        TOTAL_KEY,
+        DECISION_KEY.format("ALLOW"),
+        DECISION_KEY.format("REVIEW"),
+        DECISION_KEY.format("BLOCK"),
+    ])
+
+    data = {
+        "total": merged[TOTAL_KEY],
+        "allow": merged[DECISION_KEY.format("ALLOW")],
+        "review": merged[DECISION_KEY.format("REVIEW")],
+        "block": merged[DECISION_KEY.format("BLOCK")],
     }
 
+    # per-process audit group-commit stats
+    data["audit_writer"] = writer_stats()
+
+    # per-process audit queue depth + shed counters
+    data["audit_queue"] = queue_stats()
+
+    # per-process risk-memory near-cache (hit ratio / evictions)
+    data["risk_cache"] = risk_cache_stats()
+
+    # per-process decision stage timings (rules / features / ml / explain)
+    data["engine_stages"] = engine.stage_timer.stats()
+
+    # per-process ML micro-batching stats (if enabled)
+    if engine.batcher:
+        data["ml_batching"] = engine.batcher.stats()
+
+    # cold audit tier (compressed day partitions)
+    data["audit_archive"] = archive_stats()
+
+    return data
+
+# ==================================================
+# PROMETHEUS (/metrics, text format 0.0.4, per process)
+# ==================================================
+_SHED_EVENTS = (
+    "dashboard_skipped", "sampled_out", "dropped_full", "block_timeout",
+    "critical_overflow", "critical_dropped", "shed_error",
+)
+
+# one queue_stats() per scrape (XLEN round-trip in stream mode)
+_audit_queue_metrics = prom_metrics.GaugeGroup("audit_queue", queue_stats)
+_audit_queue_metrics.gauge(
+    "fraud_audit_queue_depth",
+    "Audit queue depth (memory backend)",
+    lambda s: s["depth"],
+)
+_audit_queue_metrics.gauge(
+    "fraud_audit_critical_queue_depth",
+    "BLOCK / REVIEW overflow queue depth (memory backend)",
+    lambda s: s["critical_depth"],
+)
+_audit_queue_metrics.gauge(
+    "fraud_audit_queue_capacity",
+    "Audit queue maxsize (0 = unbounded)",
+    lambda s: s["capacity"],
+)
+_audit_queue_metrics.gauge(
+    "fraud_audit_queue_events_total",
+    "Audit queue backpressure events",
+    lambda s: {(e,): s[e] for e in _SHED_EVENTS},
+    labelnames=("event",),
+    kind="counter",
+)
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def prometheus_metrics():
+    return PlainTextResponse(
+        prom_metrics.render(),
+        media_type="text/plain; version=0.0.4"
+    )
+
 
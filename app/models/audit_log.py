@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime
+from sqlalchemy import Column, Integer, String, Float, DateTime, Index
 from datetime import datetime
 
 from app.core.database import Base
@@ -7,6 +7,13 @@ from app.core.database import Base
 class AuditLog(Base):
     __tablename__ = "audit_logs"
 
+    # keyset pagination: (decision, timestamp) and (timestamp);
+    # SQLite appends the rowid (id) to every index → stable tiebreak
+    __table_args__ = (
+        Index("ix_audit_logs_decision_timestamp", "decision", "timestamp"),
+        Index("ix_audit_logs_timestamp", "timestamp"),
+    )
+
     id = Column(Integer, primary_key=True, index=True)
 
     tx_id = Column(String, index=True, nullable=False)
@@ -18,7 +25,12 @@ class AuditLog(Base):
     risk_score = Column(Integer, nullable=False)
     confidence = Column(Float, nullable=False)
 
-    decision = Column(String, index=True, nullable=False)
+    # covered by ix_audit_logs_decision_timestamp (leading column)
+    decision = Column(String, nullable=False)
     reason = Column(String, nullable=True)
 
+    # decision lineage + ground truth (FRAUD | LEGIT), set by label ingestion
+    policy_version = Column(String, nullable=True)
+    actual_label = Column(String, nullable=True)
+
     timestamp = Column(DateTime, default=datetime.utcnow, nullable=False)
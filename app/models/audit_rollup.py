@@ -0,0 +1,32 @@
+from sqlalchemy import Column, Integer, String, Float, DateTime
+
+from app.core.database import Base
+
+# risk-score histogram: bucket i covers [10*i, 10*i + 9], last bucket 90-100
+RISK_HIST_BUCKETS = 10
+
+
+class AuditRollup(Base):
+    """
+    Per-hour / per-day aggregates of audit_logs,
+    maintained incrementally by the audit writer
+    """
+    __tablename__ = "audit_rollups"
+
+    granularity = Column(String, primary_key=True)      # "hour" | "day"
+    bucket_start = Column(DateTime, primary_key=True)
+    decision = Column(String, primary_key=True)
+
+    tx_count = Column(Integer, nullable=False, default=0)
+    amount_sum = Column(Float, nullable=False, default=0.0)
+
+    risk_b0 = Column(Integer, nullable=False, default=0)
+    risk_b1 = Column(Integer, nullable=False, default=0)
+    risk_b2 = Column(Integer, nullable=False, default=0)
+    risk_b3 = Column(Integer, nullable=False, default=0)
+    risk_b4 = Column(Integer, nullable=False, default=0)
+    risk_b5 = Column(Integer, nullable=False, default=0)
+    risk_b6 = Column(Integer, nullable=False, default=0)
+    risk_b7 = Column(Integer, nullable=False, default=0)
+    risk_b8 = Column(Integer, nullable=False, default=0)
+    risk_b9 = Column(Integer, nullable=False, default=0)
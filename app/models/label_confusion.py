@@ -0,0 +1,18 @@
+from sqlalchemy import Column, Integer, String
+
+from app.core.database import Base
+
+
+class LabelConfusion(Base):
+    """
+    Running confusion matrix per policy version:
+    one counter per (policy_version, decision, actual_label),
+    maintained by the label ingester
+    """
+    __tablename__ = "label_confusion"
+
+    policy_version = Column(String, primary_key=True)
+    decision = Column(String, primary_key=True)         # ALLOW | REVIEW | BLOCK
+    actual_label = Column(String, primary_key=True)     # FRAUD | LEGIT
+
+    count = Column(Integer, nullable=False, default=0)
@@ -0,0 +1,139 @@
+"""
+Audit tiers: SQLite-only vs hot SQLite + compressed day partitions
+
+Generates --rows audit rows spread over --days days in a throw-away
+SQLite file, archives everything older than --hot-days, then compares
+on-disk size and a month-long BLOCK scan (amount + risk_score columns).
+
+Run from project root:
+    python -m benchmarks.bench_audit_archive --rows 2000000 --days 90 --fake-redis
+"""
+import argparse
+import os
+import shutil
+import sqlite3
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine
+
+from benchmarks.common import use_redis
+from benchmarks.bench_audit_pagination import DECISIONS
+
+
+def populate(path, rows, days, end, chunk=100000):
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA journal_mode=OFF")
+    conn.execute("PRAGMA synchronous=OFF")
+
+    start = end - timedelta(days=days)
+    step_us = days * 86400 * 1000000 // rows
+
+    for lo in range(0, rows, chunk):
+        conn.executemany(
+            """
+            INSERT INTO audit_logs
+                (tx_id, amount, sender_vpa, receiver_vpa, risk_score,
+                 confidence, decision, reason, timestamp)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            (
+                (
+                    f"tx{i:010d}",
+                    float(100 + i % 30000),
+                    f"user{i % 50000}@upi",
+                    f"shop{i % 7000}@upi",
+                    (i * 37) % 101,
+                    0.9,
+                    DECISIONS[(i * 7) % len(DECISIONS)],
+                    "Rules" if i % 3 else None,
+                    (start + timedelta(microseconds=step_us * i)).strftime("%Y-%m-%d %H:%M:%S.%f"),
+                )
+                for i in range(lo, min(lo + chunk, rows))
+            ),
+        )
+        conn.commit()
+    conn.close()
+
+
+def dir_bytes(path):
+    return sum(
+        os.path.getsize(os.path.join(root, f))
+        for root, _, files in os.walk(path)
+        for f in files
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=2000000)
+    parser.add_argument("--days", type=int, default=90)
+    parser.add_argument("--hot-days", type=int, default=7)
+    parser.add_argument("--fake-redis", action="store_true")
+    args = parser.parse_args()
+
+    use_redis(args.fake_redis)
+
+    from app.core.database import Base
+    from app.models.audit_log import AuditLog
+    from app.core import admin_analytics, audit_archive
+
+    now = datetime(2024, 6, 1)
+    scan_from = now - timedelta(days=min(args.days, 60))
+    scan_to = scan_from + timedelta(days=30)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "audit.db")
+        engine = create_engine(f"sqlite:///{path}")
+        Base.metadata.create_all(bind=engine, tables=[AuditLog.__table__])
+        engine.dispose()
+
+        populate(path, args.rows, args.days, now)
+
+        # baseline: same query against a SQLite-only copy
+        baseline = os.path.join(tmp, "baseline.db")
+        shutil.copy(path, baseline)
+
+        conn = sqlite3.connect(baseline)
+        t0 = time.perf_counter()
+        sql_rows = conn.execute(
+            """
+            SELECT amount, risk_score FROM audit_logs
+            WHERE decision = 'BLOCK' AND timestamp >= ? AND timestamp < ?
+            """,
+            (scan_from.strftime("%Y-%m-%d %H:%M:%S.%f"),
+             scan_to.strftime("%Y-%m-%d %H:%M:%S.%f")),
+        ).fetchall()
+        sql_s = time.perf_counter() - t0
+        conn.close()
+
+        admin_analytics.DB_PATH = path
+        audit_archive.AUDIT_ARCHIVE_DIR = os.path.join(tmp, "archive")
+
+        t0 = time.perf_counter()
+        moved = audit_archive.archive_old_partitions(hot_days=args.hot_days, now=now)
+        archive_s = time.perf_counter() - t0
+
+        conn = sqlite3.connect(path)
+        conn.execute("VACUUM")
+        conn.close()
+
+        t0 = time.perf_counter()
+        cols = audit_archive.read_audit(
+            scan_from, scan_to, ["BLOCK"], columns=("amount", "risk_score")
+        )
+        tier_s = time.perf_counter() - t0
+
+        assert len(cols["amount"]) == len(sql_rows)
+
+        print(f"archived {moved:,} rows in {archive_s:.1f}s ({moved / archive_s:,.0f} rows/s)")
+        print(f"sqlite only : {os.path.getsize(baseline) / 1e6:>8.1f} MB")
+        print(f"hot sqlite  : {os.path.getsize(path) / 1e6:>8.1f} MB")
+        print(f"cold archive: {dir_bytes(audit_archive.AUDIT_ARCHIVE_DIR) / 1e6:>8.1f} MB")
+        print(f"30-day BLOCK scan ({len(sql_rows):,} rows): "
+              f"sqlite {sql_s * 1000:.0f} ms | tiered {tier_s * 1000:.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,185 @@
+"""
+Audit browsing: LIMIT/OFFSET vs keyset pagination, with and without
+the (decision, timestamp) / (timestamp) indexes
+
+Builds a throw-away SQLite file with --rows audit rows (never touches
+fraud_audit.db). 10M rows take a few minutes to load and ~1.5GB of disk;
+use --rows 1000000 for a quick run.
+
+Run from project root:
+    python -m benchmarks.bench_audit_pagination --rows 10000000 --fake-redis
+"""
+import argparse
+import os
+import sqlite3
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine
+
+from benchmarks.common import use_redis, summarize
+
+DECISIONS = ("ALLOW",) * 16 + ("REVIEW",) * 3 + ("BLOCK",)
+
+
+def populate(path, rows, chunk=100000):
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA journal_mode=OFF")
+    conn.execute("PRAGMA synchronous=OFF")
+
+    # same storage format as SQLAlchemy's SQLite DateTime
+    start = datetime(2024, 1, 1)
+    for lo in range(0, rows, chunk):
+        conn.executemany(
+            """
+            INSERT INTO audit_logs
+                (tx_id, amount, sender_vpa, receiver_vpa, risk_score,
+                 confidence, decision, reason, timestamp)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            (
+                (
+                    f"tx{i:010d}",
+                    float(100 + i % 30000),
+                    f"user{i % 50000}@upi",
+                    f"shop{i % 7000}@upi",
+                    (i * 37) % 101,
+                    0.9,
+                    DECISIONS[(i * 7) % len(DECISIONS)],
+                    "bench",
+                    (start + timedelta(milliseconds=50 * i)).strftime("%Y-%m-%d %H:%M:%S.%f"),
+                )
+                for i in range(lo, min(lo + chunk, rows))
+            ),
+        )
+        conn.commit()
+    conn.close()
+
+
+def offset_page(cur, decision, page, limit):
+    cur.execute(
+        """
+        SELECT id, tx_id, amount, risk_score, timestamp
+        FROM audit_logs
+        WHERE decision = ?
+        ORDER BY timestamp DESC, id DESC
+        LIMIT ? OFFSET ?
+        """,
+        (decision, limit, page * limit),
+    )
+    return cur.fetchall()
+
+
+def keyset_page(cur, decision, cursor, limit):
+    if cursor is None:
+        cur.execute(
+            """
+            SELECT id, tx_id, amount, risk_score, timestamp
+            FROM audit_logs
+            WHERE decision = ?
+            ORDER BY timestamp DESC, id DESC
+            LIMIT ?
+            """,
+            (decision, limit),
+        )
+    else:
+        cur.execute(
+            """
+            SELECT id, tx_id, amount, risk_score, timestamp
+            FROM audit_logs
+            WHERE decision = ? AND (timestamp, id) < (?, ?)
+            ORDER BY timestamp DESC, id DESC
+            LIMIT ?
+            """,
+            (decision, cursor[0], cursor[1], limit),
+        )
+    return cur.fetchall()
+
+
+def cursor_at(cur, decision, page, limit):
+    """
+    Cursor a client would hold after paging `page` times
+    """
+    rows = offset_page(cur, decision, page - 1, limit) if page else []
+    return (rows[-1][4], rows[-1][0]) if rows else None
+
+
+def run(cur, decision, pages, limit, repeat):
+    out = {}
+    for page in pages:
+        cursor = cursor_at(cur, decision, page, limit)
+
+        for mode in ("offset", "keyset"):
+            samples = []
+            for _ in range(repeat):
+                t0 = time.perf_counter()
+                if mode == "offset":
+                    offset_page(cur, decision, page, limit)
+                else:
+                    keyset_page(cur, decision, cursor, limit)
+                samples.append((time.perf_counter() - t0) * 1000)
+            out[(mode, page)] = summarize(samples)
+    return out
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=10000000)
+    parser.add_argument("--limit", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--decision", default="BLOCK")
+    parser.add_argument("--skip-unindexed", action="store_true")
+    parser.add_argument("--fake-redis", action="store_true")
+    args = parser.parse_args()
+
+    use_redis(args.fake_redis)
+
+    from app.core.database import Base
+    from app.models.audit_log import AuditLog
+
+    per_decision = args.rows * DECISIONS.count(args.decision) // len(DECISIONS)
+    max_page = max(1, per_decision // args.limit - 1)
+    pages = sorted({p for p in (0, 10, 1000, max_page // 2, max_page) if p <= max_page})
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "pagination.db")
+
+        engine = create_engine(f"sqlite:///{path}")
+        Base.metadata.create_all(bind=engine, tables=[AuditLog.__table__])
+
+        # load without secondary indexes, then build them once
+        conn = sqlite3.connect(path)
+        for index in AuditLog.__table__.indexes:
+            conn.execute(f"DROP INDEX IF EXISTS {index.name}")
+        conn.close()
+
+        t0 = time.perf_counter()
+        populate(path, args.rows)
+        print(f"loaded {args.rows:,} rows in {time.perf_counter() - t0:.1f}s")
+
+        variants = ["indexed"] if args.skip_unindexed else ["unindexed", "indexed"]
+
+        for variant in variants:
+            if variant == "indexed":
+                t0 = time.perf_counter()
+                for index in AuditLog.__table__.indexes:
+                    index.create(bind=engine, checkfirst=True)
+                print(f"built indexes in {time.perf_counter() - t0:.1f}s")
+
+            conn = sqlite3.connect(path)
+            cur = conn.cursor()
+            results = run(cur, args.decision, pages, args.limit, args.repeat)
+            conn.close()
+
+            print(f"\n[{variant}] decision={args.decision} limit={args.limit}")
+            for page in pages:
+                off = results[("offset", page)]["p50_ms"]
+                key = results[("keyset", page)]["p50_ms"]
+                print(f"  page {page:>8,}: offset p50 {off:>10.3f} ms | keyset p50 {key:>8.3f} ms")
+
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+Audit writer: one commit per row vs group commit
+
+Runs against a throw-away SQLite file (never touches fraud_audit.db).
+
+Run from project root:
+    python -m benchmarks.bench_audit_writer --rows 20000 --fake-redis
+"""
+import argparse
+import os
+import tempfile
+import time
+from datetime import datetime
+from types import SimpleNamespace
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from benchmarks.common import use_redis, sample_tx
+
+
+def make_items(n):
+    now = datetime.utcnow().isoformat()
+    items = []
+    for i in range(n):
+        tx = SimpleNamespace(**sample_tx(i), timestamp=now)
+        result = {"decision": "ALLOW", "risk_score": 10, "confidence": 0.9}
+        items.append((tx, result))
+    return items
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=20000)
+    parser.add_argument("--batch", type=int, default=200)
+    parser.add_argument("--fake-redis", action="store_true")
+    args = parser.parse_args()
+
+    use_redis(args.fake_redis)
+
+    from app.core.database import Base
+    from app.core.audit_logger import build_audit_row, log_decision, log_decisions
+    from app.models.audit_log import AuditLog  # noqa: F401 (registers table)
+
+    items = make_items(args.rows)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        results = {}
+
+        for mode in ("per_row", "group"):
+            engine = create_engine(f"sqlite:///{os.path.join(tmp, mode + '.db')}")
+            Base.metadata.create_all(bind=engine)
+            db = sessionmaker(bind=engine)()
+
+            start = time.perf_counter()
+            if mode == "per_row":
+                for tx, result in items:
+                    log_decision(tx, result, db)
+            else:
+                for lo in range(0, len(items), args.batch):
+                    chunk = items[lo:lo + args.batch]
+                    log_decisions([build_audit_row(tx, r) for tx, r in chunk], db)
+            elapsed = time.perf_counter() - start
+
+            db.close()
+            engine.dispose()
+            results[mode] = elapsed
+
+    for mode, elapsed in results.items():
+        print(f"{mode:>8}: {args.rows / elapsed:>10,.0f} rows/s  ({elapsed:.2f}s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""
+Backtest throughput vs worker processes (A/B policy replay)
+
+Run from project root:
+    python -m benchmarks.bench_backtest --rows 200000 --fake-redis
+"""
+import argparse
+import json
+import os
+import tempfile
+
+from benchmarks.common import use_redis, sample_tx
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=200000)
+    parser.add_argument("--workers", default=None, help="comma list, default 1,2,4..cpus")
+    parser.add_argument("--fake-redis", action="store_true")
+    args = parser.parse_args()
+
+    use_redis(args.fake_redis)
+
+    from app.core.backtest import parse_policy, run_backtest
+
+    cpus = os.cpu_count() or 1
+    if args.workers:
+        counts = [int(w) for w in args.workers.split(",")]
+    else:
+        counts = sorted({1, cpus} | {w for w in (2, 4, 8, 16) if w < cpus})
+
+    policies = [parse_policy(""), parse_policy("ALLOW_MAX_RISK=20,ML_BLOCK_THRESHOLD=0.5")]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "traffic.jsonl")
+        with open(path, "w") as f:
+            for i in range(args.rows):
+                f.write(json.dumps(sample_tx(i)) + "\n")
+
+        base = None
+        for workers in counts:
+            report = run_backtest(path, policies, workers=workers)
+            base = base or report["tx_per_s"]
+            print(
+                f"workers {workers:>3}: {report['tx_per_s']:>10,.0f} tx/s "
+                f"(x{report['tx_per_s'] / base:.2f}) flips={report['flips']}"
+            )
+
+
+if __name__ == "__main__":
+    main()
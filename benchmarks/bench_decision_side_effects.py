@@ -0,0 +1,77 @@
+"""
+/v1/decision latency: inline Redis side effects vs worker hand-off
+
+Before: decision_api did INCR + INCR (+ LPUSH review_queue) itself.
+After : decision_api only enqueues; the async worker owns Redis writes.
+
+Run from project root:
+    REDIS_URL=redis://localhost:6379/0 python -m benchmarks.bench_decision_side_effects
+    python -m benchmarks.bench_decision_side_effects --fake-redis
+"""
+import argparse
+import json
+import threading
+
+from starlette.requests import Request
+
+from benchmarks.common import use_redis, sample_tx, timed
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--n", type=int, default=5000)
+    parser.add_argument("--fake-redis", action="store_true")
+    args = parser.parse_args()
+
+    use_redis(args.fake_redis)
+
+    from app import main as api
+    from app.core.async_queue import transaction_queue
+
+    def drain():
+        while True:
+            transaction_queue.get()
+            transaction_queue.task_done()
+
+    threading.Thread(target=drain, daemon=True).start()
+
+    def legacy_publish(tx, response):
+        decision = response["decision"]
+        api.redis_client.incr("metric:total_transactions")
+        api.redis_client.incr(f"metric:decision:{decision}")
+        if decision == "REVIEW":
+            api.redis_client.lpush(api.REVIEW_QUEUE_KEY, json.dumps(response))
+        transaction_queue.put_nowait({
+            **response,
+            "sender_vpa": tx.sender_vpa,
+            "receiver_vpa": tx.receiver_vpa,
+            "amount": tx.amount
+        })
+
+    txs = [api.TransactionRequest(**sample_tx(i)) for i in range(args.n)]
+
+    # direct call, no middleware: no t_arrival → parse stage not observed
+    request = Request({"type": "http", "method": "POST", "path": "/v1/decision", "headers": []})
+
+    def call(i):
+        api.decision_api(request, txs[i].model_copy())
+
+    handoff_publish = api._publish_decision
+
+    results = {}
+    for name, publish in (("inline", legacy_publish), ("handoff", handoff_publish)):
+        api._publish_decision = publish
+        timed(call, min(500, args.n))  # warm-up
+        results[name] = timed(call, args.n)
+
+    api._publish_decision = handoff_publish
+
+    for name, r in results.items():
+        print(
+            f"{name:>8}: p50={r['p50_ms']:.3f} ms  p99={r['p99_ms']:.3f} ms  "
+            f"{r['ops_per_s']:,.0f} decisions/s"
+        )
+
+
+if __name__ == "__main__":
+    main()
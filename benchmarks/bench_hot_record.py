@@ -0,0 +1,116 @@
+"""
+recent_transactions record format: bytes per record and decode throughput
+JSON (stdlib / app.core.codec) vs binary v2 (app.core.hot_record)
+
+Run from project root:
+    REDIS_URL=redis://localhost:6379/0 python -m benchmarks.bench_hot_record
+    python -m benchmarks.bench_hot_record --fake-redis   (no MEMORY USAGE)
+"""
+import argparse
+import json
+import time
+from datetime import datetime
+
+from benchmarks.common import use_redis, sample_tx
+
+DECISIONS = ("ALLOW", "ALLOW", "ALLOW", "REVIEW", "BLOCK")
+BENCH_KEY = "bench:recent_transactions"
+
+
+def make_records(n):
+    now = datetime.utcnow()
+    records = []
+    for i in range(n):
+        tx = sample_tx(i)
+        records.append({
+            "tx_id": tx["tx_id"],
+            "amount": tx["amount"],
+            "sender_vpa": tx["sender_vpa"],
+            "receiver_vpa": tx["receiver_vpa"],
+            "decision": DECISIONS[i % len(DECISIONS)],
+            "risk_score": (i * 17) % 100,
+            "confidence": round(0.5 + (i % 50) / 100, 2),
+            "latency_ms": round(0.05 + (i % 400) / 100, 2),
+            "engine_version": "1.2.0",
+            "policy_version": "upi_risk_policy_2026_01",
+            "timestamp": now.replace(microsecond=(i * 7919) % 1000000).isoformat(),
+        })
+    return records
+
+
+def rate(fn, items, rounds):
+    start = time.perf_counter()
+    for _ in range(rounds):
+        fn(items)
+    return len(items) * rounds / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--records", type=int, default=1000, help="list length (LTRIM 0 999)")
+    parser.add_argument("--rounds", type=int, default=50)
+    parser.add_argument("--new-per-refresh", type=int, default=20,
+                        help="records pushed between two dashboard refreshes")
+    parser.add_argument("--fake-redis", action="store_true")
+    args = parser.parse_args()
+
+    use_redis(args.fake_redis)
+
+    from app.core import codec, hot_record
+    from app.core.redis_client import redis_raw_client
+
+    records = make_records(args.records + args.new_per_refresh * args.rounds)
+    window = records[:args.records]
+
+    formats = {
+        "json (stdlib)": [json.dumps(r).encode() for r in window],
+        f"json ({codec.CODEC_NAME})": [codec.dumps(r) for r in window],
+        "binary v2": [hot_record.encode_record(r) for r in window],
+    }
+    assert all(b[0] == hot_record.RECORD_V2 for b in formats["binary v2"])
+    assert all(hot_record.decode_record(b) == r for b, r in zip(formats["binary v2"], window))
+
+    print(f"{'format':>16} {'B/record':>9} {'redis B/record':>15}")
+    for name, values in formats.items():
+        avg = sum(map(len, values)) / len(values)
+        redis_raw_client.delete(BENCH_KEY)
+        redis_raw_client.rpush(BENCH_KEY, *values)
+        try:
+            used = redis_raw_client.memory_usage(BENCH_KEY, samples=0) / len(values)
+            used = f"{used:.1f}"
+        except Exception:
+            used = "n/a"
+        print(f"{name:>16} {avg:>9.1f} {used:>15}")
+    redis_raw_client.delete(BENCH_KEY)
+
+    # --------------------------------------------------
+    # Decode: one full list (cold) per round
+    # --------------------------------------------------
+    print(f"\n{'decode (cold)':>16} {'records/s':>12}")
+    for name, fn, values in (
+        ("json (stdlib)", lambda vs: [json.loads(v) for v in vs], formats["json (stdlib)"]),
+        (f"json ({codec.CODEC_NAME})", lambda vs: [codec.loads(v) for v in vs], formats[f"json ({codec.CODEC_NAME})"]),
+        ("binary v2", lambda vs: [hot_record.decode_record(v) for v in vs], formats["binary v2"]),
+    ):
+        print(f"{name:>16} {rate(fn, values, args.rounds):>12,.0f}")
+
+    # --------------------------------------------------
+    # Dashboard refresh: LRANGE 0 999 after N new LPUSHes
+    # --------------------------------------------------
+    encoded = [hot_record.encode_record(r) for r in records]
+    total = args.records
+
+    start = time.perf_counter()
+    for i in range(args.rounds):
+        head = args.new_per_refresh * (i + 1)
+        hot_record.decode_records(encoded[head:head + total][::-1])
+    elapsed = time.perf_counter() - start
+    print(
+        f"\nrefresh with decode_records ({args.new_per_refresh} new of {total}): "
+        f"{elapsed / args.rounds * 1000:.2f} ms/refresh, "
+        f"{total * args.rounds / elapsed:,.0f} records/s"
+    )
+
+
+if __name__ == "__main__":
+    main()
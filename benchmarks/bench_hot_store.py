@@ -0,0 +1,78 @@
+"""
+Worker Redis hot-store: per-message commands vs one pipeline per batch
+
+Run from project root:
+    REDIS_URL=redis://localhost:6379/0 python -m benchmarks.bench_hot_store
+    python -m benchmarks.bench_hot_store --fake-redis
+"""
+import argparse
+import time
+from datetime import datetime
+from types import SimpleNamespace
+
+from benchmarks.common import use_redis, sample_tx
+
+DECISIONS = ("ALLOW", "ALLOW", "ALLOW", "REVIEW", "BLOCK")
+
+
+def make_items(n):
+    now = datetime.utcnow().isoformat()
+    items = []
+    for i in range(n):
+        tx = SimpleNamespace(**sample_tx(i), timestamp=now)
+        result = {
+            "decision": DECISIONS[i % len(DECISIONS)],
+            "risk_score": (i * 17) % 100,
+            "confidence": 0.8,
+        }
+        payload = SimpleNamespace(
+            engine_version="1.2.0",
+            policy_version="upi_risk_policy_2026_01",
+            latency_ms=1.2,
+        )
+        items.append((payload, tx, result, 0.1))
+    return items
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=20000)
+    parser.add_argument("--batch", type=int, default=200)
+    parser.add_argument("--fake-redis", action="store_true")
+    args = parser.parse_args()
+
+    use_redis(args.fake_redis)
+
+    from app.core import async_worker as w
+    from app.core.hot_record import decode_record
+    from app.core.redis_client import redis_client, redis_raw_client
+
+    items = make_items(args.rows)
+
+    def per_message(chunk):
+        for payload, tx, result, latency_ms in chunk:
+            redis_client.lpush(w.REDIS_TX_KEY, w._hot_record(payload, tx, result, latency_ms))
+            redis_client.ltrim(w.REDIS_TX_KEY, 0, 999)
+            if result["decision"] == "REVIEW":
+                redis_client.lpush(w.REVIEW_QUEUE_KEY, w._review_record(payload, tx, result))
+            redis_client.incr("metric:total_transactions")
+            redis_client.incr(f"metric:decision:{result['decision']}")
+
+    results = {}
+    for name, fn in (("per_message", per_message), ("pipelined", w.publish_hot_store)):
+        redis_client.delete(w.REDIS_TX_KEY, w.REVIEW_QUEUE_KEY)
+
+        start = time.perf_counter()
+        for lo in range(0, len(items), args.batch):
+            fn(items[lo:lo + args.batch])
+        results[name] = time.perf_counter() - start
+
+        head = decode_record(redis_raw_client.lindex(w.REDIS_TX_KEY, 0))
+        assert head["tx_id"] == items[-1][1].tx_id
+
+    for name, elapsed in results.items():
+        print(f"{name:>12}: {args.rows / elapsed:>10,.0f} tx/s  ({elapsed:.2f}s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+JSON cost per decision and per dashboard refresh: stdlib json vs app.core.codec
+
+Per decision   : API response (jsonable_encoder + JSONResponse before)
+                 + hot-store record + review-queue record (worker)
+Per dashboard  : /api/transactions?limit=1000 → 1,000 loads + response render
+
+Run from project root:
+    python -m benchmarks.bench_json_codec
+    JSON_CODEC=json python -m benchmarks.bench_json_codec   # codec fallback
+"""
+import argparse
+import json
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from app.core import codec
+from app.core.codec import FastJSONResponse
+from benchmarks.common import sample_tx, timed
+
+
+def _records(i):
+    tx = sample_tx(i)
+    response = {
+        "tx_id": tx["tx_id"],
+        "decision": ("ALLOW", "REVIEW", "BLOCK")[i % 3],
+        "risk_score": (i * 17) % 100,
+        "confidence": 0.5 + (i % 50) / 100,
+        "degraded": False,
+        "engine_version": "v2.0-hybrid-onnx",
+        "policy_version": "RBI-2025-01",
+        "latency_ms": round(1 + (i % 300) / 100, 2),
+        "timestamp": "2026-01-15T10:30:00.123456",
+    }
+    hot = {
+        **{k: response[k] for k in ("tx_id", "decision", "risk_score", "confidence",
+                                    "latency_ms", "engine_version", "policy_version",
+                                    "timestamp")},
+        "amount": tx["amount"],
+        "sender_vpa": tx["sender_vpa"],
+        "receiver_vpa": tx["receiver_vpa"],
+    }
+    return response, hot
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--n", type=int, default=20000, help="decisions")
+    parser.add_argument("--refreshes", type=int, default=300)
+    parser.add_argument("--limit", type=int, default=1000, help="records per dashboard refresh")
+    args = parser.parse_args()
+
+    pool = [_records(i) for i in range(1000)]
+
+    def decision_stdlib(i):
+        response, hot = pool[i % 1000]
+        JSONResponse(jsonable_encoder(response))
+        json.dumps(hot)
+        json.dumps(response)
+
+    def decision_codec(i):
+        response, hot = pool[i % 1000]
+        FastJSONResponse(response)
+        codec.dumps(hot)
+        codec.dumps(response)
+
+    # what LRANGE returns (decode_responses=True → str)
+    stored_stdlib = [json.dumps(pool[i % 1000][1]) for i in range(args.limit)]
+    stored_codec = [codec.dumps(pool[i % 1000][1]).decode() for i in range(args.limit)]
+
+    def dashboard_stdlib(i):
+        JSONResponse(jsonable_encoder([json.loads(r) for r in stored_stdlib]))
+
+    def dashboard_codec(i):
+        FastJSONResponse([codec.loads(r) for r in stored_codec])
+
+    print(f"codec: {codec.CODEC_NAME}")
+    print(f"hot record: {len(stored_stdlib[0])} B stdlib, {len(stored_codec[0])} B codec")
+
+    for label, before, after, n in (
+        ("per decision", decision_stdlib, decision_codec, args.n),
+        (f"per dashboard refresh ({args.limit} rows)", dashboard_stdlib, dashboard_codec, args.refreshes),
+    ):
+        timed(before, n // 10)
+        timed(after, n // 10)
+        a = timed(before, n)
+        b = timed(after, n)
+        saved_us = (a["mean_ms"] - b["mean_ms"]) * 1000
+        print(
+            f"{label:>36}: stdlib {a['mean_ms'] * 1000:>9.1f} µs → codec "
+            f"{b['mean_ms'] * 1000:>9.1f} µs  (saves {saved_us:,.1f} µs, "
+            f"x{a['mean_ms'] / b['mean_ms']:.1f})"
+        )
+
+
+if __name__ == "__main__":
+    main()
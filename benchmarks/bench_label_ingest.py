@@ -0,0 +1,76 @@
+"""
+Label ingestion: connection + UPDATE + commit per label vs bulk ingest
+
+Runs against a throw-away SQLite file (never touches fraud_audit.db).
+
+Run from project root:
+    python -m benchmarks.bench_label_ingest --rows 200000 --labels 5000 --fake-redis
+"""
+import argparse
+import os
+import sqlite3
+import tempfile
+import time
+
+from sqlalchemy import create_engine
+
+from benchmarks.common import use_redis
+from benchmarks.bench_audit_pagination import populate
+
+
+def per_label(path, labels):
+    # pre-bulk behaviour: one connection, UPDATE and commit per label
+    for tx_id, label in labels:
+        conn = sqlite3.connect(path)
+        conn.execute(
+            "UPDATE audit_logs SET actual_label = ? WHERE tx_id = ?",
+            (label, tx_id)
+        )
+        conn.commit()
+        conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=200000)
+    parser.add_argument("--labels", type=int, default=5000)
+    parser.add_argument("--fake-redis", action="store_true")
+    args = parser.parse_args()
+
+    use_redis(args.fake_redis)
+
+    from app.core.database import Base
+    from app.core import quality_metrics
+    import app.models.audit_log  # noqa: F401 (registers tables)
+    import app.models.label_confusion  # noqa: F401
+
+    step = max(1, args.rows // args.labels)
+    labels = [
+        (f"tx{i:010d}", "FRAUD" if i % 7 == 0 else "LEGIT")
+        for i in range(0, args.rows, step)
+    ][:args.labels]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        results = {}
+
+        for mode in ("per_label", "bulk"):
+            path = os.path.join(tmp, mode + ".db")
+            engine = create_engine(f"sqlite:///{path}")
+            Base.metadata.create_all(bind=engine)
+            engine.dispose()
+            populate(path, args.rows)
+
+            start = time.perf_counter()
+            if mode == "per_label":
+                per_label(path, labels)
+            else:
+                quality_metrics.DB_PATH = path
+                quality_metrics.ingest_labels(labels)
+            results[mode] = time.perf_counter() - start
+
+    for mode, elapsed in results.items():
+        print(f"{mode:>9}: {len(labels) / elapsed:>10,.0f} labels/s  ({elapsed:.2f}s)")
+
+
+if __name__ == "__main__":
+    main()
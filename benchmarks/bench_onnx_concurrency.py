@@ -0,0 +1,83 @@
+"""
+ONNX inference latency under concurrent callers
+
+Run from project root:
+    python -m benchmarks.bench_onnx_concurrency --calls 2000
+    ONNX_SESSION_POOL_SIZE=4 python -m benchmarks.bench_onnx_concurrency
+"""
+import argparse
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from app.core.onnx_engine import ONNXFraudModel
+
+FEATURES = [80.0, 3.0, 0.1, 0.08, 0.5, 0.9, 1.0, 10.0]
+
+
+class _LockedModel:
+    """
+    Baseline: the old single-lock behaviour
+    """
+
+    def __init__(self, model):
+        self.model = model
+        self.lock = threading.Lock()
+
+    def predict_proba(self, features):
+        with self.lock:
+            return self.model.predict_proba(features)
+
+
+def run(model, callers, calls):
+    per_caller = max(1, calls // callers)
+    barrier = threading.Barrier(callers)
+
+    def worker():
+        barrier.wait()
+        samples = []
+        for _ in range(per_caller):
+            t0 = time.perf_counter()
+            model.predict_proba(FEATURES)
+            samples.append((time.perf_counter() - t0) * 1000)
+        return samples
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=callers) as pool:
+        futures = [pool.submit(worker) for _ in range(callers)]
+        latencies = np.concatenate([f.result() for f in futures])
+    elapsed = time.perf_counter() - start
+
+    return {
+        "p50": np.percentile(latencies, 50),
+        "p99": np.percentile(latencies, 99),
+        "rps": len(latencies) / elapsed,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--calls", type=int, default=4000)
+    parser.add_argument("--callers", type=int, nargs="+", default=[1, 8, 32])
+    args = parser.parse_args()
+
+    model = ONNXFraudModel()
+    locked = _LockedModel(model)
+
+    # warm-up
+    run(model, 1, 200)
+
+    print(f"{'callers':>8} {'mode':>8} {'p50 ms':>9} {'p99 ms':>9} {'calls/s':>10}")
+    for callers in args.callers:
+        for name, m in (("locked", locked), ("lockfree", model)):
+            r = run(m, callers, args.calls)
+            print(
+                f"{callers:>8} {name:>8} {r['p50']:>9.3f} "
+                f"{r['p99']:>9.3f} {r['rps']:>10,.0f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
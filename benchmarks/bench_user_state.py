@@ -0,0 +1,79 @@
+"""
+User behavioural state: bytes per user, dict layout vs compact store
+
+Run from project root:
+    python -m benchmarks.bench_user_state --users 200000
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+from app.core.user_state import CompactUserStateStore
+
+
+def dict_bytes(state: dict) -> int:
+    total = sys.getsizeof(state)
+    for uid, row in state.items():
+        total += sys.getsizeof(uid) + sys.getsizeof(row)
+        for k, v in row.items():
+            total += sys.getsizeof(v)  # keys are interned literals
+    return total
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=200000)
+    parser.add_argument("--tx-per-user", type=int, default=3)
+    args = parser.parse_args()
+
+    # ---------------- legacy dict-of-dicts layout ----------------
+    legacy = {}
+    for i in range(args.users):
+        legacy[f"user{i}@upi"] = {
+            "avg_amount": 100.0 + i,
+            "tx_count": args.tx_per_user,
+            "last_location": f"city{i % 500}",
+            "last_time": 1700000000.0 + i,
+        }
+    legacy_bpu = dict_bytes(legacy) / args.users
+
+    # ---------------- compact store ----------------
+    store = CompactUserStateStore(max_users=args.users)
+
+    # worst single update = index rebuild on growth (under the lock)
+    worst_s = 0.0
+    start = time.perf_counter()
+    for t in range(args.tx_per_user):
+        for i in range(args.users):
+            t0 = time.perf_counter()
+            store.update(f"user{i}@upi", 100.0 + i + t, f"city{i % 500}", 1700000000.0 + i)
+            worst_s = max(worst_s, time.perf_counter() - t0)
+    update_s = time.perf_counter() - start
+
+    compact_bpu = store.nbytes() / len(store)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "user_state.npz")
+
+        start = time.perf_counter()
+        store.save(path)
+        save_s = time.perf_counter() - start
+
+        start = time.perf_counter()
+        restored = CompactUserStateStore.load(path)
+        load_s = time.perf_counter() - start
+
+        assert restored.get("user7@upi") == store.get("user7@upi")
+
+    updates = args.users * args.tx_per_user
+    print(f"👥 Users: {args.users:,}")
+    print(f"📦 dict layout   : {legacy_bpu:8.1f} bytes/user")
+    print(f"📦 compact store : {compact_bpu:8.1f} bytes/user")
+    print(f"⚡ updates       : {updates / update_s:,.0f}/s, worst {worst_s * 1000:.1f} ms")
+    print(f"💾 snapshot save : {save_s * 1000:.1f} ms, load: {load_s * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""
+Velocity features: fixed-window INCR+EXPIRE vs sliding-window Lua script
+
+Run from project root:
+    REDIS_URL=redis://localhost:6379/0 python -m benchmarks.bench_velocity
+    python -m benchmarks.bench_velocity --fake-redis
+"""
+import argparse
+import time
+
+from benchmarks.common import use_redis, timed
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--n", type=int, default=20000)
+    parser.add_argument("--senders", type=int, default=1000)
+    parser.add_argument("--fake-redis", action="store_true")
+    args = parser.parse_args()
+
+    use_redis(args.fake_redis)
+
+    from app.core.redis_client import redis_client
+    from app.core.velocity import record_event
+
+    def fixed_window(i):
+        key = f"bench:user:{i % args.senders}:tx_count"
+        count = redis_client.incr(key)
+        if count == 1:
+            redis_client.expire(key, 60)
+
+    def sliding_window(i):
+        record_event(f"bench{i % args.senders}@upi", f"bench-tx-{i}", f"dev{i % 300}")
+
+    base_ms = int(time.time() * 1000)
+
+    def sliding_window_sender_only(i):
+        record_event(f"bench{i % args.senders}@upi", f"bench-tx-{i}", now_ms=base_ms + i)
+
+    for name, fn in (
+        ("fixed INCR+EXPIRE (1m, sender)", fixed_window),
+        ("sliding Lua (1m/5m/1h, sender)", sliding_window_sender_only),
+        ("sliding Lua (1m/5m/1h, sender+device)", sliding_window),
+    ):
+        r = timed(fn, args.n)
+        print(
+            f"{name:>40}: {r['ops_per_s']:>9,.0f} tx/s  "
+            f"p50={r['p50_ms']:.3f} ms  p99={r['p99_ms']:.3f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+Shared helpers for benchmark scripts
+"""
+import os
+import time
+
+import numpy as np
+
+
+def use_redis(fake: bool = False):
+    """
+    Must run BEFORE importing app modules.
+    fake=True → in-process fakeredis stand-in (no server needed)
+    fake=False → whatever REDIS_URL points at (local redis-server)
+    """
+    if fake:
+        import fakeredis
+        import redis
+        import redis.asyncio
+
+        redis.Redis.from_url = fakeredis.FakeRedis.from_url
+        redis.asyncio.Redis.from_url = fakeredis.FakeAsyncRedis.from_url
+        os.environ.setdefault("REDIS_URL", "redis://localhost:6379/0")
+
+    if not os.getenv("REDIS_URL"):
+        raise SystemExit("Set REDIS_URL or pass --fake-redis")
+
+
+def sample_tx(i: int = 0):
+    """
+    Deterministic TransactionRequest payload (mix of ALLOW/REVIEW/BLOCK)
+    """
+    return {
+        "tx_id": f"bench{i:08d}",
+        "amount": float(500 + (i * 7919) % 30000),
+        "sender_vpa": f"user{i % 5000}@upi",
+        "receiver_vpa": f"shop{i % 700}@upi",
+        "geo_risk_score": (i * 31) % 100,
+        "failed_pin_attempts": i % 4,
+        "account_age_days": (i * 13) % 900,
+        "device_velocity": i % 7,
+        "tx_velocity_5m": i % 6,
+        "avg_tx_30d": float((i * 97) % 8000),
+        "first_time_payee": i % 3 == 0,
+        "high_value_ratio": (i % 10) / 10,
+    }
+
+
+def summarize(samples_ms, elapsed_s=None):
+    arr = np.asarray(samples_ms, dtype=np.float64)
+    out = {
+        "n": int(arr.size),
+        "p50_ms": round(float(np.percentile(arr, 50)), 4),
+        "p95_ms": round(float(np.percentile(arr, 95)), 4),
+        "p99_ms": round(float(np.percentile(arr, 99)), 4),
+        "mean_ms": round(float(arr.mean()), 4),
+    }
+    if elapsed_s:
+        out["ops_per_s"] = round(arr.size / elapsed_s, 1)
+    return out
+
+
+def timed(fn, n: int, *args):
+    samples = []
+    start = time.perf_counter()
+    for i in range(n):
+        t0 = time.perf_counter()
+        fn(i, *args)
+        samples.append((time.perf_counter() - t0) * 1000)
+    return summarize(samples, time.perf_counter() - start)
@@ -0,0 +1,210 @@
+"""
+Decision-path benchmark suite with JSON baselines
+
+Cases:
+  features     ProductionFraudEngine._prepare_ml_features
+  predict      ONNXFraudModel.predict_proba (one row)
+  rules_only   evaluate_transaction with the ML stage skipped (expired deadline)
+  rules_ml     evaluate_transaction (rules + features + ONNX)
+  api_e2e      POST /v1/decision through an in-process ASGI client
+               (validation, auth, rate limit, engine, response, queue hand-off)
+
+Engine cases run with server velocity off (measured in bench_velocity);
+api_e2e uses the app exactly as configured.
+
+Run from project root:
+    python -m benchmarks.suite --fake-redis --save benchmarks/baseline.json
+    python -m benchmarks.suite --fake-redis --compare benchmarks/baseline.json
+Exit status 1 when --compare finds a regression.
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import threading
+import time
+
+from benchmarks.common import use_redis, sample_tx, timed
+
+CASES = ("features", "predict", "rules_only", "rules_ml", "api_e2e")
+
+# compared against the baseline: latency up / throughput down
+REGRESSION_METRICS = ("p50_ms", "p95_ms", "p99_ms")
+
+
+def _git_commit():
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"],
+            stderr=subprocess.DEVNULL, text=True
+        ).strip()
+    except Exception:
+        return None
+
+
+def _drain_audit_queue():
+    # benchmarks never write fraud_audit.db: consume and drop
+    from app.core.async_queue import transaction_queue
+
+    def drain():
+        while True:
+            transaction_queue.get()
+            transaction_queue.task_done()
+
+    threading.Thread(target=drain, daemon=True).start()
+
+
+def build_cases(n_tx):
+    from types import SimpleNamespace
+    from app.core.fraud_engine import ProductionFraudEngine
+
+    engine = ProductionFraudEngine(server_velocity=False)
+    txs = [SimpleNamespace(**sample_tx(i)) for i in range(n_tx)]
+    features = [engine._prepare_ml_features(tx) for tx in txs]
+
+    def pick(i):
+        return txs[i % n_tx]
+
+    cases = {
+        "features": lambda i: engine._prepare_ml_features(pick(i)),
+        "predict": lambda i: engine.ml.predict_proba(features[i % n_tx]),
+        # deadline already passed → rules only (degraded path)
+        "rules_only": lambda i: engine.evaluate_transaction(pick(i), deadline=0.0),
+        "rules_ml": lambda i: engine.evaluate_transaction(pick(i)),
+    }
+
+    import asyncio
+    import httpx
+    from app import main as api
+
+    # ASGITransport runs no lifespan: audit worker / flushers stay off
+    loop = asyncio.new_event_loop()
+    client = httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=api.app),
+        base_url="http://bench"
+    )
+    headers = {"x-api-key": api.API_KEY}
+    bodies = [sample_tx(i) for i in range(n_tx)]
+    _drain_audit_queue()
+
+    def e2e(i):
+        resp = loop.run_until_complete(
+            client.post("/v1/decision", json=bodies[i % n_tx], headers=headers)
+        )
+        if resp.status_code != 200:
+            raise RuntimeError(f"/v1/decision → {resp.status_code}: {resp.text}")
+
+    cases["api_e2e"] = e2e
+    return cases, api.MAX_LATENCY_MS
+
+
+def run_suite(names, n, warmup, n_tx):
+    cases, budget_ms = build_cases(n_tx)
+
+    results = {}
+    for name in names:
+        timed(cases[name], warmup)
+        results[name] = timed(cases[name], n)
+
+    return {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "n": n,
+            "warmup": warmup,
+            "max_latency_ms": budget_ms,
+        },
+        "results": results,
+    }
+
+
+def compare(current, baseline, threshold):
+    """
+    Returns [(case, metric, baseline, current, change)] beyond threshold
+    """
+    regressions = []
+
+    for case, cur in current["results"].items():
+        base = baseline.get("results", {}).get(case)
+        if not base:
+            continue
+
+        for metric in REGRESSION_METRICS:
+            if base.get(metric) and cur[metric] > base[metric] * (1 + threshold):
+                regressions.append((case, metric, base[metric], cur[metric],
+                                    cur[metric] / base[metric] - 1))
+
+        if base.get("ops_per_s") and cur["ops_per_s"] < base["ops_per_s"] * (1 - threshold):
+            regressions.append((case, "ops_per_s", base["ops_per_s"], cur["ops_per_s"],
+                                cur["ops_per_s"] / base["ops_per_s"] - 1))
+
+    return regressions
+
+
+def print_report(report, baseline=None):
+    budget = report["meta"]["max_latency_ms"]
+    base_results = (baseline or {}).get("results", {})
+
+    print(f"{'case':>11} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'ops/s':>11}  vs baseline p99")
+    for case, r in report["results"].items():
+        line = (
+            f"{case:>11} {r['p50_ms']:>9.4f} {r['p95_ms']:>9.4f} "
+            f"{r['p99_ms']:>9.4f} {r['ops_per_s']:>11,.0f}"
+        )
+        base = base_results.get(case)
+        if base and base.get("p99_ms"):
+            line += f"  {r['p99_ms'] / base['p99_ms'] - 1:+.1%}"
+        if r["p99_ms"] > budget:
+            line += f"  ⚠️ p99 over MAX_LATENCY_MS ({budget} ms)"
+        print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--cases", default=",".join(CASES))
+    parser.add_argument("--n", type=int, default=5000)
+    parser.add_argument("--warmup", type=int, default=500)
+    parser.add_argument("--tx-pool", type=int, default=1000, help="distinct transactions cycled through")
+    parser.add_argument("--save", default=None, help="write results as a JSON baseline")
+    parser.add_argument("--compare", default=None, help="baseline JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=0.15, help="allowed slowdown (0.15 = 15%%)")
+    parser.add_argument("--fake-redis", action="store_true")
+    args = parser.parse_args()
+
+    use_redis(args.fake_redis)
+
+    names = [c.strip() for c in args.cases.split(",") if c.strip()]
+    unknown = set(names) - set(CASES)
+    if unknown:
+        raise SystemExit(f"Unknown cases: {', '.join(sorted(unknown))}")
+
+    report = run_suite(names, args.n, args.warmup, args.tx_pool)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+
+    print_report(report, baseline)
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"💾 baseline saved → {args.save}")
+
+    if baseline:
+        regressions = compare(report, baseline, args.threshold)
+        for case, metric, base, cur, change in regressions:
+            print(f"❌ REGRESSION {case}.{metric}: {base} → {cur} ({change:+.1%})")
+        if regressions:
+            sys.exit(1)
+        print(f"✅ no regressions beyond {args.threshold:.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -81,9 +81,10 @@ col1, col2, col3 = st.columns(3)
 total_tx = stats.get("total_transactions", 0) if stats else 0
 fraud_tx = stats.get("fraud_transactions", 0) if stats else 0
 fraud_rate = stats.get("fraud_rate", 0) if stats else 0
+window_min = (stats.get("window_s", 3600) if stats else 3600) // 60
 
-col1.metric("Total Transactions", total_tx)
-col2.metric("Fraud Transactions", fraud_tx)
+col1.metric(f"Transactions (last {window_min} min)", total_tx)
+col2.metric(f"Fraud Transactions (last {window_min} min)", fraud_tx)
 col3.metric("Fraud Rate (%)", fraud_rate)
 
 st.divider()
@@ -102,8 +103,9 @@ with col4:
 
 with col5:
     st.subheader("Risk Score Distribution")
-    if risk_dist and len(risk_dist) > 0:
-        st.bar_chart(pd.Series(risk_dist).value_counts().sort_index())
+    if risk_dist and sum(risk_dist.values()) > 0:
+        # API returns histogram buckets: { "0-9": n, ..., "90-100": n }
+        st.bar_chart(pd.Series(risk_dist))
     else:
         st.info("No risk data available")
 
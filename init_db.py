@@ -1,9 +1,35 @@
+from sqlalchemy import inspect, text
+
 from app.core.database import Base, engine
 from app.models.audit_log import AuditLog
+from app.models.audit_rollup import AuditRollup
+from app.models.label_confusion import LabelConfusion
+
+# columns added after the first release (nullable → plain ADD COLUMN)
+LATE_COLUMNS = {
+    "audit_logs": ["policy_version", "actual_label"],
+}
+
+def add_missing_columns():
+    inspector = inspect(engine)
+
+    with engine.begin() as conn:
+        for table, columns in LATE_COLUMNS.items():
+            existing = {c["name"] for c in inspector.get_columns(table)}
+            for name in columns:
+                if name not in existing:
+                    col = Base.metadata.tables[table].c[name]
+                    col_type = col.type.compile(dialect=engine.dialect)
+                    conn.execute(text(f"ALTER TABLE {table} ADD COLUMN {name} {col_type}"))
 
 def init():
     try:
         Base.metadata.create_all(bind=engine)
+        add_missing_columns()
+
+        # create_all skips indexes of tables that already exist
+        for index in AuditLog.__table__.indexes:
+            index.create(bind=engine, checkfirst=True)
         print("✅ Database initialized successfully (fraud_audit.db)")
     except Exception as e:
         print("❌ Database initialization failed:", e)
@@ -0,0 +1,39 @@
+"""
+Tests run against an in-process fakeredis unless REDIS_URL is set
+(pip install -r tests/requirements.txt). Run from project root:
+    python -m pytest -q
+"""
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+os.environ.setdefault("ONNX_MODEL_PATH", os.path.join(ROOT, "app", "core", "fraud_model.onnx"))
+
+from benchmarks.common import use_redis  # noqa: E402
+
+use_redis(fake=not os.getenv("REDIS_URL"))
+
+
+@pytest.fixture
+def audit_db(tmp_path, monkeypatch):
+    """
+    Empty audit_logs in a throw-away SQLite file (admin_analytics.DB_PATH)
+    """
+    from sqlalchemy import create_engine
+
+    from app.core import admin_analytics, audit_archive
+    from app.core.database import Base
+    from app.models.audit_log import AuditLog
+
+    path = str(tmp_path / "audit.db")
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(bind=engine, tables=[AuditLog.__table__])
+    engine.dispose()
+
+    monkeypatch.setattr(admin_analytics, "DB_PATH", path)
+    monkeypatch.setattr(audit_archive, "AUDIT_ARCHIVE_DIR", str(tmp_path / "archive"))
+    return path
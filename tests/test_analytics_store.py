@@ -0,0 +1,49 @@
+import pytest
+
+from app.core import analytics_store as store
+from app.core.redis_client import redis_client
+
+T0 = 1_700_000_000.0
+
+
+@pytest.fixture(autouse=True)
+def clean():
+    keys = redis_client.keys(f"{store.ANALYTICS_KEY}:*")
+    if keys:
+        redis_client.delete(*keys)
+    yield
+
+
+def _record(results, now):
+    pipe = redis_client.pipeline(transaction=False)
+    store.record_batch(pipe, results, now=now)
+    pipe.execute()
+
+
+def test_summary_covers_the_window_only():
+    _record([{"decision": "BLOCK", "risk_score": 95}] * 3, T0)
+    _record([{"decision": "ALLOW", "risk_score": 5}] * 4, T0 + 1800)
+    _record([{"decision": "REVIEW", "risk_score": 55}], T0 + store.ANALYTICS_WINDOW_S + 60)
+
+    within = store.read_summary(now=T0 + 1800)
+    assert within["total"] == 7
+    assert within["decisions"] == {"ALLOW": 4, "REVIEW": 0, "BLOCK": 3}
+    assert within["risk_histogram"]["90-100"] == 3
+    assert within["window_s"] == store.ANALYTICS_WINDOW_S
+
+    # the first bucket has left the window
+    later = store.read_summary(now=T0 + store.ANALYTICS_WINDOW_S + 60)
+    assert later["decisions"] == {"ALLOW": 4, "REVIEW": 1, "BLOCK": 0}
+
+
+def test_buckets_expire_after_the_window():
+    _record([{"decision": "ALLOW", "risk_score": 1}], T0)
+
+    (key,) = redis_client.keys(f"{store.ANALYTICS_KEY}:*")
+    ttl = redis_client.ttl(key)
+    assert store.ANALYTICS_WINDOW_S < ttl <= store.ANALYTICS_WINDOW_S + store.ANALYTICS_BUCKET_S
+
+
+def test_empty_batch_writes_nothing():
+    _record([], T0)
+    assert redis_client.keys(f"{store.ANALYTICS_KEY}:*") == []
@@ -0,0 +1,75 @@
+import sqlite3
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+
+from app.core import audit_archive
+
+NOW = datetime(2024, 6, 10)
+
+
+def _insert(path, day, n, offset=0):
+    conn = sqlite3.connect(path)
+    conn.executemany(
+        """
+        INSERT INTO audit_logs
+            (tx_id, amount, sender_vpa, receiver_vpa, risk_score,
+             confidence, decision, timestamp)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        """,
+        [
+            (
+                f"{day:%m%d}-{offset + i}", 100.0 + i, "a@upi", "b@upi", i % 100, 0.9,
+                ("ALLOW", "REVIEW", "BLOCK")[i % 3],
+                (day + timedelta(minutes=offset + i)).strftime("%Y-%m-%d %H:%M:%S.%f"),
+            )
+            for i in range(n)
+        ],
+    )
+    conn.commit()
+    conn.close()
+
+
+def _hot_count(path):
+    conn = sqlite3.connect(path)
+    try:
+        return conn.execute("SELECT COUNT(*) FROM audit_logs").fetchone()[0]
+    finally:
+        conn.close()
+
+
+def test_crash_before_delete_does_not_double_count(audit_db, monkeypatch):
+    old, recent = NOW - timedelta(days=9), NOW - timedelta(days=1)
+    _insert(audit_db, old, 30)
+    _insert(audit_db, recent, 10)
+
+    save = audit_archive._save_manifest
+
+    def crash_after_manifest(manifest):
+        save(manifest)
+        raise RuntimeError("crash before DELETE")
+
+    monkeypatch.setattr(audit_archive, "_save_manifest", crash_after_manifest)
+    with pytest.raises(RuntimeError):
+        audit_archive.archive_old_partitions(hot_days=7, now=NOW)
+    monkeypatch.setattr(audit_archive, "_save_manifest", save)
+
+    # the day is in both tiers
+    assert audit_archive.archive_stats()["rows"] == 30
+    assert _hot_count(audit_db) == 40
+
+    # a late row for the archived day (higher id) is still returned
+    _insert(audit_db, old, 1, offset=100)
+
+    cols = audit_archive.read_audit()
+    assert len(cols["id"]) == 41
+    assert len(np.unique(cols["id"])) == 41
+
+    blocks = audit_archive.read_audit(old, old + timedelta(days=1), ["BLOCK"])
+    assert len(blocks["id"]) == 10
+
+    # next run finishes the move; results are unchanged
+    audit_archive.archive_old_partitions(hot_days=7, now=NOW)
+    assert _hot_count(audit_db) == 10
+    assert np.array_equal(audit_archive.read_audit()["id"], cols["id"])
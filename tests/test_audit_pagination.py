@@ -0,0 +1,130 @@
+import sqlite3
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app import main as api
+from app.core.admin_analytics import list_audit_logs, list_frauds
+
+
+@pytest.fixture
+def client(monkeypatch):
+    calls = []
+
+    def fake_list(limit=50, cursor=None, decision=None):
+        calls.append(limit)
+        return {"items": [], "next_cursor": None}
+
+    monkeypatch.setattr(api, "list_audit_logs", fake_list)
+    monkeypatch.setattr(api, "list_frauds", lambda limit=50, cursor=None: fake_list(limit, cursor))
+    client = TestClient(api.app)
+    client.calls = calls
+    return client
+
+
+@pytest.mark.parametrize("path", ["/api/audit/logs", "/api/audit/frauds"])
+@pytest.mark.parametrize("limit", [0, -1, 501])
+def test_out_of_range_limit_is_rejected(client, path, limit):
+    resp = client.get(path, params={"limit": limit})
+
+    assert resp.status_code == 422
+    assert client.calls == []
+
+
+@pytest.mark.parametrize("path", ["/api/audit/logs", "/api/audit/frauds"])
+def test_limit_is_passed_through(client, path):
+    assert client.get(path).status_code == 200
+    assert client.get(path, params={"limit": 500}).status_code == 200
+
+    assert client.calls == [50, 500]
+
+
+# ==================================================
+# KEYSET PAGINATION (SQLite)
+# ==================================================
+N_ROWS = 23
+
+
+@pytest.fixture
+def audit_rows(audit_db):
+    """
+    N_ROWS rows, four per timestamp (ties broken by id), ids not in
+    timestamp order
+    """
+    base = datetime(2024, 6, 1, 12)
+    rows = [
+        (
+            f"pg{i}", 100.0 + i, "a@upi", "b@upi", i % 100, 0.9,
+            ("ALLOW", "BLOCK", "REVIEW")[i % 3],
+            (base + timedelta(seconds=(i * 7) % N_ROWS // 4)).strftime("%Y-%m-%d %H:%M:%S.%f"),
+        )
+        for i in range(N_ROWS)
+    ]
+
+    conn = sqlite3.connect(audit_db)
+    conn.executemany(
+        """
+        INSERT INTO audit_logs
+            (tx_id, amount, sender_vpa, receiver_vpa, risk_score,
+             confidence, decision, timestamp)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        """,
+        rows,
+    )
+    conn.commit()
+    stored = conn.execute(
+        "SELECT id, timestamp, decision FROM audit_logs ORDER BY timestamp DESC, id DESC"
+    ).fetchall()
+    conn.close()
+    return stored
+
+
+def _walk(fetch, limit):
+    pages, cursor = [], None
+    while True:
+        page = fetch(limit=limit, cursor=cursor)
+        pages.append(page)
+        cursor = page["next_cursor"]
+        if cursor is None:
+            return pages
+        assert len(pages) <= N_ROWS + 1
+
+
+@pytest.mark.parametrize("limit", [1, 4, 5, N_ROWS, N_ROWS + 1])
+def test_pages_cover_every_row_once_in_order(audit_rows, limit):
+    pages = _walk(list_audit_logs, limit)
+    seen = [(r["id"], r["timestamp"]) for p in pages for r in p["items"]]
+
+    assert seen == [(r[0], r[1]) for r in audit_rows]
+    assert all(len(p["items"]) == limit for p in pages[:-1])
+    # the last page has rows and no cursor (no trailing empty page)
+    assert 0 < len(pages[-1]["items"]) <= limit
+    assert pages[-1]["next_cursor"] is None
+
+
+def test_frauds_pages_are_block_only(audit_rows):
+    pages = _walk(list_frauds, 3)
+    ids = [r["id"] for p in pages for r in p["items"]]
+
+    assert ids == [r[0] for r in audit_rows if r[2] == "BLOCK"]
+    assert all(r["decision"] == "BLOCK" for p in pages for r in p["items"])
+
+
+def test_empty_table_has_no_cursor(audit_db):
+    assert list_audit_logs(limit=10) == {"items": [], "next_cursor": None}
+
+
+def test_endpoint_walks_pages(audit_rows):
+    client = TestClient(api.app)
+    ids, cursor = [], None
+
+    while True:
+        params = {"limit": 6, **({"cursor": cursor} if cursor else {})}
+        page = client.get("/api/audit/logs", params=params).json()
+        ids += [r["id"] for r in page["items"]]
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+
+    assert ids == [r[0] for r in audit_rows]
@@ -0,0 +1,103 @@
+import queue
+
+import pytest
+import redis
+from fastapi.testclient import TestClient
+
+from app import main as api
+from app.core import async_queue, async_worker, backpressure
+from benchmarks.common import sample_tx
+
+
+@pytest.fixture
+def queues(monkeypatch):
+    main = queue.Queue(maxsize=10)
+    critical = queue.Queue(maxsize=3)
+    for module in (backpressure, async_worker):
+        monkeypatch.setattr(module, "transaction_queue", main)
+        monkeypatch.setattr(module, "critical_queue", critical)
+    monkeypatch.setattr(backpressure, "AUDIT_SHED_MODE", "degrade")
+    monkeypatch.setattr(backpressure, "AUDIT_CRITICAL_BLOCK_MS", 1)
+    monkeypatch.setattr(async_worker, "AUDIT_BATCH_WAIT_MS", 1)
+    return main, critical
+
+
+def _item(i, decision):
+    return {"tx_id": f"bp{i}", "decision": decision}
+
+
+def test_allow_is_shed_when_full(queues):
+    main, critical = queues
+    before = backpressure.queue_stats()["dropped_full"]
+
+    results = [backpressure.submit(_item(i, "ALLOW")) for i in range(12)]
+
+    assert results.count(True) == 10
+    assert main.qsize() == 10
+    assert critical.qsize() == 0
+    assert backpressure.queue_stats()["dropped_full"] - before == 2
+
+
+def test_critical_overflow_stays_bounded(queues):
+    main, critical = queues
+    before = backpressure.queue_stats()
+
+    for i in range(10):
+        backpressure.submit(_item(i, "ALLOW"))
+    results = [backpressure.submit(_item(100 + i, "BLOCK")) for i in range(5)]
+
+    # 3 fit the overflow lane, then the bounded wait expires
+    assert results == [True, True, True, False, False]
+    assert main.qsize() == 10 and critical.qsize() == 3
+
+    after = backpressure.queue_stats()
+    assert after["critical_overflow"] - before["critical_overflow"] == 3
+    assert after["critical_dropped"] - before["critical_dropped"] == 2
+
+
+def test_worker_drains_critical_first(queues):
+    main, critical = queues
+
+    for i in range(10):
+        backpressure.submit(_item(i, "ALLOW"))
+    backpressure.submit(_item(100, "REVIEW"))
+
+    batch, n_main = async_worker.drain_batch()
+
+    assert batch[0]["tx_id"] == "bp100"
+    assert n_main == len(batch) - 1 == 10
+    assert critical.unfinished_tasks == 0
+
+    for _ in range(n_main):
+        main.task_done()
+    assert main.unfinished_tasks == 0
+
+
+@pytest.fixture
+def broken_stream(monkeypatch):
+    def xadd(*args, **kwargs):
+        raise redis.exceptions.TimeoutError("Timeout reading from socket")
+
+    monkeypatch.setattr(backpressure, "transaction_queue", async_queue.RedisStreamQueue())
+    monkeypatch.setattr(async_queue.stream_client, "xadd", xadd)
+
+
+def test_stream_error_is_shed_not_raised(broken_stream):
+    before = backpressure.queue_stats()
+
+    assert backpressure.submit(_item(1, "BLOCK")) is False
+
+    after = backpressure.queue_stats()
+    assert after["shed_error"] - before["shed_error"] == 1
+    assert after["enqueued"] == before["enqueued"]
+
+
+def test_decision_survives_stream_error(broken_stream):
+    client = TestClient(api.app)
+    headers = {"x-api-key": api.API_KEY}
+
+    single = client.post("/v1/decision", json=sample_tx(1), headers=headers)
+    batch = client.post("/v1/decision/batch", json=[sample_tx(2), sample_tx(3)], headers=headers)
+
+    assert single.status_code == 200 and single.json()["decision"] in ("ALLOW", "REVIEW", "BLOCK")
+    assert batch.status_code == 200 and len(batch.json()) == 2
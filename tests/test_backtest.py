@@ -0,0 +1,41 @@
+import json
+
+from app.core import backtest
+
+
+class _Engine:
+    def __init__(self, actions):
+        self.actions = actions
+
+    def evaluate_batch(self, txs):
+        return [
+            {"action": a, "risk_score": 10 * n} if a else None
+            for n, a in enumerate(self.actions[:len(txs)])
+        ]
+
+
+def _line(i, decision="ALLOW"):
+    return json.dumps({
+        "tx_id": f"bt{i}",
+        "amount": 100.0,
+        "sender_vpa": "a@upi",
+        "receiver_vpa": "b@upi",
+        "decision": decision,
+    })
+
+
+def test_flip_with_failed_evaluation(monkeypatch):
+    monkeypatch.setattr(backtest, "_engines", [
+        _Engine(["ALLOW", None, "BLOCK"]),
+        _Engine(["ALLOW", "REVIEW", None]),
+    ])
+
+    out = backtest.replay_chunk([_line(i) for i in range(3)])
+
+    assert out["rows"] == 3
+    assert out["flip_matrix"] == {"ALLOW->ALLOW": 1, "ERROR->REVIEW": 1, "BLOCK->ERROR": 1}
+    assert out["flips"] == [
+        {"tx_id": "bt1", "a": "ERROR", "b": "REVIEW", "risk_a": None, "risk_b": 10},
+        {"tx_id": "bt2", "a": "BLOCK", "b": "ERROR", "risk_a": 20, "risk_b": None},
+    ]
+    assert out["counts"][0] == {"ALLOW": 1, "ERROR": 1, "BLOCK": 1}
@@ -0,0 +1,120 @@
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app import main as api
+from app.core.prom_metrics import FAIL_OPEN_TOTAL
+from benchmarks.common import sample_tx
+
+
+@pytest.fixture
+def client():
+    # no lifespan: audit worker / flushers stay off
+    return TestClient(api.app)
+
+
+def _post_batch(client, bodies):
+    resp = client.post(
+        "/v1/decision/batch",
+        json=bodies,
+        headers={"x-api-key": api.API_KEY},
+    )
+    assert resp.status_code == 200, resp.text
+    return resp.json()
+
+
+def _fail_opens():
+    totals = FAIL_OPEN_TOTAL.totals()
+    return {r: totals.get((r,), 0) for r in ("batch_engine_error", "batch_item_error")}
+
+
+def _result(action, risk_score):
+    return {
+        "action": action,
+        "risk_score": risk_score,
+        "confidence": 0.9,
+        "top_risk_factors": [],
+    }
+
+
+def test_batch_returns_decisions_in_request_order(client):
+    bodies = [sample_tx(i) for i in range(50)]
+
+    out = _post_batch(client, bodies)
+
+    assert [r["tx_id"] for r in out] == [b["tx_id"] for b in bodies]
+
+
+def test_batch_matches_single_endpoint(client):
+    bodies = [sample_tx(i) for i in range(20)]
+
+    batch = _post_batch(client, bodies)
+    single = [
+        client.post("/v1/decision", json=b, headers={"x-api-key": api.API_KEY}).json()
+        for b in bodies
+    ]
+
+    assert [(r["decision"], r["risk_score"]) for r in batch] == [
+        (r["decision"], r["risk_score"]) for r in single
+    ]
+
+
+def test_failed_item_fails_open_alone(client, monkeypatch):
+    monkeypatch.setattr(
+        api.engine, "evaluate_batch",
+        lambda txs: [_result("BLOCK", 90), None, _result("REVIEW", 50)]
+    )
+
+    before = _fail_opens()
+    out = _post_batch(client, [sample_tx(i) for i in range(3)])
+    after = _fail_opens()
+
+    assert [r["decision"] for r in out] == ["BLOCK", "ALLOW", "REVIEW"]
+    assert out[1]["risk_score"] == 0
+    assert after["batch_item_error"] - before["batch_item_error"] == 1
+    assert after["batch_engine_error"] == before["batch_engine_error"]
+
+
+def test_engine_error_fails_open_whole_batch(client, monkeypatch):
+    def boom(txs):
+        raise RuntimeError("engine down")
+
+    monkeypatch.setattr(api.engine, "evaluate_batch", boom)
+
+    before = _fail_opens()
+    out = _post_batch(client, [sample_tx(i) for i in range(3)])
+    after = _fail_opens()
+
+    assert [r["decision"] for r in out] == ["ALLOW"] * 3
+    # one count per failed-open transaction, not batch + items
+    assert after["batch_engine_error"] - before["batch_engine_error"] == 3
+    assert after["batch_item_error"] == before["batch_item_error"]
+
+
+def test_slow_large_batch_keeps_block(client, monkeypatch):
+    n = 20
+
+    def slow(txs):
+        # over MAX_LATENCY_MS in total, well under it per item
+        time.sleep(api.MAX_LATENCY_MS * 1.5 / 1000)
+        return [_result("BLOCK", 95) for _ in txs]
+
+    monkeypatch.setattr(api.engine, "evaluate_batch", slow)
+
+    out = _post_batch(client, [sample_tx(i) for i in range(n)])
+
+    assert out[0]["latency_ms"] > api.MAX_LATENCY_MS
+    assert [r["decision"] for r in out] == ["BLOCK"] * n
+
+
+def test_item_over_budget_fails_open(client, monkeypatch):
+    def slow(txs):
+        time.sleep(api.MAX_LATENCY_MS * 1.5 / 1000)
+        return [_result("BLOCK", 95) for _ in txs]
+
+    monkeypatch.setattr(api.engine, "evaluate_batch", slow)
+
+    out = _post_batch(client, [sample_tx(0)])
+
+    assert out[0]["decision"] == "ALLOW"
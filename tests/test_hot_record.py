@@ -0,0 +1,146 @@
+import threading
+
+import pytest
+
+from app.core import hot_record
+from app.core.prom_metrics import HOT_RECORD_SKIPPED_TOTAL
+from app.core.redis_client import redis_client
+
+
+def _record(i, engine="1.2.0"):
+    return {
+        "tx_id": f"hr{i}",
+        "amount": 100.0 + i,
+        "sender_vpa": f"user{i}@upi",
+        "receiver_vpa": "shop@okaxis",
+        "decision": ("ALLOW", "REVIEW", "BLOCK")[i % 3],
+        "risk_score": i % 100,
+        "confidence": 0.75,
+        "latency_ms": 1.25,
+        "engine_version": engine,
+        "policy_version": "upi_risk_policy_2026_01",
+        "timestamp": "2026-01-15T10:30:00.123456",
+    }
+
+
+def _skipped(reason):
+    return HOT_RECORD_SKIPPED_TOTAL.totals().get((reason,), 0)
+
+
+@pytest.fixture(autouse=True)
+def fresh_dictionary(monkeypatch):
+    monkeypatch.setattr(hot_record, "HOT_RECORD_FORMAT", "binary")
+    monkeypatch.setattr(hot_record, "HOT_STRINGS_CHECK_S", 0.0)
+    redis_client.delete(hot_record.HOT_STRINGS_KEY)
+    hot_record._reset(None)
+    hot_record._stale_epochs.clear()
+    hot_record._decoded.clear()
+    yield
+    redis_client.delete(hot_record.HOT_STRINGS_KEY)
+    hot_record._reset(None)
+
+
+def _other_process():
+    # empty in-process tables, same Redis
+    hot_record._reset(None)
+
+
+def test_round_trip_and_json_fallback():
+    rec = _record(1)
+    odd = dict(_record(2), confidence=0.123456789)
+
+    binary = hot_record.encode_record(rec)
+    fallback = hot_record.encode_record(odd)
+
+    assert binary[0] == hot_record.RECORD_V2
+    assert fallback[:1] == b"{"
+
+    _other_process()
+    assert hot_record.decode_records([binary, fallback]) == [rec, odd]
+
+
+def test_v1_records_still_decode():
+    rec = _record(3)
+    v2 = hot_record.encode_record(rec)
+    # v1: same header without the 4-byte epoch
+    v1 = bytes([hot_record.RECORD_V1]) + v2[5:]
+
+    assert hot_record.decode_record(v1) == rec
+
+
+def test_records_from_a_reset_dictionary_are_skipped():
+    old = [hot_record.encode_record(_record(i)) for i in range(3)]
+
+    # hash flushed; the next writer re-interns in another order
+    redis_client.delete(hot_record.HOT_STRINGS_KEY)
+    new = [hot_record.encode_record(_record(i, engine="2.0.0")) for i in range(3, 6)]
+
+    _other_process()
+    before = _skipped("stale_dictionary")
+    out = hot_record.decode_records(new + old)
+
+    assert out == [_record(i, engine="2.0.0") for i in range(3, 6)]
+    assert _skipped("stale_dictionary") - before == 3
+
+    # cached as skipped: counted once, no extra dictionary loads
+    assert hot_record.decode_records(new + old) == out
+    assert _skipped("stale_dictionary") - before == 3
+
+
+def test_writer_drops_cached_ids_after_reset():
+    hot_record.encode_record(_record(1))
+    old_epoch = hot_record._epoch
+
+    redis_client.delete(hot_record.HOT_STRINGS_KEY)
+    raw = hot_record.encode_record(_record(2, engine="2.0.0"))
+
+    assert hot_record._epoch != old_epoch
+    assert hot_record._ids.keys() == {"@upi", "@okaxis", "2.0.0", "upi_risk_policy_2026_01"}
+
+    _other_process()
+    assert hot_record.decode_records([raw]) == [_record(2, engine="2.0.0")]
+
+
+def test_unknown_string_id_is_counted():
+    raw = bytearray(hot_record.encode_record(_record(1)))
+    # engine_version id → never interned
+    hot_record._V2.pack_into(raw, 0, *(
+        0xFFFE if n == 7 else v
+        for n, v in enumerate(hot_record._V2.unpack_from(raw))
+    ))
+
+    before = _skipped("unknown_string")
+    assert hot_record.decode_records([bytes(raw)]) == []
+    assert _skipped("unknown_string") - before == 1
+
+
+def test_encode_during_concurrent_reload_and_reset():
+    records = [_record(i) for i in range(300)]
+    encoded, errors = [], []
+    stop = threading.Event()
+
+    def reader():
+        while not stop.is_set():
+            redis_client.delete(hot_record.HOT_STRINGS_KEY)
+            hot_record._load_strings()
+
+    def writer():
+        try:
+            for rec in records:
+                encoded.append(hot_record.encode_record(rec))
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=reader), threading.Thread(target=writer)]
+    for t in threads:
+        t.start()
+    threads[1].join()
+    stop.set()
+    threads[0].join()
+
+    assert errors == []
+    assert len(encoded) == len(records)
+
+    # every record decodes to itself or is skipped (dictionary reset)
+    for raw, rec in zip(encoded, records):
+        assert hot_record.decode_records([raw]) in ([rec], [])
@@ -0,0 +1,49 @@
+from fastapi.testclient import TestClient
+
+from app import main as api
+from app.core import prom_metrics
+from app.core.stage_timer import ENGINE_STAGES
+from benchmarks.common import sample_tx
+
+
+def test_queue_gauges_share_one_snapshot(monkeypatch):
+    calls = []
+
+    def stats():
+        calls.append(1)
+        return {
+            "depth": 7, "critical_depth": 1, "capacity": 10,
+            **{e: len(calls) for e in api._SHED_EVENTS},
+        }
+
+    monkeypatch.setattr(api._audit_queue_metrics, "snapshot", stats)
+
+    text = prom_metrics.render()
+
+    assert len(calls) == 1
+    assert "fraud_audit_queue_depth 7" in text
+    assert "fraud_audit_critical_queue_depth 1" in text
+    assert "# TYPE fraud_audit_queue_events_total counter" in text
+    assert 'fraud_audit_queue_events_total{event="shed_error"} 1' in text
+
+
+def test_failed_snapshot_skips_the_group(monkeypatch):
+    def broken():
+        raise ConnectionError("redis down")
+
+    monkeypatch.setattr(api._audit_queue_metrics, "snapshot", broken)
+
+    text = prom_metrics.render()
+
+    assert "fraud_audit_queue_depth" not in text
+    assert "fraud_decisions_total" in text
+
+
+def test_engine_stages_exclude_handler_stages():
+    client = TestClient(api.app)
+    client.post("/v1/decision", json=sample_tx(1), headers={"x-api-key": api.API_KEY})
+
+    stages = api.engine.stage_timer.stats()["stages"]
+
+    assert stages and set(stages) <= set(ENGINE_STAGES)
+    assert "metrics" not in stages and "enqueue" not in stages
@@ -0,0 +1,77 @@
+import threading
+import time
+from types import SimpleNamespace
+
+from app.core.fraud_engine import ProductionFraudEngine
+from app.core.micro_batcher import MicroBatcher
+from app.core.prom_metrics import FAIL_OPEN_TOTAL
+from benchmarks.common import sample_tx
+
+
+class _Model:
+    def __init__(self, delay_s=0.0):
+        self.delay_s = delay_s
+        self.batches = []
+
+    def predict_proba_batch(self, rows):
+        self.batches.append(len(rows))
+        time.sleep(self.delay_s)
+        return [row[0] / 100 for row in rows]
+
+
+def _fail_opens(reason):
+    return FAIL_OPEN_TOTAL.totals().get((reason,), 0)
+
+
+def test_concurrent_calls_share_one_run():
+    model = _Model()
+    batcher = MicroBatcher(model, max_batch_size=8, max_wait_ms=200)
+    scores = {}
+
+    def call(i):
+        scores[i] = batcher.predict_proba([float(i)] * 8)
+
+    threads = [threading.Thread(target=call, args=(i,)) for i in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    # full batch flushes without waiting for max_wait_ms
+    assert model.batches == [8]
+    assert scores == {i: i / 100 for i in range(8)}
+    assert batcher.stats()["expired"] == 0
+
+
+def test_expired_call_returns_none_before_deadline():
+    model = _Model(delay_s=0.05)
+    batcher = MicroBatcher(model, max_batch_size=8, max_wait_ms=0)
+
+    # occupy the scheduler with a slow run
+    threading.Thread(target=batcher.predict_proba, args=([1.0] * 8,)).start()
+    time.sleep(0.005)
+
+    start = time.perf_counter()
+    deadline = start + 0.02
+    score = batcher.predict_proba([2.0] * 8, deadline)
+
+    assert score is None
+    # gave up with the safety margin still left
+    assert time.perf_counter() <= deadline - batcher.safety_s + 0.005
+    assert batcher.stats()["expired"] == 1
+
+    # the abandoned request is not scored afterwards
+    time.sleep(0.1)
+    assert model.batches == [1]
+
+
+def test_engine_marks_expired_batch_degraded():
+    engine = ProductionFraudEngine(server_velocity=False)
+    engine.batcher = SimpleNamespace(predict_proba=lambda features, deadline: None)
+    tx = SimpleNamespace(**sample_tx(1))
+    before = _fail_opens("ml_deadline")
+
+    result = engine.evaluate_transaction(tx, time.perf_counter() + 1)
+
+    assert result["degraded"] is True
+    assert _fail_opens("ml_deadline") - before == 1
@@ -0,0 +1,135 @@
+from datetime import datetime
+
+import pytest
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.core import audit_logger, stream_consumer as sc
+from app.core.async_queue import RedisStreamQueue
+from app.core.database import Base
+from app.core.redis_client import redis_client
+from app.models.audit_log import AuditLog
+from app.models.audit_rollup import AuditRollup  # noqa: F401  (create_all)
+from app.models.label_confusion import LabelConfusion  # noqa: F401
+
+
+@pytest.fixture
+def db():
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+
+
+@pytest.fixture(autouse=True)
+def stream():
+    redis_client.delete(sc.TX_STREAM_KEY, "recent_transactions")
+    sc.ensure_group()
+    yield
+    redis_client.delete(sc.TX_STREAM_KEY, "recent_transactions")
+
+
+def _publish(n, start=0):
+    q = RedisStreamQueue()
+    for i in range(start, start + n):
+        q.put_nowait({
+            "tx_id": f"stream{i:05d}",
+            "decision": "BLOCK" if i % 2 else "ALLOW",
+            "risk_score": 80 if i % 2 else 10,
+            "confidence": 0.9,
+            "engine_version": "1.2.0",
+            "policy_version": "p1",
+            "latency_ms": 1.0,
+            "timestamp": datetime(2026, 1, 1, 12, 0, i % 60).isoformat(),
+            "sender_vpa": "a@upi",
+            "receiver_vpa": "b@upi",
+            "amount": 100.0 + i,
+        })
+
+
+def _read(consumer, count=100):
+    resp = redis_client.xreadgroup(
+        sc.TX_STREAM_GROUP, consumer, {sc.TX_STREAM_KEY: ">"}, count=count
+    )
+    return resp[0][1] if resp else []
+
+
+def _pending():
+    return redis_client.xpending(sc.TX_STREAM_KEY, sc.TX_STREAM_GROUP)["pending"]
+
+
+def _rows(db):
+    return db.execute(select(func.count()).select_from(AuditLog)).scalar()
+
+
+def test_committed_entries_are_acked(db):
+    _publish(10)
+
+    assert sc.handle(_read(sc.TX_STREAM_CONSUMER), db) == 10
+
+    assert _rows(db) == 10
+    assert _pending() == 0
+
+
+def test_db_outage_leaves_entries_pending(db, monkeypatch):
+    _publish(10)
+
+    def down(*args, **kwargs):
+        raise RuntimeError("database is locked")
+
+    monkeypatch.setattr("app.core.async_worker.log_decisions", down)
+
+    assert sc.handle(_read(sc.TX_STREAM_CONSUMER), db) == 0
+    assert _pending() == 10
+    # nothing reached the dashboard either
+    assert redis_client.llen("recent_transactions") == 0
+
+    monkeypatch.setattr("app.core.async_worker.log_decisions", audit_logger.log_decisions)
+
+    assert sc.replay_pending(db) == 10
+    assert _rows(db) == 10
+    assert _pending() == 0
+
+
+def test_only_failed_rows_stay_pending(db, monkeypatch):
+    _publish(4)
+    real = audit_logger.log_decisions
+
+    def reject_one(rows, db, skip_existing=False):
+        if any(r["tx_id"] == "stream00002" for r in rows):
+            raise RuntimeError("constraint failed")
+        return real(rows, db, skip_existing)
+
+    monkeypatch.setattr("app.core.async_worker.log_decisions", reject_one)
+
+    assert sc.handle(_read(sc.TX_STREAM_CONSUMER), db) == 3
+    assert _rows(db) == 3
+
+    pending = redis_client.xpending_range(
+        sc.TX_STREAM_KEY, sc.TX_STREAM_GROUP, min="-", max="+", count=10
+    )
+    assert len(pending) == 1
+
+
+def test_redelivery_is_idempotent(db, monkeypatch):
+    _publish(6)
+
+    # consumer crashes after the commit, before XACK
+    entries = _read("dead")
+    failed = sc.process_batch([sc.codec.loads(f["data"]) for _, f in entries], db, at_least_once=True)
+    assert not failed
+    assert _rows(db) == 6
+
+    monkeypatch.setattr(sc, "TX_STREAM_CLAIM_IDLE_MS", 0)
+    assert sc.claim_stale(db) == 6
+
+    assert _rows(db) == 6
+    assert _pending() == 0
+    # the dashboard saw each transaction once
+    assert redis_client.llen("recent_transactions") == 6
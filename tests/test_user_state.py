@@ -0,0 +1,103 @@
+import time
+
+import numpy as np
+import pytest
+
+from app.core.user_state import CompactUserStateStore
+
+
+def test_location_table_is_bounded():
+    store = CompactUserStateStore(max_users=100, max_locations=8)
+
+    for i in range(50):
+        store.update(f"user{i % 4}@upi", 100.0, location=f"city{i}")
+
+    assert len(store._locations) <= 8
+    for u in range(4):
+        # last write wins, compaction keeps live references intact
+        last = max(i for i in range(50) if i % 4 == u)
+        assert store.get(f"user{u}@upi")["last_location"] == f"city{last}"
+
+
+def test_location_unknown_when_all_referenced():
+    store = CompactUserStateStore(max_users=100, max_locations=2)
+
+    store.update("a@upi", 10.0, location="Mumbai")
+    store.update("b@upi", 10.0, location="Delhi")
+    state = store.update("c@upi", 10.0, location="Pune")
+
+    assert state["last_location"] is None
+    assert store.get("a@upi")["last_location"] == "Mumbai"
+    assert store.get("b@upi")["last_location"] == "Delhi"
+
+
+def test_snapshot_loads_without_pickle(tmp_path):
+    store = CompactUserStateStore(max_users=100, max_locations=16)
+    for i in range(30):
+        store.update(f"user{i}@upi", 50.0 + i, location=f"city{i % 5}", tx_time=1700000000.0 + i)
+    store.update("nowhere@upi", 1.0)
+
+    path = str(tmp_path / "user_state.npz")
+    store.save(path)
+
+    with np.load(path, allow_pickle=False) as data:
+        assert data["locations"].dtype.kind == "U"
+
+    restored = CompactUserStateStore.load(path)
+    assert restored.max_locations == 16
+    for uid in ("user0@upi", "user29@upi", "nowhere@upi"):
+        assert restored.get(uid) == store.get(uid)
+
+
+def test_index_consistent_under_eviction_churn():
+    # tiny table: long probe runs, deletions inside them
+    store = CompactUserStateStore(max_users=64, initial_capacity=8)
+    model = {}  # uid → amounts since (re)insert
+
+    for i in range(2000):
+        uid = f"user{(i * 7919) % 500}@upi"
+        store.update(uid, float(i))
+        model.setdefault(uid, []).append(float(i))
+
+        if len(model) > 64:
+            evicted = [u for u in model if store.get(u) is None]
+            assert len(evicted) == 1
+            del model[evicted[0]]
+
+    assert len(store) == len(model) == 64
+    for uid, amounts in model.items():
+        state = store.get(uid)
+        assert state["tx_count"] == len(amounts)
+        assert state["avg_amount"] == pytest.approx(np.mean(amounts))
+    assert store.evictions > 0
+
+
+def test_index_rebuild_is_vectorised():
+    n = 1 << 20
+    store = CompactUserStateStore(max_users=n, initial_capacity=n)
+    rng = np.random.default_rng(7)
+    store._row_keys[:] = rng.integers(2, 2 ** 63, size=n, dtype=np.uint64) | 2
+    store._size = n
+
+    start = time.perf_counter()
+    store._rebuild_index()
+    elapsed = time.perf_counter() - start
+
+    # the per-slot Python loop took seconds here
+    assert elapsed < 1.0
+    for row in rng.integers(0, n, size=2000):
+        slot = store._find_slot(int(store._row_keys[row]))
+        assert int(store._slot_rows[slot]) == row
+
+
+def test_worst_update_during_growth_is_bounded():
+    store = CompactUserStateStore(max_users=200000, initial_capacity=1024)
+    worst = 0.0
+
+    for i in range(200000):
+        start = time.perf_counter()
+        store.update(f"user{i}@upi", 1.0)
+        worst = max(worst, time.perf_counter() - start)
+
+    assert len(store) == 200000
+    assert worst < 0.1
@@ -0,0 +1,118 @@
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from app.core.fraud_engine import ProductionFraudEngine
+from app.core.vector_engine import VectorizedFraudEngine, factor_names
+
+E = ProductionFraudEngine
+
+# values on and around every rule threshold
+BOUNDARIES = {
+    "amount": [1.0, 9999.99, 10000.0, 10000.01, 19999.99, 20000.0, 20000.01, 60000.0],
+    "failed_pin_attempts": [0, 1, 2, 3, 4],
+    "geo_risk_score": [0, 49, 50, 51, 79, 80, 81, 100],
+    "account_age_days": [0, 29, 30, 89, 90, 365, 366, 800],
+    "device_velocity": [0, 4, 5, 6],
+    "tx_velocity_5m": [0, 2, 3, 4, 5, 6],
+    "first_time_payee": [False, True],
+    "high_value_ratio": [0.0, 0.5, 1.0],
+}
+
+# ML probabilities on and around the decision thresholds
+ML_SCORES = [
+    0.0,
+    np.nextafter(E.ML_REVIEW_THRESHOLD, 0), E.ML_REVIEW_THRESHOLD,
+    np.nextafter(E.ML_BLOCK_THRESHOLD, 0), E.ML_BLOCK_THRESHOLD,
+    1.0,
+]
+
+
+@pytest.fixture(scope="module")
+def engines():
+    scalar = ProductionFraudEngine(server_velocity=False)
+    return scalar, VectorizedFraudEngine(scalar)
+
+
+def random_columns(n, seed):
+    rng = np.random.default_rng(seed)
+    return {
+        "amount": np.round(rng.lognormal(8, 1.5, n), 2) + 1,
+        "failed_pin_attempts": rng.integers(0, 5, n),
+        "geo_risk_score": rng.integers(0, 101, n),
+        "account_age_days": rng.integers(0, 800, n),
+        "device_velocity": rng.integers(0, 10, n),
+        "tx_velocity_5m": rng.integers(0, 10, n),
+        "avg_tx_30d": np.where(rng.random(n) < 0.2, 0, np.round(rng.lognormal(8, 1, n), 2)),
+        "first_time_payee": rng.random(n) < 0.3,
+        "high_value_ratio": np.round(rng.random(n), 3),
+    }
+
+
+def boundary_columns(n, seed):
+    rng = np.random.default_rng(seed)
+    cols = {k: rng.choice(np.array(v), n) for k, v in BOUNDARIES.items()}
+
+    # AMOUNT_SPIKE (amount > 3 × avg) and NORMAL_SPEND (amount <= avg) edges
+    ratio = rng.choice(np.array([0.0, 1 / 3, 0.5, 1.0, 2.0]), n)
+    cols["avg_tx_30d"] = cols["amount"] * ratio
+    return cols
+
+
+def _rows(cols):
+    n = len(cols["amount"])
+    for i in range(n):
+        yield i, SimpleNamespace(**{k: np.asarray(v)[i].item() for k, v in cols.items()})
+
+
+def _vector_row(out, i):
+    return (
+        str(out["action"][i]),
+        int(out["risk_score"][i]),
+        float(out["confidence"][i]),
+        sorted(factor_names(out["factor_mask"][i])),
+    )
+
+
+def _scalar_row(ref):
+    return (
+        ref["action"],
+        ref["risk_score"],
+        ref["confidence"],
+        sorted(f.split("(")[0] for f in ref["top_risk_factors"]),
+    )
+
+
+@pytest.mark.parametrize("seed", [7, 11, 2026])
+def test_matches_scalar_on_random_rows(engines, seed):
+    scalar, vector = engines
+    cols = random_columns(2000, seed)
+
+    out = vector.evaluate_columns(cols)
+
+    for i, tx in _rows(cols):
+        assert _vector_row(out, i) == _scalar_row(scalar.evaluate_transaction(tx)), f"row {i}"
+
+
+@pytest.mark.parametrize("seed", [1, 2])
+def test_matches_scalar_at_rule_boundaries(engines, seed):
+    scalar, vector = engines
+    cols = boundary_columns(3000, seed)
+
+    out = vector.evaluate_columns(cols)
+
+    for i, tx in _rows(cols):
+        assert _vector_row(out, i) == _scalar_row(scalar.evaluate_transaction(tx)), f"row {i}"
+
+
+def test_matches_scalar_at_ml_thresholds(engines):
+    scalar, vector = engines
+    cols = boundary_columns(600, seed=3)
+    ml = np.resize(np.array(ML_SCORES, dtype=np.float64), 600)
+
+    out = vector.evaluate_columns(cols, ml_scores=ml)
+
+    for i, tx in _rows(cols):
+        ref = scalar._final_decision(*scalar._score_rules(tx), float(ml[i]))
+        assert _vector_row(out, i) == _scalar_row(ref), f"row {i} ml={ml[i]}"
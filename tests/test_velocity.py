@@ -0,0 +1,93 @@
+import os
+import subprocess
+import sys
+import time
+from types import SimpleNamespace
+
+import redis
+
+from app.core import velocity
+from app.core.fraud_engine import ProductionFraudEngine
+from benchmarks.common import sample_tx
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _tx(i, sender):
+    return SimpleNamespace(**dict(sample_tx(i), sender_vpa=sender, tx_velocity_5m=9))
+
+
+def test_counts_exclude_current_event():
+    now = int(time.time() * 1000)
+    sender = f"v{now}@upi"
+
+    counts = [
+        velocity.record_event(sender, f"t{i}", now_ms=now + i)["sender_5m"]
+        for i in range(4)
+    ]
+
+    assert counts == [0, 1, 2, 3]
+
+
+def test_retried_tx_not_counted_twice():
+    now = int(time.time() * 1000)
+    sender = f"r{now}@upi"
+
+    velocity.record_event(sender, "a", now_ms=now)
+    velocity.record_event(sender, "b", now_ms=now + 1)
+
+    assert velocity.record_event(sender, "b", now_ms=now + 2)["sender_5m"] == 1
+
+
+def test_engine_uses_server_counts():
+    engine = ProductionFraudEngine(server_velocity=True)
+    tx = _tx(1, f"e{time.time_ns()}@upi")
+
+    engine.evaluate_transaction(tx)
+
+    # first transaction of a fresh sender, client claimed 9
+    assert tx.tx_velocity_5m == 0
+
+
+def test_velocity_timeout_fails_open(monkeypatch):
+    engine = ProductionFraudEngine(server_velocity=True)
+
+    def slow(*args, **kwargs):
+        raise redis.TimeoutError("Timeout reading from socket")
+
+    monkeypatch.setattr(velocity, "record_event", slow)
+    tx = _tx(2, "timeout@upi")
+
+    result = engine.evaluate_transaction(tx)
+
+    assert tx.tx_velocity_5m == 9
+    assert result["action"] in ("ALLOW", "REVIEW", "BLOCK")
+
+
+def test_velocity_skipped_when_budget_is_short(monkeypatch):
+    engine = ProductionFraudEngine(server_velocity=True)
+    calls = []
+    monkeypatch.setattr(velocity, "record_event", lambda *a, **k: calls.append(a))
+    tx = _tx(3, "deadline@upi")
+
+    engine.evaluate_transaction(tx, deadline=time.perf_counter())
+
+    assert not calls
+    assert tx.tx_velocity_5m == 9
+
+
+def test_offline_engine_needs_no_redis():
+    env = {k: v for k, v in os.environ.items() if k != "REDIS_URL"}
+    code = (
+        "from app.core.fraud_engine import ProductionFraudEngine;"
+        "from app.core.vector_engine import VectorizedFraudEngine;"
+        "import app.core.backtest;"
+        "VectorizedFraudEngine(ProductionFraudEngine(server_velocity=False))"
+    )
+
+    proc = subprocess.run(
+        [sys.executable, "-c", code], cwd=ROOT, env=env,
+        capture_output=True, text=True, timeout=120
+    )
+
+    assert proc.returncode == 0, proc.stderr